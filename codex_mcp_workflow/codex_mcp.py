@@ -1,15 +1,13 @@
 
 import asyncio
-from agents import Agent, Runner
-from agents.mcp import MCPServerStdio
+from tools.mcp_manager import CodexMCPManager
 
 async def main() -> None:
-    async with MCPServerStdio(
-        name="Codex CLI",
-        params={ "command": "npx", "args": ["-y", "codex", "mcp"] },
-        client_session_timeout_seconds=360000,
-    ) as codex_mcp_server:
-        print("Codex MCP server started.")
+    async with CodexMCPManager() as manager:
+        stats = manager.stats()
+        # with CODEX_MCP_URL set this attaches to a server that outlives this process
+        action = "attached" if stats["url"] else "started"
+        print(f"Codex MCP server {action} in {stats['startup_sec'][0]:.2f}s ({' '.join(stats['command']) or stats['url']}).")
         # This script only demonstrates launching Codex MCP.
         # See orchestrate.py for a full multi-agent workflow.
         return
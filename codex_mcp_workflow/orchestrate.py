@@ -1,92 +1,367 @@
 
-import os, asyncio
+import os, sys, json, time, shutil, asyncio, argparse, tempfile
 from dotenv import load_dotenv
 from agents import Agent, Runner, WebSearchTool, set_default_openai_api
-from agents.mcp import MCPServerStdio
+from agents.exceptions import AgentsException, MaxTurnsExceeded
 from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
 from openai.types.shared import Reasoning
 
-# Tools
-from tools.pdf_tools import extract_faa_tables
-from tools.gumbo_tools import generate_gumbo
-from tools.sireum_tools import run_sireum
+# Tools (async variants: long tool calls overlap instead of blocking the event loop)
+from tools.async_tools import (
+    component_context_async as component_context,
+    extract_faa_tables_async as extract_faa_tables,
+    generate_gumbo_async as generate_gumbo,
+    golden_snippets_async as golden_snippets,
+    insert_gumbo_annexes_async as insert_gumbo_annexes,
+    lookup_gumbo_annex_async as lookup_gumbo_annex,
+    precheck_gumbo_async as precheck_gumbo,
+    run_sireum_async as run_sireum,
+    run_sireum_incremental_async as run_sireum_incremental,
+    salvage_contracts_async as salvage_contracts,
+    translate_gumbo_requirements_async as translate_gumbo_requirements,
+    verify_model_async,
+)
+from tools.context_slicer import slice_file
+from tools.golden_index import TOKEN_BUDGET as GOLDEN_TOKEN_BUDGET, count_tokens, prompt_block, shared_golden_index
+from tools.llm_cache import MODES as LLM_CACHE_MODES, LLMCache, cache_agents
+from tools.gumbo_precheck import precheck_part
+from tools.mcp_manager import CodexMCPManager
+from tools.sysml_index import SysmlIndex, drop_index
+from tools.sysml_writer import apply_annex_edits
+from tools.tracing import TRACE_PATH, TraceWriter, traced_run
 
 load_dotenv(override=True)
 set_default_openai_api(os.getenv("OPENAI_API_KEY"))
 
-async def main():
-    async with MCPServerStdio(
-        name="Codex CLI",
-        params={ "command": "npx", "args": ["-y", "codex", "mcp"] },
-        client_session_timeout_seconds=360000,
-    ) as codex_mcp_server:
+PDF_PATH = "./docs/Steve_Meller_FAA_docAR-08-32.pdf"
+MODEL_PATH = "./models/Monitor_no_gumbo.sysml"
 
-        extractor_agent = Agent(
-            name="Extractor",
-            instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
+# Independent until hybrid assembly (Gumbo_FSE_agent_Plan.txt, A.5.1.x / A.5.2.x)
+COMPONENTS = {
+    "MRI": "Manage_Regulator_Interface_i",
+    "MRM": "Manage_Regulator_Mode_i",
+    "MHS": "Manage_Heat_Source_i",
+    "MMI": "Manage_Monitor_Interface_i",
+    "MMM": "Manage_Monitor_Mode_i",
+    "MA": "Manage_Alarm_i",
+}
+
+
+def build_agents(codex_mcp_server):
+    extractor_agent = Agent(
+        name="Extractor",
+        instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
 You extract FAA tables from PDF into JSON via the tool `extract_faa_tables`.
 If additional scripting is needed, call Codex MCP tools.
 """),
-            tools=[extract_faa_tables],
-            mcp_servers=[codex_mcp_server],
-        )
+        tools=[extract_faa_tables],
+        mcp_servers=[codex_mcp_server],
+    )
 
-        spec_agent = Agent(
-            name="GUMBO Spec Generator",
-            instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
+    spec_agent = Agent(
+        name="GUMBO Spec Generator",
+        instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
 You generate a classic GUMBO annex (Lark grammar) using the tool `generate_gumbo`.
+Work from one component's `component_context` bundle rather than the full tables JSON.
+Call `translate_gumbo_requirements` per component first: its cases are rule-translated (R1-R7);
+write by hand only the statements it returns as `unmatched` (TODO(llm) placeholders in `generate_gumbo`).
 Include sections: state/functions (if provided), integration, initialize, compute, compute_cases.
+Use `lookup_gumbo_annex` to read an existing part def's annex instead of re-reading the model.
+Write all annexes for a model in one `insert_gumbo_annexes` call rather than rewriting the file per component.
+Run `precheck_gumbo` on each part def you wrote and fix any gaps or contradictions before handing off.
 """),
-            tools=[generate_gumbo],
-            mcp_servers=[codex_mcp_server],
-        )
+        tools=[generate_gumbo, insert_gumbo_annexes, lookup_gumbo_annex, precheck_gumbo, translate_gumbo_requirements,
+               component_context],
+        mcp_servers=[codex_mcp_server],
+    )
 
-        verify_agent = Agent(
-            name="Verifier",
-            instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
+    verify_agent = Agent(
+        name="Verifier",
+        instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
 Run Sireum/Logika GUMBO verification via `run_sireum`. Summarize results.
+After a repair, prefer `run_sireum_incremental`: it re-checks only the components affected by the change.
+If a hybrid model of improved contracts fails, call `salvage_contracts` instead of re-adding them one by one.
 """),
-            tools=[run_sireum],
-            mcp_servers=[codex_mcp_server],
-        )
-
-        repair_agent = Agent(
-            name="Repair",
-            instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
-Given verification failures, propose minimal GUMBO fixes and a unified diff. 
+        tools=[run_sireum, run_sireum_incremental, salvage_contracts, lookup_gumbo_annex],
+        mcp_servers=[codex_mcp_server],
+    )
+
+    repair_agent = Agent(
+        name="Repair",
+        instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
+Given verification failures, propose minimal GUMBO fixes and a unified diff.
 If you need to edit files, use Codex to create patches.
+Use `lookup_gumbo_annex` to fetch the failing part def's annex.
+Check a fix with `precheck_gumbo` (milliseconds) before asking for another Sireum run.
+For an example of a verified contract, ask `golden_snippets` with the failing case rather than reading whole models.
 """),
-            mcp_servers=[codex_mcp_server],
-        )
+        tools=[lookup_gumbo_annex, precheck_gumbo, golden_snippets],
+        mcp_servers=[codex_mcp_server],
+    )
 
-        correction_manager = Agent(
-            name="Correction Manager",
-            instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
-If extraction/spec generation repeatedly fail, propose code patches for the offending agent 
+    correction_manager = Agent(
+        name="Correction Manager",
+        instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
+If extraction/spec generation repeatedly fail, propose code patches for the offending agent
 (e.g., improve table parsing, fix grammar mapping). Output a patch as a unified diff and rationale.
 """),
-            mcp_servers=[codex_mcp_server],
-        )
+        mcp_servers=[codex_mcp_server],
+    )
 
-        project_manager = Agent(
-            name="Project Manager",
-            instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
+    project_manager = Agent(
+        name="Project Manager",
+        instructions=(f"""{RECOMMENDED_PROMPT_PREFIX}
 You orchestrate: Extract → Spec → Verify → (Repair/Correction loop) until checks pass.
 Gate each handoff: require files/artifacts to exist before proceeding.
 """),
-            model="gpt-5",
-            model_settings=dict(reasoning=Reasoning(effort="medium")),
-            handoffs=[extractor_agent, spec_agent, verify_agent, repair_agent, correction_manager],
-            tools=[WebSearchTool()],
-            mcp_servers=[codex_mcp_server],
-        )
+        model="gpt-5",
+        model_settings=dict(reasoning=Reasoning(effort="medium")),
+        handoffs=[extractor_agent, spec_agent, verify_agent, repair_agent, correction_manager],
+        tools=[WebSearchTool()],
+        mcp_servers=[codex_mcp_server],
+    )
+
+    return {
+        "extractor": extractor_agent,
+        "spec": spec_agent,
+        "verify": verify_agent,
+        "repair": repair_agent,
+        "correction": correction_manager,
+        "project_manager": project_manager,
+    }
+
+
+class RunBudget:
+    """Turn and token budget shared by concurrent runs.
+
+    A run reserves its turn cap up front and returns the unused turns when it finishes or
+    fails, so concurrent runs can never exceed max_turns; tokens are charged after each run,
+    including runs that fail (a run that hits MaxTurnsExceeded has spent the most).
+    """
+
+    def __init__(self, max_turns, max_tokens=0, writer=None):
+        self.max_turns = max_turns
+        self.writer = writer
+        self.max_tokens = max_tokens  # 0 = no token limit
+        self.turns = 0
+        self.tokens = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def exhausted(self):
+        return self.turns >= self.max_turns or bool(self.max_tokens and self.tokens >= self.max_tokens)
+
+    async def run(self, agent, prompt, max_turns, component=None):
+        """Runner.run capped by what is left of the budget; None if the budget is spent.
+        MaxTurnsExceeded (this run used up its own cap) propagates to the caller."""
+        async with self._lock:
+            if self.exhausted:
+                return None
+            reserved = min(max_turns, self.max_turns - self.turns)
+            self.turns += reserved
+        used = 0
+        try:
+            if self.writer:
+                result = await traced_run(agent, prompt, self.writer, component, max_turns=reserved)
+            else:
+                result = await Runner.run(agent, prompt, max_turns=reserved)
+            used = len(result.raw_responses)
+            self.tokens += result.context_wrapper.usage.total_tokens
+        except AgentsException as exc:
+            if exc.run_data is not None:
+                used = len(exc.run_data.raw_responses)
+                self.tokens += exc.run_data.context_wrapper.usage.total_tokens
+            if isinstance(exc, MaxTurnsExceeded):
+                used = reserved
+            raise
+        finally:
+            # no await between read and write, so this needs no lock (and survives cancellation)
+            self.turns -= reserved - used
+        return result
+
+
+def part_files(source_dir, parts):
+    """Part def name → path of the .sysml file defining it, relative to `source_dir`;
+    parts that are not found map to the file of MODEL_PATH."""
+    index = SysmlIndex(source_dir, parse=False)
+    index.refresh()
+    files = {}
+    for part in parts:
+        found = index.find(part)
+        files[part] = os.path.relpath(found[0].path, index.root) if found else os.path.basename(MODEL_PATH)
+    return files
+
+
+async def component_worker(code, part, agents, budget, semaphore, tables_json, workspace, model_file=None,
+                           max_repairs=2, golden=None, golden_tokens=GOLDEN_TOKEN_BUDGET):
+    """Spec → Verify → Repair for one part def, on a private copy of the model directory.
+    `model_file` is the part's .sysml file relative to the workspace. Repair prompts carry
+    the golden snippets nearest to the failure, `golden_tokens` in total.
+    """
+    model_path = os.path.join(workspace, model_file or os.path.basename(MODEL_PATH))
+    status = {"component": code, "part": part, "status": "budget_exhausted", "rounds": 0, "golden_tokens": 0}
+    started = time.perf_counter()
+    try:
+        await _spec_verify_repair(code, part, agents, budget, semaphore, tables_json, workspace, model_path,
+                                  status, max_repairs, golden, golden_tokens)
+    except MaxTurnsExceeded:
+        status["status"] = "max_turns"  # one run hit its own cap; the shared budget may have turns left
+    except Exception as exc:
+        status["status"] = "error"
+        status["error"] = f"{type(exc).__name__}: {exc}"
+    status["time_sec"] = round(time.perf_counter() - started, 3)
+    return status
+
+
+async def _spec_verify_repair(code, part, agents, budget, semaphore, tables_json, workspace, model_path,
+                              status, max_repairs, golden, golden_tokens):
+    async with semaphore:
+        # the spec agent only sees this component's rows, constants and requirements
+        try:
+            context = await asyncio.to_thread(slice_file, tables_json, code, workspace)
+            status["context_tokens"] = {k: context[k] for k in ("tokens_before", "tokens_after")}
+            tables_json = context["path"]
+        except (OSError, ValueError):
+            pass  # the extractor's reply is not a readable payload; fall back to the full JSON
+        spec = await budget.run(agents["spec"], f"""
+Generate the GUMBO annex for part def {part} ({code}) only, from the tables in {tables_json},
+starting from `translate_gumbo_requirements` with component {code},
+and insert it into {model_path} with `insert_gumbo_annexes`. Do not touch other part defs.
+""", max_turns=10, component=code)
+        while spec is not None:
+            status["rounds"] += 1
+            # finite-domain pre-check first: contradictory or dead cases never reach Sireum
+            precheck = await asyncio.to_thread(precheck_part, workspace, part)
+            if precheck["status"] == "failed":
+                status["prechecks_failed"] = status.get("prechecks_failed", 0) + 1
+                failure = {k: precheck[k] for k in ("contradiction_witnesses", "overlaps", "cases", "gap_witnesses")}
+            else:
+                # verification is deterministic, so the gate calls it directly instead of via the Verifier
+                report = await verify_model_async(workspace)
+                if report["metrics"]["failed"] == 0 and report["metrics"]["timeouts"] == 0:
+                    status["status"] = "verified"
+                    break
+                failure = report["parse_errors"]
+            status["status"] = "failed"
+            if status["rounds"] > max_repairs:
+                break
+            examples = prompt_block(golden, json.dumps(failure), golden_tokens - status["golden_tokens"])
+            status["golden_tokens"] += count_tokens(examples) if examples else 0
+            repair = await budget.run(agents["repair"], f"""
+Verification of part def {part} in {model_path} failed with: {json.dumps(failure)}
+Fix only the GUMBO annex of {part} in {model_path}.
+{examples}
+""", max_turns=8, component=code)
+            if repair is None:
+                status["status"] = "budget_exhausted"
+                break
+
+
+async def run_pipeline(codex_mcp_server, concurrency, max_turns, max_tokens, writer=None, llm_cache=None):
+    """Extract once, fan out one worker per component, then assemble the verified annexes."""
+    agents = build_agents(codex_mcp_server)
+    if llm_cache:
+        cache_agents(agents.values(), llm_cache)
+    budget = RunBudget(max_turns, max_tokens, writer)
+    started = time.perf_counter()
+    try:
+        extract = await budget.run(agents["extractor"], f"""
+Extract the tables from {PDF_PATH} with `extract_faa_tables` and save the JSON to ./build/tables.json.
+Reply with the path only.
+""", max_turns=6, component="extract")
+    except MaxTurnsExceeded:
+        return {"status": "extraction_failed", "reason": "max_turns", "turns": budget.turns, "tokens": budget.tokens}
+    if extract is None:
+        return {"status": "extraction_failed", "reason": "budget_exhausted", "turns": budget.turns,
+                "tokens": budget.tokens}
+    tables_json = extract.final_output.strip() or "./build/tables.json"
+
+    golden = await asyncio.to_thread(shared_golden_index)
+    source_dir = os.path.dirname(os.path.abspath(MODEL_PATH))
+    files = await asyncio.to_thread(part_files, source_dir, COMPONENTS.values())
+    semaphore = asyncio.Semaphore(concurrency)
+    annexes = {}  # relative .sysml path → {part def: annex}
+    with tempfile.TemporaryDirectory(prefix="pipeline-") as tmp:
+        workspaces = {code: os.path.join(tmp, code) for code in COMPONENTS}
+        try:
+            for workspace in workspaces.values():
+                shutil.copytree(source_dir, workspace)
+            # every worker finishes before the workspaces are removed, even if one of them fails
+            outcomes = await asyncio.gather(*(
+                component_worker(code, part, agents, budget, semaphore, tables_json, workspaces[code],
+                                 files[part], golden=golden)
+                for code, part in COMPONENTS.items()
+            ), return_exceptions=True)
+            results = [
+                outcome if not isinstance(outcome, BaseException) else
+                {"component": code, "part": part, "status": "error", "rounds": 0, "golden_tokens": 0,
+                 "error": f"{type(outcome).__name__}: {outcome}", "time_sec": 0.0}
+                for (code, part), outcome in zip(COMPONENTS.items(), outcomes)
+            ]
+
+            # assembly gate: every verified annex goes into the file that defines its part, one write per file
+            for status in results:
+                if status["status"] != "verified":
+                    continue
+                index = SysmlIndex(workspaces[status["component"]], parse=False)
+                index.refresh()
+                parts = [p for p in index.find(status["part"]) if p.annex is not None]
+                if parts:
+                    annexes.setdefault(files[status["part"]], {})[status["part"]] = index.annex_text(parts[0])
+        finally:
+            for workspace in workspaces.values():
+                drop_index(workspace)
+    assembled = None
+    if annexes:
+        for relpath, edits in annexes.items():
+            await asyncio.to_thread(apply_annex_edits, os.path.join(source_dir, relpath), edits)
+        assembled = await verify_model_async(MODEL_PATH)
+    return {
+        "components": results,
+        "assembled": sorted(part for edits in annexes.values() for part in edits),
+        "assembly_metrics": assembled["metrics"] if assembled else None,
+        "turns": budget.turns,
+        "tokens": budget.tokens,
+        "wall_time_sec": round(time.perf_counter() - started, 3),
+        "component_time_sum_sec": round(sum(r["time_sec"] for r in results), 3),
+    }
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="FAA tables → GUMBO → Sireum agent workflow.")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="run spec/verify/repair per component concurrently instead of serial handoffs")
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--max-turns", type=int, default=30)
+    parser.add_argument("--max-tokens", type=int, default=0, help="token budget shared by --pipeline workers")
+    parser.add_argument("--trace", default=TRACE_PATH,
+                        help="JSONL span trace (summarize with `python -m tools.tracing`); empty to disable")
+    parser.add_argument("--llm-cache", choices=LLM_CACHE_MODES, default=os.getenv("LLM_CACHE_MODE", "off"),
+                        help="record model responses, or replay them offline (see tools/llm_cache.py)")
+    args = parser.parse_args(argv)
+    writer = TraceWriter(args.trace) if args.trace else None
+    llm_cache = LLMCache(args.llm_cache)
+
+    # pre-resolved, health-checked Codex server shared by every agent (CODEX_MCP_URL attaches to a running one)
+    async with CodexMCPManager() as manager:
+        codex_mcp_server = manager.server
+
+        if args.pipeline:
+            report = await run_pipeline(codex_mcp_server, args.concurrency, args.max_turns, args.max_tokens,
+                                        writer, llm_cache)
+            report["mcp"] = manager.stats()
+            report["llm_cache"] = llm_cache.stats()
+            print(json.dumps(report, indent=2))
+            return
 
+        agents = build_agents(codex_mcp_server)
+        cache_agents(agents.values(), llm_cache)
         task_list = f"""
 Goal: Build GUMBO annexes from FAA PDF and verify with Sireum.
 
 Inputs:
-- PDF: ./docs/Steve_Meller_FAA_docAR-08-32.pdf
-- Model: ./models/Monitor_no_gumbo.sysml
+- PDF: {PDF_PATH}
+- Model: {MODEL_PATH}
 
 Steps:
 - Extract tables from the PDF to JSON using Extractor (`extract_faa_tables`).
@@ -96,8 +371,13 @@ Steps:
 - Stop when verification passes, or limits are reached.
 """
 
-        result = await Runner.run(project_manager, task_list, max_turns=30)
+        if writer:
+            result = await traced_run(agents["project_manager"], task_list, writer, max_turns=args.max_turns)
+        else:
+            result = await Runner.run(agents["project_manager"], task_list, max_turns=args.max_turns)
         print(result.final_output)
+        if llm_cache.mode != "off":
+            print(json.dumps({"llm_cache": llm_cache.stats()}))
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+WORKFLOW_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(WORKFLOW_DIR, "tests", "fixtures")
+if WORKFLOW_DIR not in sys.path:
+    sys.path.insert(0, WORKFLOW_DIR)
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", help="also run the timing tests marked benchmark")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: wall-clock comparison, skipped unless --benchmark is given")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="timing test; run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
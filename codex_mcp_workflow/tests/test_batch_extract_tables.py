@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import FIXTURES
+from tools.batch_extract_tables import extract_document, jobs_from_directory, jobs_from_manifest, main, run_batch
+
+EXCERPT = os.path.join(FIXTURES, "faa_tables.txt")
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    for document in ("AR-08-32", "AR-09-11"):
+        (tmp_path / "docs" / document).mkdir(parents=True)
+        shutil.copy(EXCERPT, tmp_path / "docs" / document / f"{document}.txt")
+    return tmp_path
+
+
+def read_report(path):
+    with open(path, "r", encoding="utf-8") as infile:
+        return [json.loads(line) for line in infile]
+
+
+def test_manifest_batch_writes_tables_and_one_report_line_per_document(corpus):
+    manifest = corpus / "corpus.json"
+    manifest.write_text(json.dumps([
+        {"path": "docs/AR-08-32/AR-08-32.txt"},
+        {"path": "docs/AR-09-11/AR-09-11.txt", "output_dir": "elsewhere/AR-09-11"},
+    ]), encoding="utf-8")
+    jobs = jobs_from_manifest(str(manifest), str(corpus / "tables"), None)
+    assert [job["output_dir"] for job in jobs] == [
+        str(corpus / "tables" / "AR-08-32"), str(corpus / "elsewhere" / "AR-09-11"),
+    ]
+    reports = run_batch(jobs, str(corpus / "report.jsonl"), workers=2, cache_dir=None)
+    lines = read_report(corpus / "report.jsonl")
+    assert sorted(r["path"] for r in lines) == sorted(r["path"] for r in reports) == sorted(j["path"] for j in jobs)
+    for report in lines:
+        assert report["status"] == "ok" and len(report["tables"]) == 17
+        assert len(os.listdir(report["output_dir"])) == 17
+
+
+def test_documents_sharing_an_output_directory_are_rejected(corpus, capsys):
+    manifest = corpus / "corpus.json"
+    shutil.copy(EXCERPT, corpus / "docs" / "AR-09-11" / "AR-08-32.txt")
+    manifest.write_text(json.dumps([
+        {"path": "docs/AR-08-32/AR-08-32.txt"}, {"path": "docs/AR-09-11/AR-08-32.txt"},
+    ]), encoding="utf-8")
+    with pytest.raises(ValueError, match="share an output directory"):
+        jobs_from_manifest(str(manifest), str(corpus / "tables"), None)
+    with pytest.raises(SystemExit):
+        main(["--manifest", str(manifest), "--output-dir", str(corpus / "tables")])
+    assert "share an output directory" in capsys.readouterr().err
+
+    flat = corpus / "flat"
+    flat.mkdir()
+    shutil.copy(EXCERPT, flat / "report.txt")
+    (flat / "report.pdf").write_bytes(b"")
+    with pytest.raises(ValueError, match="share an output directory"):
+        jobs_from_directory(str(flat), str(corpus / "tables"), None)
+
+
+def test_cache_is_keyed_on_the_column_mode(corpus):
+    job = {"path": str(corpus / "docs" / "AR-08-32" / "AR-08-32.txt"), "output_dir": str(corpus / "out")}
+    cache_dir = str(corpus / "cache")
+    assert extract_document(job, "python", cache_dir=cache_dir)["cache_hit"] is False
+    assert extract_document(job, "python", cache_dir=cache_dir)["cache_hit"] is True
+    numpy = extract_document(job, "numpy", cache_dir=cache_dir)
+    assert numpy["cache_hit"] is False and numpy["status"] == "ok"
+
+
+def test_failures_are_reported_not_raised(corpus):
+    job = {"path": str(corpus / "missing.txt"), "output_dir": str(corpus / "out")}
+    report = extract_document(job, cache_dir=None)
+    assert report["status"] == "failed" and report["error"].startswith("FileNotFoundError")
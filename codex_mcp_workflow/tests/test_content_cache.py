@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from tools.content_cache import ContentCache, make_key
+
+
+def entry_size(cache, key):
+    return os.path.getsize(os.path.join(cache.root, f"{key}.json"))
+
+
+def age(cache, key, mtime):
+    os.utime(os.path.join(cache.root, f"{key}.json"), (mtime, mtime))
+
+
+def test_round_trip_and_unreadable_entries(tmp_path):
+    cache = ContentCache(str(tmp_path))
+    cache.put("a", {"rows": [1, 2], "name": "é"})
+    assert cache.get("a") == {"rows": [1, 2], "name": "é"}
+    assert cache.get("missing") is None
+    (tmp_path / "torn.json").write_text('{"rows": [1,', encoding="utf-8")
+    assert cache.get("torn") is None
+    assert make_key({"b": 1, "a": [2]}, "x") == make_key({"a": [2], "b": 1}, "x") != make_key({"a": [2], "b": 1}, "y")
+
+
+def test_failed_write_keeps_the_previous_entry(tmp_path):
+    cache = ContentCache(str(tmp_path))
+    cache.put("a", {"version": 1})
+    with pytest.raises(TypeError):
+        cache.put("a", {"version": object()})
+    assert cache.get("a") == {"version": 1}
+    assert sorted(os.listdir(tmp_path)) == ["a.json"]  # no temporary file left behind
+
+
+def test_eviction_drops_least_recently_used_down_to_low_water(tmp_path):
+    payload = {"data": "x" * 100}
+    probe = ContentCache(str(tmp_path / "probe"))
+    probe.put("k", payload)
+    size = entry_size(probe, "k")
+
+    cache = ContentCache(str(tmp_path / "cache"), max_bytes=size * 4)
+    for i, key in enumerate("abcd"):
+        cache.put(key, payload)
+        age(cache, key, 1_000_000 + i)
+    cache.get("a")  # a hit makes "a" the most recently used
+    cache.put("e", payload)  # five entries: over the limit, evict down to 90% of it
+    remaining = sorted(name[:-5] for name in os.listdir(cache.root))
+    assert remaining == ["a", "d", "e"]
+    assert cache._size == 3 * size <= cache.max_bytes * cache.LOW_WATER
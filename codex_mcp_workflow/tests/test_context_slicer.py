@@ -0,0 +1,49 @@
+import pytest
+
+from tools.context_slicer import slice_payload
+
+TABLES = [
+    {"table_id": "A-9", "title": "Table A-9. Manage Alarm Function Outputs", "columns": ["Name", "Type"],
+     "rows": [{"Name": "Alarm Control", "Type": "On_Off"}]},
+    {"table_id": "A-3", "title": "Table A-3. Regulate Temperature Variables", "columns": ["Name", "Type"],
+     "rows": [{"Name": "Lower Alarm Temperature", "Type": "Temp"}, {"Name": "Heat Control", "Type": "On_Off"},
+              {"Name": "Status", "Type": "Status"}]},
+    {"table_id": "A-20", "title": "Table A-20. Constants", "columns": ["Name", "Value", "Units"],
+     "rows": [{"Name": "Alarm Delay", "Value": "10", "Units": "sec"}, {"Name": "Heat Limit", "Value": "103"}]},
+]
+PAYLOAD = {
+    "requirements": [
+        "REQ-MA-1: If the Current Temperature is below the Lower Alarm Temp for the Alarm Delay, "
+        "the Alarm Control shall be On.",
+        "REQ-MHS-2: The Heat Control shall be Off when the Status is Failed.",
+    ],
+    "assumptions": ["The Lower Alarm Temperature is set by the nurse.", "Heat Control is idempotent."],
+    "variables": [{"text": "Alarm Control: On_Off"}, {"text": "Heat Control: On_Off"}],
+}
+
+
+def test_rows_follow_the_variables_the_component_mentions():
+    bundle = slice_payload(PAYLOAD, "MA", TABLES)
+    assert bundle["requirement_ids"] == ["REQ-MA-1"] and len(bundle["requirements"]) == 1
+    assert bundle["names"] == ["alarm control", "alarm delay", "lower alarm temp"]
+    assert bundle["tables"] == {
+        "A-9": {"title": TABLES[0]["title"], "columns": ["Name", "Type"], "rows": TABLES[0]["rows"]},
+        "A-3": {"title": TABLES[1]["title"], "columns": ["Name", "Type"],
+                "rows": [{"Name": "Lower Alarm Temperature", "Type": "Temp"}]},
+    }
+    assert bundle["constants"] == {"Alarm Delay": "10 sec"}  # constant rows move out of the tables
+    assert bundle["assumptions"] == PAYLOAD["assumptions"][:1]
+    assert bundle["variables"] == PAYLOAD["variables"][:1]
+
+
+def test_untagged_requirements_are_kept_when_they_mention_the_component():
+    payload = {"requirements": ["The Alarm Control shall be Off at start-up.", "The Heat Control shall be Off."]}
+    bundle = slice_payload(payload, "MA", TABLES)
+    assert bundle["requirements"] == payload["requirements"][:1] and bundle["requirement_ids"] == []
+
+
+def test_repeated_table_ids_are_labelled_by_document():
+    tables = [dict(TABLES[0], document=document) for document in ("AR-08-32", "AR-09-11")]
+    assert sorted(slice_payload(PAYLOAD, "MA", tables)["tables"]) == ["AR-08-32/A-9", "AR-09-11/A-9"]
+    with pytest.raises(ValueError, match="unknown component"):
+        slice_payload(PAYLOAD, "XX", tables)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from tools import sysml_writer
+from tools.embeddings import (
+    Embedder, HashingBackend, VectorStore, contract_distances, cosine_distances, paired_distances, text_key,
+)
+
+TEXTS = [
+    "guarantee g1 : alarm_control == On_Off.Onn;",
+    "assume a1 : lower_alarm_temp.degrees < upper_alarm_temp.degrees;",
+    "case MA_1 : assume monitor_mode == Init_Monitor_Mode; guarantee alarm_control == On_Off.Off;",
+]
+
+
+@pytest.fixture
+def store_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(sysml_writer, "LOCK_DIR", str(tmp_path / "locks"))
+    return str(tmp_path / "embeddings")
+
+
+def test_paired_distances_are_the_diagonal(store_root):
+    embedder = Embedder(HashingBackend(), VectorStore("hashing", store_root))
+    a, b = embedder.embed(TEXTS), embedder.embed(TEXTS[1:] + TEXTS[:1])
+    assert np.allclose(paired_distances(a, b), np.diag(cosine_distances(a, b)), atol=1e-6)
+    distances = contract_distances(embedder, {"x": TEXTS[0], "y": TEXTS[1], "z": "only here"},
+                                   {"x": TEXTS[0], "y": TEXTS[2]})
+    assert list(distances) == ["x", "y"]
+    assert distances["x"] == pytest.approx(0.0, abs=1e-6) and distances["y"] > 0.1
+
+
+def test_store_appends_and_reloads(store_root):
+    backend = HashingBackend()
+    embedder = Embedder(backend, VectorStore(backend.model, store_root))
+    first = embedder.embed(TEXTS[:2])
+    embedder.embed(TEXTS)
+    assert embedder.stats["embedded"] == 3 and embedder.stats["stored"] == 2
+
+    reloaded = Embedder(backend, VectorStore(backend.model, store_root))
+    again = reloaded.embed(TEXTS[:2])
+    assert reloaded.stats["embedded"] == 0 and reloaded.stats["backend_calls"] == 0
+    assert np.array_equal(again, first)
+
+
+def test_store_recovers_from_a_torn_write(store_root):
+    backend = HashingBackend(dim=16)
+    store = VectorStore(backend.model, store_root)
+    vectors = backend.embed(TEXTS)
+    keys = [text_key(text) for text in TEXTS]
+    store.put(keys[:1], vectors[:1])
+    # a writer crashed after appending its rows but halfway through its key line
+    with open(store.vectors_path, "ab") as outfile:
+        outfile.write(np.ones((2, 16), dtype=np.float32).tobytes())
+    with open(store.keys_path, "a", encoding="utf-8") as outfile:
+        outfile.write(keys[1][:20])
+
+    recovered = VectorStore(backend.model, store_root)
+    assert list(recovered.rows) == keys[:1]
+    recovered.put(keys[1:], vectors[1:])
+    reloaded = VectorStore(backend.model, store_root)
+    assert list(reloaded.rows) == keys
+    found = reloaded.get(keys)
+    for key, vector in zip(keys, vectors):
+        assert np.array_equal(found[key], vector)
@@ -0,0 +1,125 @@
+import glob
+import json
+import os
+import time
+
+import pytest
+
+from conftest import FIXTURES, WORKFLOW_DIR
+from tools.extract_isolette_tables import (
+    OUTPUT_DIR, TABLE_SPECS, TEXT_PATH, CaptionLocator, differing_tables, extract_tables, infer_columns,
+    infer_columns_numpy, load_lines, locate_specs, main,
+)
+
+GOLDEN_DIR = os.path.join(WORKFLOW_DIR, OUTPUT_DIR)
+FAA_TEXT = os.path.join(WORKFLOW_DIR, TEXT_PATH)
+# every golden table as pdftotext -layout prints it, with its notes, wrapped header and the
+# note that runs on past the table; the full FAA text is not checked in
+FAA_EXCERPT = os.path.join(FIXTURES, "faa_tables.txt")
+
+
+def goldens():
+    tables = {}
+    for path in sorted(glob.glob(os.path.join(GOLDEN_DIR, "*.json"))):
+        with open(path, "r", encoding="utf-8") as infile:
+            table = json.load(infile)
+        tables[table["table_id"]] = table
+    return tables
+
+
+def layout(columns, rows, indent="  ", gap=3):
+    """pdftotext -layout style lines: a header line, then one line per row."""
+    widths = [max([len(c)] + [len(row.get(c, "")) for row in rows]) + gap for c in columns]
+    render = lambda cells: (indent + "".join(cell.ljust(w) for cell, w in zip(cells, widths))).rstrip()
+    return [render(columns)], [render([row.get(c, "") for c in columns]) for row in rows]
+
+
+def rendered_document():
+    tables = goldens()
+    lines = ["Isolette Thermostat", ""]
+    for spec in TABLE_SPECS:
+        table = tables[spec["match"].split(". ", 1)[0]]
+        header, body = layout(table["columns"], table["rows"])
+        lines += [spec["match"], ""] + (header if spec["header_lines"] else []) + body + ["", "Body text.", ""]
+    return [line + "\n" for line in lines]
+
+
+@pytest.mark.parametrize("mode", ["python", "numpy"])
+def test_modes_reproduce_the_committed_tables(mode):
+    tables = list(extract_tables(load_lines(FAA_EXCERPT), TABLE_SPECS, mode))
+    assert sorted(filename for filename, _ in tables) == sorted(os.listdir(GOLDEN_DIR))
+    assert differing_tables(GOLDEN_DIR, tables) == []
+
+
+@pytest.mark.skipif(not os.path.exists(FAA_TEXT), reason=f"{TEXT_PATH} is not checked in")
+@pytest.mark.parametrize("mode", ["python", "numpy"])
+def test_modes_reproduce_the_committed_tables_from_the_full_text(mode):
+    assert differing_tables(GOLDEN_DIR, extract_tables(load_lines(FAA_TEXT), TABLE_SPECS, mode)) == []
+
+
+def test_modes_agree_on_the_rendered_tables():
+    lines = rendered_document()
+    python = list(extract_tables(lines, TABLE_SPECS, "python"))
+    assert len(python) == 17
+    assert list(extract_tables(lines, TABLE_SPECS, "numpy")) == python
+    tables = goldens()
+    for _, output in python:
+        if output["columns"][0] == "Name":
+            assert output["rows"] == tables[output["table_id"]]["rows"], output["table_id"]
+
+
+def test_caption_locator_finds_overlapping_captions():
+    locator = CaptionLocator(["Table A-1.", "Table A-12.", "A-12. Manage", "Table A-1."])
+    assert locator.patterns == ["Table A-1.", "Table A-12.", "A-12. Manage"]
+    lines = ["Table A-12. Manage Alarm\n", "see Table A-1. and Table A-1.\n", "Table A-1 without a dot\n"]
+    assert locator.locate(lines) == {"Table A-1.": [1], "Table A-12.": [0], "A-12. Manage": [0]}
+
+
+def test_duplicate_captions_warn_and_missing_ones_fail(capsys):
+    lines = rendered_document()
+    first = TABLE_SPECS[3]["match"]
+    doubled = lines + ["Appendix\n", first + "\n"]
+    ordered = locate_specs(doubled, TABLE_SPECS)
+    start = next(spec["start"] for spec in ordered if spec["match"] == first)
+    assert doubled[start].startswith(first)
+    assert f"'{first}' found on lines [{start}, {len(doubled) - 1}]; using line {start}" in capsys.readouterr().err
+
+    trimmed = [line for line in lines if not line.startswith((TABLE_SPECS[0]["match"], TABLE_SPECS[5]["match"]))]
+    with pytest.raises(RuntimeError) as raised:
+        locate_specs(trimmed, TABLE_SPECS)
+    assert f"'{TABLE_SPECS[0]['match']}'; '{TABLE_SPECS[5]['match']}'" in str(raised.value)
+
+
+def test_check_flag_compares_against_an_output_dir(tmp_path):
+    text = tmp_path / "report.txt"
+    text.write_text("".join(rendered_document()), encoding="utf-8")
+    assert main(["--text", str(text), "--output-dir", str(tmp_path / "out"), "--mode", "numpy"]) == 0
+    assert main(["--text", str(text), "--output-dir", str(tmp_path / "out"), "--check"]) == 0
+    assert main(["--text", str(text), "--output-dir", GOLDEN_DIR, "--check"]) == 1  # Table A-1 wraps differently
+
+
+def large_block(rows=2000):
+    table = goldens()["Table A-5"]
+    header, body = layout(table["columns"], (table["rows"] * rows)[:rows])
+    body[1::7] = ["      continued\tdescription of the row above"] * len(body[1::7])
+    return header, body, table["columns"]
+
+
+def test_numpy_columns_match_python_on_large_blocks():
+    header, body, columns = large_block()
+    assert infer_columns_numpy(header, body, columns) == infer_columns(header, body, columns)
+
+
+@pytest.mark.benchmark
+def test_numpy_columns_are_faster_on_large_blocks():
+    header, body, columns = large_block()
+
+    def best(infer):
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            infer(header, body, columns)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    assert best(infer_columns_numpy) < best(infer_columns)
@@ -0,0 +1,80 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import FIXTURES
+from tools import golden_index
+from tools.golden_index import GoldenIndex, annex_snippets, shared_golden_index
+
+with open(os.path.join(FIXTURES, "manage_alarm.gumbo"), "r", encoding="utf-8") as infile:
+    MANAGE_ALARM = infile.read()
+
+
+@pytest.fixture
+def golden(tmp_path):
+    root = tmp_path / "golden"
+    root.mkdir()
+    (root / "Monitor.sysml").write_text(
+        f'package Monitor {{\n  part def Manage_Alarm_i {{\n    language "GUMBO" /*{{{MANAGE_ALARM}}}*/\n  }}\n}}\n',
+        encoding="utf-8",
+    )
+    return root
+
+
+def test_annex_snippets_are_cases_and_clauses_with_their_section():
+    snippets = annex_snippets("Manage_Alarm_i", MANAGE_ALARM)
+    assert [(s["section"], s["kind"], s["name"]) for s in snippets] == [
+        ("integration", "assume", "Table_A_12_LowerAlarmTemp"),
+        ("integration", "assume", "Table_A_12_UpperAlarmTemp"),
+        ("integration", "assume", "Order"),
+        ("initialize", "guarantee", "initOff"),
+    ] + [("compute", "case", f"MA_{i}") for i in range(1, 6)]
+    case = snippets[5]
+    assert case["text"].startswith('case MA_2 "out of range": assume') and case["text"].endswith("On_Off.Onn;")
+    assert all(s["tokens"] > 0 for s in snippets)
+
+
+def test_search_ranks_best_first_and_filters_by_kind(golden, tmp_path):
+    index = GoldenIndex.build(str(golden), index_dir=str(tmp_path / "index"))
+    hits = index.search('case MA_5 "failed": assume monitor_mode == Failed_Monitor_Mode', k=3)
+    assert hits[0]["name"] == "MA_5"
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+    assumes = index.search("lower alarm temp below upper alarm temp", k=9, kind="assume")
+    assert {h["name"] for h in assumes} == {"Table_A_12_LowerAlarmTemp", "Table_A_12_UpperAlarmTemp", "Order"}
+
+    reloaded = GoldenIndex.build(str(golden), index_dir=str(tmp_path / "index"))
+    assert reloaded.snippets == index.snippets
+    assert [h["name"] for h in reloaded.search("failed monitor mode", k=3)] == \
+        [h["name"] for h in index.search("failed monitor mode", k=3)]
+
+
+def test_shared_index_is_built_once_across_threads(golden, tmp_path, monkeypatch):
+    builds = []
+    build = GoldenIndex.build.__func__
+
+    def counting_build(cls, path, backend=None, index_dir=None):
+        builds.append(path)
+        time.sleep(0.05)  # widen the window in which a second builder could start
+        return build(cls, path, backend, str(tmp_path / "index"))
+
+    monkeypatch.setattr(GoldenIndex, "build", classmethod(counting_build))
+    monkeypatch.setattr(golden_index, "_shared", {})
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        indexes = list(executor.map(lambda _: shared_golden_index(str(golden)), range(16)))
+    assert len(builds) == 1 and all(index is indexes[0] for index in indexes)
+    (saved,) = os.listdir(tmp_path / "index")  # one index file, no temporary left behind
+    assert saved.endswith(".npz") and not saved.endswith(".tmp.npz")
+
+
+@pytest.mark.benchmark
+def test_top_k_is_sub_millisecond(golden, tmp_path):
+    index = GoldenIndex.build(str(golden), index_dir=str(tmp_path / "index"))
+    index.search("warm up", k=5)
+    timings = []
+    for _ in range(50):
+        started = time.perf_counter()
+        index.search("alarm on when the temperature is out of range", k=5)
+        timings.append(time.perf_counter() - started)
+    assert sorted(timings)[len(timings) // 2] < 1e-3
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import FIXTURES
+from tools.gumbo_monitor import TraceEnv, monitor
+from tools.gumbo_parser import parse_annex
+from tools.gumbo_precheck import Annex
+
+
+@pytest.fixture(scope="module")
+def annex():
+    with open(os.path.join(FIXTURES, "manage_alarm.gumbo"), "r", encoding="utf-8") as infile:
+        return Annex(parse_annex(infile.read()))
+
+
+def trace(alarm):
+    steps = len(alarm)
+    return {
+        "run": np.zeros(steps, dtype=np.int64),
+        "monitor_mode": np.array(["Init_Monitor_Mode"] + ["Normal_Monitor_Mode"] * (steps - 1)),
+        "current_tempWstatus.degrees": np.array([98.0, 98.0, 103.0, 103.0, 99.0]),
+        "lower_alarm_temp.degrees": np.full(steps, 97),
+        "upper_alarm_temp.degrees": np.full(steps, 101),
+        "alarm_control": np.array(alarm),
+    }
+
+
+def case(report, name):
+    return next(item for item in report["cases"] if item["name"] == name)
+
+
+def test_conforming_trace_passes(annex):
+    report = monitor(annex, trace(["Off", "Off", "Onn", "Onn", "Off"]), {"lastCmd": "alarm_control"}, latencies=[])
+    assert report["status"] == "passed"
+    assert all(case(report, name)["violations"] == 0 for name in ("MA_1", "MA_2", "MA_4"))
+
+
+def test_first_violation_is_reported(annex):
+    report = monitor(annex, trace(["Off", "Off", "Onn", "Off", "Off"]), {"lastCmd": "alarm_control"}, latencies=[])
+    assert report["status"] == "failed"
+    out_of_range = case(report, "MA_2")
+    assert out_of_range["violations"] == 1
+    assert out_of_range["first_violation"]["step"] == 3
+
+
+def test_alias_to_missing_column_is_a_clear_error(annex):
+    with pytest.raises(ValueError, match="no column 'alarm_cmd'"):
+        TraceEnv(annex, trace(["Off"] * 5), {"lastCmd": "alarm_cmd"})
@@ -0,0 +1,43 @@
+import os
+
+import pytest
+from lark import Tree
+
+from conftest import FIXTURES
+from tools.bench_gumbo_parse import generate_annex
+from tools.gumbo_parser import annex_bodies, build_parser, comparable, parse_annex, parse_with
+
+with open(os.path.join(FIXTURES, "manage_alarm.gumbo"), "r", encoding="utf-8") as infile:
+    MANAGE_ALARM = infile.read()
+
+
+@pytest.mark.parametrize("annex", [MANAGE_ALARM, generate_annex(5)], ids=["manage_alarm", "generated"])
+def test_lalr_and_earley_trees_are_equal(annex):
+    lalr = parse_annex(annex)
+    earley = parse_annex(annex, lalr=False)
+    assert lalr.data == "start"
+    assert comparable(lalr) == comparable(earley)
+
+
+def test_comparable_only_maps_keyword_identifiers():
+    earley = parse_annex("integration assume A1 : true;", lalr=False)
+    lalr = parse_annex("integration assume A1 : true;")
+    assert list(lalr.find_data("true_literal")) and not list(lalr.find_data("var"))
+    assert comparable(earley) == comparable(lalr)
+    renamed = parse_annex("integration assume A1 : truth;", lalr=False)
+    assert comparable(renamed) != comparable(lalr)
+
+
+def test_cached_parser_gives_the_same_tree(tmp_path):
+    cache_path = str(tmp_path / "gumbo_lalr.parser")
+    cold = build_parser(cache_path=cache_path)
+    assert os.path.exists(cache_path)
+    warm = build_parser(cache_path=cache_path)
+    annex = generate_annex(3)
+    assert parse_with(warm, annex) == parse_with(cold, annex)
+
+
+def test_annex_bodies_of_a_sysml_source():
+    source = f'part def A {{ language "GUMBO" /*{{{MANAGE_ALARM}}}*/ }}\npart def B {{ }}'
+    assert annex_bodies(source) == [MANAGE_ALARM]
+    assert isinstance(parse_annex(source), Tree)
@@ -0,0 +1,50 @@
+import os
+
+from conftest import FIXTURES
+from tools.gumbo_precheck import precheck_annex, precheck_part
+from tools.sysml_index import drop_index
+
+with open(os.path.join(FIXTURES, "manage_alarm.gumbo"), "r", encoding="utf-8") as infile:
+    MANAGE_ALARM = infile.read()
+
+NORMAL_BAND = "lower_alarm_temp.degrees + 1 <= current_tempWstatus.degrees"
+
+
+def test_manage_alarm_passes():
+    report = precheck_annex(MANAGE_ALARM)
+    assert report["status"] == "passed"
+    assert report["gaps"] == 0 and report["contradictions"] == 0 and report["overlaps"] == []
+    assert [case["case"] for case in report["cases"]] == ["MA_1", "MA_2", "MA_3", "MA_4", "MA_5"]
+    assert not any(case["dead"] or case["unsat"] for case in report["cases"])
+    assert report["inputs"]["monitor_mode"] == 3
+
+
+def test_overlapping_cases_with_different_outputs_fail():
+    # a 2-degree MA_3 hysteresis band (alarm unchanged) reaches into MA_2 (On), and MA_4 (Off) starts inside it
+    annex = MANAGE_ALARM.replace(NORMAL_BAND, "lower_alarm_temp.degrees <= current_tempWstatus.degrees")
+    annex = annex.replace("t < lo + 1;", "t < lo + 2;")
+    report = precheck_annex(annex)
+    assert report["status"] == "failed"
+    assert report["contradictions"] > 0
+    assert {tuple(overlap["cases"]) for overlap in report["overlaps"] if overlap["conflicts"]} == {("MA_2", "MA_3"), ("MA_3", "MA_4")}
+    witness = report["contradiction_witnesses"][0]
+    assert witness["monitor_mode"].endswith("Normal_Monitor_Mode")
+
+
+def test_uncovered_inputs_are_reported_as_gaps():
+    report = precheck_annex(MANAGE_ALARM.replace(NORMAL_BAND, NORMAL_BAND.replace("+ 1", "+ 2")))
+    assert report["gaps"] > 0
+    assert report["gap_witnesses"][0]["monitor_mode"].endswith("Normal_Monitor_Mode")
+
+
+def test_precheck_part_reads_the_annex_from_a_sysml_tree(tmp_path):
+    (tmp_path / "Monitor.sysml").write_text(
+        "package Monitor {\n  part def Manage_Alarm_i {\n"
+        f'    language "GUMBO" /*{{{MANAGE_ALARM}}}*/\n  }}\n  part def Empty_i {{ }}\n}}\n',
+        encoding="utf-8",
+    )
+    try:
+        assert precheck_part(str(tmp_path), "Manage_Alarm_i")["status"] == "passed"
+        assert precheck_part(str(tmp_path), "Empty_i")["status"] == "no_annex"
+    finally:
+        drop_index(str(tmp_path))
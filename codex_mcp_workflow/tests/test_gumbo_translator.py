@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from conftest import FIXTURES
+from tools.gumbo_parser import comparable, parse_annex
+from tools.gumbo_tools import gumbo_annex
+from tools.gumbo_translator import range_assumes, translate_requirements
+
+with open(os.path.join(FIXTURES, "requirements.txt"), "r", encoding="utf-8") as infile:
+    REQUIREMENTS = [line.strip() for line in infile if line.strip()]
+
+MODE = "Isolette_Data_Model::Monitor_Mode"
+ON_OFF = "Isolette_Data_Model::On_Off"
+
+
+def test_manage_alarm_statements():
+    translation = translate_requirements(REQUIREMENTS, "MA")
+    cases = {case["id"]: case for case in translation["cases"]}
+    assert list(cases) == ["REQ_MA_1", "REQ_MA_2", "REQ_MA_3", "REQ_MA_4", "REQ_MA_5"]
+    assert cases["REQ_MA_1"]["rule"] == "R1"
+    assert cases["REQ_MA_1"]["assume"] == f"monitor_mode == {MODE}.Init_Monitor_Mode"
+    assert cases["REQ_MA_1"]["guarantee"] == f"alarm_control == {ON_OFF}.Off"
+    assert cases["REQ_MA_2"]["assume"] == (
+        f"monitor_mode == {MODE}.Normal_Monitor_Mode & (current_tempWstatus.degrees < lower_alarm_temp.degrees"
+        " | current_tempWstatus.degrees > upper_alarm_temp.degrees)"
+    )
+    # "shall not be changed" keeps the previous command in a state variable
+    assert cases["REQ_MA_3"]["rule"] == "R2"
+    assert cases["REQ_MA_3"]["guarantee"] == "alarm_control == In(lastCmd)"
+    assert "lower_alarm_temp.degrees + 0.5" in cases["REQ_MA_3"]["assume"]
+    assert translation["state"] == {"lastCmd": ON_OFF}
+    assert translation["unmatched"] == [] and translation["local_fraction"] == 1.0
+
+
+def test_other_rules_and_unmatched_statements():
+    mri = translate_requirements(REQUIREMENTS, "MRI")["cases"][0]
+    assert mri["rule"] == "R5"
+    assert mri["guarantee"] == "displayed_temp.degrees == round_to_nearest_int(current_tempWstatus.degrees)"
+    assert translate_requirements(REQUIREMENTS, "MMI")["cases"][-1]["rule"] == "R4"
+
+    mrm = translate_requirements(REQUIREMENTS, "MRM")
+    assert [case["rule"] for case in mrm["cases"]] == ["R7"]
+    assert [item["text"][:9] for item in mrm["unmatched"]] == ["REQ-MRM-3"]
+    assert mrm["local_fraction"] == 0.5
+
+    other = translate_requirements(["The Thermostat shall be nice.", "Not a requirement."], "MA")
+    assert [item["reason"] for item in other["unmatched"]] == ["no rule matches", "not a shall statement"]
+
+
+def test_range_assumes_come_from_the_tables():
+    names = {a["name"]: a["expr"] for a in range_assumes(["lower_alarm_tempWstatus.degrees"])}
+    assert names["TableA_12_LowerAlarmTemp"] == (
+        "96 [s32] <= lower_alarm_tempWstatus.degrees & lower_alarm_tempWstatus.degrees <= 101 [s32]"
+    )
+
+
+@pytest.mark.parametrize("component", ["MA", "MMI", "MRI", "MRM", "MHS"])
+def test_generated_annex_parses_under_both_grammars(component):
+    requirements = [r for r in REQUIREMENTS if f"REQ-{component}-" in r]
+    annex = gumbo_annex({"requirements": requirements, "assumptions": [{"raw": "sensor is calibrated"}]})
+    lalr = parse_annex(annex)
+    assert comparable(lalr) == comparable(parse_annex(annex, lalr=False))
+    case_ids = [case.children[0] for case in lalr.find_data("case_statement")]
+    translation = translate_requirements(REQUIREMENTS, component)
+    # translated cases first, then a placeholder per unmatched statement
+    assert case_ids[:len(translation["cases"])] == [case["id"] for case in translation["cases"]]
+    assert len(case_ids) == len(translation["cases"]) + len(translation["unmatched"])
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+import tempfile
+
+import pytest
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+from tools.llm_cache import CachedModel, LLMCache, LLMCacheMiss, normalize_input
+
+TMP = tempfile.gettempdir()
+
+
+def transcript(call_id, workdir, time_sec):
+    return [
+        {"role": "user", "content": f"Verify the model in {workdir}/model"},
+        {"type": "function_call", "id": f"fc_{call_id}", "call_id": call_id, "name": "verify_model",
+         "arguments": json.dumps({"dir": f"{workdir}/model"})},
+        {"type": "function_call_output", "call_id": call_id,
+         "output": json.dumps({"verified": 3, "time_sec": time_sec, "log": f"{workdir}/model/out.log"})},
+    ]
+
+
+class FakeModel(Model):
+    def __init__(self, text="annex"):
+        self.text = text
+        self.calls = 0
+
+    async def get_response(self, *args, **kwargs):
+        self.calls += 1
+        message = ResponseOutputMessage(id="msg_1", type="message", role="assistant", status="completed",
+                                        content=[ResponseOutputText(type="output_text", text=self.text,
+                                                                    annotations=[])])
+        return ModelResponse(output=[message], usage=Usage(requests=1, input_tokens=90, output_tokens=10,
+                                                           total_tokens=100), response_id="resp_1")
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def respond(model, input):
+    return asyncio.run(model.get_response("Repair the annex.", input, None, [], None, [], None))
+
+
+def test_call_ids_temp_paths_and_timings_do_not_change_the_key():
+    first = transcript("call_abc", os.path.join(TMP, "pipeline-x1"), 1.5)
+    second = transcript("call_xyz", os.path.join(TMP, "pipeline-y2"), 9.25)
+    assert normalize_input(first) == normalize_input(second)
+    assert normalize_input(first)[1]["call_id"] == "call_0"
+    assert normalize_input(first)[2]["output"] == {"verified": 3, "log": "<tmp>/model/out.log"}
+    changed = transcript("call_abc", os.path.join(TMP, "pipeline-x1"), 1.5)
+    changed[2]["output"] = json.dumps({"verified": 2})
+    assert normalize_input(changed) != normalize_input(first)
+
+
+def test_recorded_response_is_replayed_for_an_equivalent_transcript(tmp_path):
+    root = str(tmp_path / "llm")
+    model = FakeModel()
+    respond(CachedModel("Repair", model, LLMCache("record", root)), transcript("a", os.path.join(TMP, "run-1"), 1.0))
+    assert model.calls == 1
+
+    cache = LLMCache("replay", root)
+    replay = CachedModel("Repair", model, cache)
+    response = respond(replay, transcript("b", os.path.join(TMP, "run-2"), 7.0))
+    assert response.output[0].content[0].text == "annex" and response.response_id is None
+    assert model.calls == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["tokens_saved"] == 100
+
+
+def test_replay_miss_raises_without_calling_the_model(tmp_path):
+    model = FakeModel()
+    cache = LLMCache("replay", str(tmp_path / "llm"))
+    with pytest.raises(LLMCacheMiss, match="Repair"):
+        respond(CachedModel("Repair", model, cache), transcript("a", os.path.join(TMP, "run-1"), 1.0))
+    assert model.calls == 0 and cache.stats()["misses"] == 1
+
+    auto = LLMCache("auto", str(tmp_path / "llm"))
+    respond(CachedModel("Repair", model, auto), transcript("a", os.path.join(TMP, "run-1"), 1.0))
+    respond(CachedModel("Repair", model, auto), transcript("a", os.path.join(TMP, "run-1"), 1.0))
+    assert model.calls == 1 and (auto.hits, auto.misses) == (1, 1)
@@ -0,0 +1,52 @@
+import asyncio
+import os
+import sys
+
+from conftest import WORKFLOW_DIR
+from tools.mcp_manager import CodexMCPManager
+
+STUB = [sys.executable, os.path.join(WORKFLOW_DIR, "tools", "stub_mcp_server.py")]
+
+
+def reply_text(result):
+    return result.content[0].text
+
+
+async def wait_for_restart(manager, restarts, timeout=30.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while manager.restarts < restarts:
+        assert asyncio.get_running_loop().time() < deadline, "server was not restarted"
+        await asyncio.sleep(0.05)
+
+
+def test_stub_server_lists_the_codex_tools():
+    async def run():
+        async with CodexMCPManager(STUB, health_interval=60) as manager:
+            tools = await manager.server.list_tools()
+            result = await manager.server.call_tool("codex", {"prompt": "hello"})
+            return {tool.name for tool in tools}, reply_text(result), manager.stats()
+
+    names, reply, stats = asyncio.run(run())
+    assert names == {"codex", "codex-reply"}
+    assert reply == "[codex-stub] hello"
+    assert stats["command"] == STUB and len(stats["startup_sec"]) == 1 and stats["restarts"] == 0
+
+
+def test_crashed_server_is_restarted_in_place():
+    async def run():
+        async with CodexMCPManager(STUB, health_interval=60, health_timeout=5) as manager:
+            server = manager.server
+            try:
+                await asyncio.wait_for(server.call_tool("codex", {"prompt": "STUB_MCP_CRASH"}), 2)
+            except Exception:
+                pass
+            manager.request_health_check()
+            await wait_for_restart(manager, 1)
+            # agents keep the same server object; it works again after the restart
+            assert manager.server is server
+            result = await server.call_tool("codex-reply", {"prompt": "again"})
+            return reply_text(result), manager.stats()
+
+    reply, stats = asyncio.run(run())
+    assert reply == "[codex-stub] again"
+    assert stats["restarts"] == 1 and stats["failed_checks"] >= 1 and len(stats["startup_sec"]) == 2
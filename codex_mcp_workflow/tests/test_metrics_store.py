@@ -0,0 +1,57 @@
+import json
+import random
+
+import pytest
+
+from tools.metrics_store import MetricsStore, P2Median
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetricsStore(str(tmp_path / "metrics.sqlite"))
+    yield store
+    store.close()
+
+
+def test_median_is_exact_below_five_values():
+    median = P2Median()
+    assert median.value() is None
+    for value, expected in ((4.0, 4.0), (1.0, 2.5), (9.0, 4.0), (2.0, 3.0)):
+        median.add(value)
+        assert median.value() == expected
+
+
+def test_streaming_median_tracks_the_true_median_across_restarts():
+    values = list(range(2001))
+    random.Random(7).shuffle(values)
+    median = P2Median()
+    for value in values[:1000]:
+        median.add(value)
+    median = P2Median(json.loads(json.dumps(median.state())))  # as stored between appends
+    for value in values[1000:]:
+        median.add(value)
+    assert median.value() == pytest.approx(1000, abs=40)
+
+
+def test_aggregates_fold_numeric_fields_per_plan_and_kind(store):
+    for tokens, runtime, verified in ((1000, 60.0, True), (3000, 120.0, False), (2000, 60.0, True)):
+        store.append("final", {"final_tokens": tokens, "final_runtime": runtime, "verified": verified,
+                               "note": "text is not aggregated", "skipped": float("nan")},
+                     plan="v3", contract="Manage_Alarm_i")
+    store.append("baseline", {"baseline_tokens": 9000, "baseline_runtime": 600.0}, plan="v3")
+    store.append("final", {"final_tokens": 5}, plan="other")
+
+    final = store.aggregates("v3")["final"]
+    assert set(final) == {"final_tokens", "final_runtime", "verified"}
+    assert final["final_tokens"] == {"count": 3, "sum": 6000.0, "mean": 2000.0, "min": 1000.0, "max": 3000.0,
+                                     "median": 2000.0}
+    assert final["verified"]["sum"] == 2
+
+    report = store.report("v3")
+    assert report["tokens_saved"] == 3000.0 and report["runtime_saved"] == 360.0
+    assert report["contracts_per_minute"] == pytest.approx(2 / 4)
+    assert report["contracts_per_1k_tokens"] == pytest.approx(2 / 6)
+    assert report["median_final_runtime"] == 60.0
+
+    assert [r["final_tokens"] for r in store.query(kind="final", plan="v3")] == [1000, 3000, 2000]
+    assert [r["plan"] for r in store.query(contract="Manage_Alarm_i", limit=2)] == ["v3", "v3"]
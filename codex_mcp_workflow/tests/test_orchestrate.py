@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from agents.exceptions import MaxTurnsExceeded
+
+import orchestrate
+from orchestrate import RunBudget, component_worker
+
+
+def run_record(turns, tokens):
+    return SimpleNamespace(raw_responses=[None] * turns,
+                           context_wrapper=SimpleNamespace(usage=SimpleNamespace(total_tokens=tokens)))
+
+
+def fake_runner(monkeypatch, outcomes):
+    """Runner.run replaced by one that replays `outcomes`: (turns, tokens) or an exception."""
+    calls = []
+
+    async def run(agent, prompt, max_turns):
+        calls.append(max_turns)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return run_record(*outcome)
+
+    monkeypatch.setattr(orchestrate.Runner, "run", run)
+    return calls
+
+
+def max_turns_exceeded(turns, tokens):
+    exc = MaxTurnsExceeded(f"Max turns ({turns}) exceeded")
+    exc.run_data = run_record(turns, tokens)
+    return exc
+
+
+def test_runs_return_unused_turns_and_charge_tokens(monkeypatch):
+    calls = fake_runner(monkeypatch, [(2, 500), (3, 700)])
+    budget = RunBudget(max_turns=12)
+    assert asyncio.run(budget.run("agent", "prompt", max_turns=10)) is not None
+    assert asyncio.run(budget.run("agent", "prompt", max_turns=10)) is not None
+    assert calls == [10, 10]  # the first run gave back the 8 turns it did not use
+    assert (budget.turns, budget.tokens) == (5, 1200)
+
+
+def test_max_turns_exceeded_is_charged_to_the_budget(monkeypatch):
+    fake_runner(monkeypatch, [max_turns_exceeded(6, 9000), (1, 10)])
+    budget = RunBudget(max_turns=20, max_tokens=8000)
+    with pytest.raises(MaxTurnsExceeded):
+        asyncio.run(budget.run("agent", "prompt", max_turns=6))
+    assert (budget.turns, budget.tokens) == (6, 9000)
+    assert budget.exhausted
+    assert asyncio.run(budget.run("agent", "prompt", max_turns=6)) is None
+
+
+def test_other_failures_charge_what_the_run_used(monkeypatch):
+    failure = orchestrate.AgentsException("model refused")
+    failure.run_data = run_record(1, 300)
+    fake_runner(monkeypatch, [failure, RuntimeError("network down")])
+    budget = RunBudget(max_turns=10)
+    with pytest.raises(orchestrate.AgentsException):
+        asyncio.run(budget.run("agent", "prompt", max_turns=6))
+    with pytest.raises(RuntimeError):
+        asyncio.run(budget.run("agent", "prompt", max_turns=6))
+    assert (budget.turns, budget.tokens) == (1, 300)
+
+
+def test_a_failing_worker_does_not_affect_the_others(monkeypatch, tmp_path):
+    async def spec_verify_repair(code, part, agents, budget, semaphore, tables_json, workspace, model_path,
+                                 status, *rest):
+        async with semaphore:
+            await asyncio.sleep(0)
+        if code == "MA":
+            raise MaxTurnsExceeded("Max turns (10) exceeded")
+        if code == "MRI":
+            raise ValueError("unreadable tables")
+        status["status"] = "verified"
+
+    monkeypatch.setattr(orchestrate, "_spec_verify_repair", spec_verify_repair)
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(2)
+        return await asyncio.gather(*(
+            component_worker(code, f"{code}_i", {}, RunBudget(10), semaphore, "tables.json", str(tmp_path))
+            for code in ("MA", "MRI", "MHS")
+        ))
+
+    statuses = asyncio.run(run_all())
+    assert [s["status"] for s in statuses] == ["max_turns", "error", "verified"]
+    assert statuses[1]["error"] == "ValueError: unreadable tables"
+    assert all("time_sec" in s for s in statuses)
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from tools import async_tools, pdf_tools
+from tools.pdf_tools import iter_page_batches, page_ranges, parse_page_count, scan_sections
+
+PAGES = [
+    "Monitored Variables\nName    Type\ncurrent_temp    Temp\n",
+    "lower_desired_temp    Temp\nControlled Variables\nName    Type\n",
+    "heat_control    On_Off\nRequirements\nID    Condition    Action\n",
+    "REQ-MHS-1    Startup    Off\n",
+    "REQ-MHS-2    Normal    On\nAssumptions\nID\n",
+    "A-1    Sensor    accurate\n",
+]
+
+
+def fake_pdftotext(pdf_path, first=None, last=None):
+    """Pages of a form-feed separated text file, standing in for pdftotext in the pool."""
+    with open(pdf_path, "r", encoding="utf-8") as infile:
+        pages = infile.read().split("\f")
+    if first is None:
+        return "".join(pages)
+    time.sleep(0.02 * (len(pages) - first))  # later batches finish first
+    return "".join(pages[first - 1:last])
+
+
+def test_page_batches_stream_in_page_order(tmp_path, monkeypatch):
+    document = tmp_path / "doc.pdf"
+    document.write_text("\f".join(PAGES), encoding="utf-8")
+    monkeypatch.setattr(pdf_tools, "_pdftotext", fake_pdftotext)
+    monkeypatch.setattr(pdf_tools, "_page_count", lambda path: len(PAGES))
+    batches = iter_page_batches(str(document), pages_per_batch=2, max_workers=1)
+    assert next(batches) == PAGES[0] + PAGES[1]
+    assert list(batches) == [PAGES[2] + PAGES[3], PAGES[4] + PAGES[5]]
+    monkeypatch.setattr(pdf_tools, "_page_count", lambda path: None)  # pdfinfo missing: one conversion
+    assert list(iter_page_batches(str(document))) == ["".join(PAGES)]
+
+
+def test_sections_span_batches_and_split_shared_lines():
+    rows = scan_sections(PAGES)
+    assert [row["cells"][0] for row in rows["Monitored Variables"]] == ["current_temp", "lower_desired_temp"]
+    assert [row["cells"][0] for row in rows["Controlled Variables"]] == ["heat_control"]
+    assert [row["cells"][0] for row in rows["Requirements"]] == ["REQ-MHS-1", "REQ-MHS-2"]
+    assert scan_sections(["".join(PAGES)]) == rows  # batch boundaries do not matter
+
+    shared = scan_sections(["Assumptions    Monitor Interface\n", "MI-1    display    on\n"])
+    assert shared["Assumptions"] == [] and [r["cells"][0] for r in shared["Monitor Interface"]] == ["MI-1"]
+
+
+def test_page_ranges_split_into_batches():
+    assert parse_page_count("Title: x\nPages:          11\n") == 11
+    assert page_ranges(11, 4) == [(1, 4), (5, 8), (9, 11)]
+    assert page_ranges(4, 4) == [] and page_ranges(None, 4) == []
+
+
+def test_async_payload_streams_through_a_bounded_window(monkeypatch):
+    in_flight = []
+    peak = [0]
+
+    async def run_process(args, timeout=None, cwd=None):
+        return 0, f"Pages: {len(PAGES)}\n".encode(), b""
+
+    async def pdftotext_async(pdf_path, first=None, last=None):
+        in_flight.append(first)
+        peak[0] = max(peak[0], len(in_flight))
+        await asyncio.sleep(0.01 * (len(PAGES) - first))  # later pages finish first
+        in_flight.remove(first)
+        return "".join(PAGES[first - 1:last])
+
+    async def unlimited(kind, awaitable, timeout=None):
+        return await awaitable
+
+    monkeypatch.setattr(async_tools, "run_process", run_process)
+    monkeypatch.setattr(async_tools, "limited", unlimited)
+    monkeypatch.setattr(async_tools, "pdftotext_async", pdftotext_async)
+    monkeypatch.setitem(async_tools.LIMITS, "pdf", [1, 10.0])
+    payload = asyncio.run(async_tools.extract_faa_payload_async("doc.pdf", pages_per_batch=1))
+    expected = scan_sections(PAGES)
+    assert peak[0] == 2  # two batches per pdf slot, however fast the later pages finish
+    assert payload["variables"] == expected["Monitored Variables"] + expected["Controlled Variables"]
+    assert [row["cells"][0] for row in payload["requirements"]] == ["REQ-MHS-1", "REQ-MHS-2"]
+    assert [row["cells"][0] for row in payload["assumptions"]] == ["A-1"]
@@ -0,0 +1,32 @@
+import pytest
+
+from tools.salvage import SalvageEngine
+
+CANDIDATES = [f"c{i}" for i in range(24)]
+
+
+def greedy(bad):
+    return [c for c in CANDIDATES if c not in bad]
+
+
+@pytest.mark.parametrize("bad", [set(), {"c5"}, {"c1", "c9", "c17"}, set(CANDIDATES[::2]), set(CANDIDATES)])
+@pytest.mark.parametrize("workers", [1, 3])
+def test_same_result_as_one_at_a_time(bad, workers):
+    result = SalvageEngine(lambda subset: not subset & bad, workers).run(CANDIDATES)
+    assert result["accepted"] == greedy(bad)
+    assert sorted(result["rejected"]) == sorted(bad)
+
+
+def test_few_rejections_save_calls():
+    result = SalvageEngine(lambda subset: "c5" not in subset, workers=1).run(CANDIDATES)
+    assert result["strategy"] == "bisection"
+    assert result["verify_calls"] < len(CANDIDATES)
+    assert result["calls_saved"] == len(CANDIDATES) - result["verify_calls"]
+
+
+def test_many_rejections_fall_back_to_greedy():
+    bad = set(CANDIDATES[::2])
+    result = SalvageEngine(lambda subset: not subset & bad, workers=1).run(CANDIDATES)
+    assert result["strategy"] == "bisection+greedy"
+    assert result["calls_saved"] >= 0 and result["wall_time_saved_sec"] >= 0
+    assert result["calls_over_greedy"] == max(0, result["verify_calls"] - len(CANDIDATES))
@@ -0,0 +1,154 @@
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pytest
+
+from conftest import WORKFLOW_DIR
+from tools import sireum_runner
+from tools.sireum_runner import SireumPool, VerificationJob, model_level_job, run_jobs
+from tools.sireum_tools import verify_model
+from tools.verification_cache import verification_cache
+
+FAKE_SIREUM = os.path.join(WORKFLOW_DIR, "tools", "fake_sireum.py")
+SERVER = [sys.executable, FAKE_SIREUM, "server"]
+
+DATA = """package Isolette_Data_Model {
+  attribute def Temp { attribute degrees : Integer; }
+}
+"""
+COMPONENTS = """package Comp {
+  part def Sensor {
+    out port temp : DataPort { out :>> type : Isolette_Data_Model::Temp; }
+    language "GUMBO" /*{
+      integration
+        guarantee g1 : temp.degrees >= 1;
+    }*/
+  }
+  part def Monitor {
+    in port temp : DataPort { in :>> type : Isolette_Data_Model::Temp; }
+    language "GUMBO" /*{
+      integration
+        assume a1 : temp.degrees >= 0;
+    }*/
+  }
+  part def Sys {
+    part s : Sensor;
+    part m : Monitor;
+    connection c1 : PortConnection connect s.temp to m.temp;
+  }
+}
+"""
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    monkeypatch.setattr(sireum_runner, "SIREUM", FAKE_SIREUM)
+    monkeypatch.setattr(sireum_runner, "SIREUM_SERVER_CMD", "")
+    monkeypatch.setattr("tools.verification_cache.CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("SIREUM_VERSION", "fake")
+    root = tmp_path / "sysml"
+    root.mkdir()
+    (root / "Data.sysml").write_text(DATA)
+    (root / "Comp.sysml").write_text(COMPONENTS)
+    return root
+
+
+def test_cold_run_then_cached(model):
+    first = verify_model(str(model))
+    assert first["metrics"]["mode"] == "cold"
+    assert first["metrics"]["verified"] == 2 and first["metrics"]["cache_hit"] is False
+    assert {p["name"] for p in first["proofs"]} == {"Sensor", "Monitor"}
+
+    second = verify_model(str(model))
+    assert second["metrics"]["cache_hit"] is True
+    assert second["metrics"]["components_reused"] == 2
+    assert second["proofs"] == first["proofs"]
+
+
+def test_edit_rechecks_only_dependents(model):
+    verify_model(str(model))
+    comp = model / "Comp.sysml"
+    comp.write_text(comp.read_text().replace("temp.degrees >= 0;", "temp.degrees >= 0 FAKE_FAIL;"))
+    report = verify_model(str(model))
+    assert report["metrics"]["components_rechecked"] == 1
+    assert report["metrics"]["failed"] == 1
+    (error,) = report["parse_errors"]
+    assert error["file"] == str(comp) and error["job"] == "Comp::Monitor"
+
+    # Monitor depends on Sensor through the connection, and both use Temp
+    data = model / "Data.sysml"
+    data.write_text(data.read_text().replace("degrees : Integer;", "degrees : Integer; attribute unit : String;"))
+    assert verify_model(str(model))["metrics"]["components_rechecked"] == 2
+
+
+def test_results_are_shared_across_copies(model, tmp_path):
+    verify_model(str(model))
+    copy = tmp_path / "copy"
+    shutil.copytree(model, copy)
+    assert verify_model(str(copy))["metrics"]["cache_hit"] is True
+    assert len(os.listdir(verification_cache().root)) == 2
+
+
+def test_warm_pool_waits_for_ready_line(monkeypatch):
+    monkeypatch.setenv("FAKE_SIREUM_STARTUP", "0.3")
+    pool = SireumPool(SERVER, size=2)
+    try:
+        assert len(pool.startup_sec) == 2
+        assert all(sec >= 0.3 for sec in pool.startup_sec)
+    finally:
+        pool.close()
+
+
+def test_batch_runs_on_all_servers(model, monkeypatch):
+    monkeypatch.setenv("FAKE_SIREUM_DELAY", "0.4")
+    pool = SireumPool(SERVER, size=2)
+    try:
+        started = time.perf_counter()
+        results = run_jobs([model_level_job(str(model), name=str(i)) for i in range(2)], pool)
+        elapsed = time.perf_counter() - started
+    finally:
+        pool.close()
+    assert [r["status"] for r in results] == ["verified", "verified"]
+    assert elapsed < 0.8
+
+
+def test_timeout_and_cancel_kill_the_run(model, tmp_path):
+    comp = model / "Comp.sysml"
+    comp.write_text(comp.read_text().replace("temp.degrees >= 1;", "temp.degrees >= 1 FAKE_HANG;"))
+    job = VerificationJob("hang", ["hamr", "sysml", "logika", "--sourcepath", str(model)], timeout=0.3)
+    assert run_jobs([job])[0]["status"] == "timeout"
+
+    pool = SireumPool(SERVER, size=1)
+    try:
+        assert pool.run(job)["status"] == "timeout"
+        assert pool.restarts == 1
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+        job.timeout = 30
+        started = time.perf_counter()
+        assert pool.run(job, cancel)["status"] == "cancelled"
+        assert time.perf_counter() - started < 5
+    finally:
+        pool.close()
+
+
+def test_failed_restart_keeps_the_slot(model):
+    comp = model / "Comp.sysml"
+    comp.write_text(comp.read_text().replace("temp.degrees >= 1;", "temp.degrees >= 1 FAKE_HANG;"))
+    hang = VerificationJob("hang", ["hamr", "sysml", "logika", "--sourcepath", str(model)], timeout=0.3)
+    pool = SireumPool(SERVER, size=1)
+    try:
+        pool.command = [sys.executable, "-c", "pass"]  # replacements exit before their ready line
+        result = pool.run(hang)
+        assert result["status"] == "timeout"
+        assert "exited before it was ready" in result["pool_error"]
+        assert pool.run(hang)["status"] == "error"  # the empty slot is retried, not lost
+        pool.command = SERVER
+        comp.write_text(comp.read_text().replace(" FAKE_HANG", ""))
+        assert pool.run(model_level_job(str(model)))["status"] == "verified"
+        assert pool.idle.qsize() == 1
+    finally:
+        pool.close()
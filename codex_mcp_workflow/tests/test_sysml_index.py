@@ -0,0 +1,90 @@
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import FIXTURES
+from tools import sysml_index
+from tools.sysml_index import SysmlIndex, drop_index, scan_parts, scan_source, shared_index
+
+with open(os.path.join(FIXTURES, "manage_alarm.gumbo"), "r", encoding="utf-8") as infile:
+    MANAGE_ALARM = infile.read()
+
+
+def model(parts):
+    body = "".join(
+        f'  part def {name} {{\n    language "GUMBO" /*{{{MANAGE_ALARM}}}*/\n  }}\n' if annex else f"  part def {name};\n"
+        for name, annex in parts
+    )
+    return f"package Monitor {{\n{body}}}\n"
+
+
+def test_scan_parts_finds_annexes_and_bodyless_parts():
+    data = model([("Manage_Alarm_i", True), ("Stub_i", False)]).encode("utf-8")
+    parts = scan_parts(data, "Monitor.sysml")
+    assert [part.name for part in parts] == ["Manage_Alarm_i", "Stub_i"]
+    assert parts[0].annex is not None and parts[1].annex is None and parts[1].body_start is None
+
+
+def test_scan_source_qualifies_definitions_and_imports():
+    data = b"""package Data {
+  attribute def Temp { attribute degrees : Integer; } // part def Hidden;
+  enum def Status { enum On; enum Off; }
+}
+package Comp {
+  private import Data::*;
+  part def Outer {
+    part def Inner;
+    language "GUMBO" /*{ integration guarantee g : true; }*/
+  }
+}
+"""
+    definitions, imports = scan_source(data, "M.sysml")
+    assert [(d.kind, d.qualified, d.first_line) for d in definitions] == [
+        ("attribute", "Data::Temp", 2), ("enum", "Data::Status", 3),
+        ("part", "Comp::Outer", 7), ("part", "Comp::Outer::Inner", 8),
+    ]
+    assert imports == [("Comp", "Data", True)]
+    outer = definitions[2]
+    assert outer.annex is not None and outer.last_line == 10
+    assert [d.name for d in scan_parts(data)] == ["Outer", "Inner"]
+
+
+def test_refresh_reparses_only_changed_annexes(tmp_path):
+    (tmp_path / "A.sysml").write_text(model([("A_i", True)]), encoding="utf-8")
+    (tmp_path / "B.sysml").write_text(model([("B_i", True)]), encoding="utf-8")
+    index = SysmlIndex(str(tmp_path))
+    assert index.refresh() == {"files_scanned": 2, "annexes_parsed": 1, "annexes_reused": 1}
+    assert index.refresh() == {"files_scanned": 0, "annexes_parsed": 0, "annexes_reused": 0}
+    assert index.annex("A_i").ast is not None
+    restored = pickle.loads(pickle.dumps(index))
+    assert [part.name for part in restored.part_defs()] == ["A_i", "B_i"]
+    assert restored.refresh()["files_scanned"] == 0
+
+
+def test_shared_index_from_many_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(sysml_index, "SHARED_INDEXES", 2)
+    roots = []
+    for i in range(4):
+        root = tmp_path / f"root{i}"
+        root.mkdir()
+        (root / "Monitor.sysml").write_text(model([(f"Part{i}_i", True)]), encoding="utf-8")
+        roots.append(str(root))
+
+    def lookup(n):
+        root = roots[n % len(roots)]
+        if n % 7 == 0:  # concurrent edits force rescans while other threads read
+            path = os.path.join(root, "Monitor.sysml")
+            with open(path, "a", encoding="utf-8") as outfile:
+                outfile.write("\n")
+        if n % 11 == 0:
+            drop_index(root)
+        parts = shared_index(root).find(f"Part{n % len(roots)}_i")
+        return len(parts) == 1 and parts[0].annex.ast is not None
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            assert all(executor.map(lookup, range(400)))
+        assert len(sysml_index._INDEXES) <= 2
+    finally:
+        for root in roots:
+            drop_index(root)
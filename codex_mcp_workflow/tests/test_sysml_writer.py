@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from tools import sysml_writer
+from tools.sysml_index import scan_parts
+from tools.sysml_writer import apply_annex_edits, plan_annex_edits
+
+ANNEX = "integration\n  guarantee g : true;"
+
+
+def edited(text, annexes):
+    data = text.encode("utf-8")
+    for start, end, replacement in reversed(plan_annex_edits(data, annexes)):
+        data = data[:start] + replacement + data[end:]
+    return data.decode("utf-8")
+
+
+def test_existing_annex_is_replaced_in_place():
+    text = 'package P {\n  part def A {\n    language "GUMBO" /*{ old }*/\n  }\n}\n'
+    assert edited(text, {"A": ANNEX}) == (
+        'package P {\n  part def A {\n    language "GUMBO" /*{\n'
+        '    integration\n      guarantee g : true;\n    }*/\n  }\n}\n'
+    )
+
+
+def test_closing_brace_on_its_own_line():
+    text = "package P {\n  part def A {\n    port p : DataPort;\n  }\n}\n"
+    assert edited(text, {"A": ANNEX}) == (
+        "package P {\n  part def A {\n    port p : DataPort;\n"
+        '    language "GUMBO" /*{\n    integration\n      guarantee g : true;\n    }*/\n  }\n}\n'
+    )
+
+
+def test_inline_closing_brace():
+    text = "package P {\n  part def A { port p : DataPort; }\n}\n"
+    assert edited(text, {"A": ANNEX}) == (
+        "package P {\n  part def A { port p : DataPort; \n"
+        '    language "GUMBO" /*{\n    integration\n      guarantee g : true;\n    }*/\n  }\n}\n'
+    )
+
+
+def test_bodyless_part_gets_a_body():
+    text = "package P {\n  part def A;\n  part def B;\n}\n"
+    result = edited(text, {"A": ANNEX, "B": 'language "GUMBO" /*{ initialize }*/'})
+    assert result == (
+        "package P {\n  part def A {\n"
+        '    language "GUMBO" /*{\n    integration\n      guarantee g : true;\n    }*/\n  }\n'
+        '  part def B {\n    language "GUMBO" /*{ initialize }*/\n  }\n}\n'
+    )
+    assert [part.annex is not None for part in scan_parts(result.encode("utf-8"))] == [True, True]
+
+
+def test_missing_and_ambiguous_names_are_rejected():
+    text = "package P {\n  part def A;\n}\npackage Q {\n  part def A;\n  part def B;\n}\n"
+    with pytest.raises(KeyError, match=r"not found: \['C'\]; defined more than once: \['A'\]"):
+        plan_annex_edits(text.encode("utf-8"), {"A": ANNEX, "B": ANNEX, "C": ANNEX})
+    assert len(plan_annex_edits(text.encode("utf-8"), {"B": ANNEX})) == 1
+
+
+def test_apply_keeps_lock_files_out_of_the_model_tree(tmp_path, monkeypatch):
+    monkeypatch.setattr(sysml_writer, "LOCK_DIR", str(tmp_path / "locks"))
+    model = tmp_path / "model"
+    model.mkdir()
+    (model / "P.sysml").write_text("package P {\n  part def A;\n}\n", encoding="utf-8")
+    stats = apply_annex_edits(str(model / "P.sysml"), {"A": ANNEX})
+    assert stats["edits"] == 1
+    assert os.listdir(model) == ["P.sysml"]
+    assert len(os.listdir(tmp_path / "locks")) == 1
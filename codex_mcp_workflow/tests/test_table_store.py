@@ -0,0 +1,80 @@
+import glob
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import WORKFLOW_DIR
+from tools.table_store import TableStore, build_store, open_tables
+
+TABLES_DIR = os.path.join(WORKFLOW_DIR, "Isollete_tables")
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as infile:
+        return json.load(infile)
+
+
+def test_store_round_trips_every_table(tmp_path):
+    paths = sorted(glob.glob(os.path.join(TABLES_DIR, "*.json")))
+    build_store(paths, str(tmp_path / "tables.store"))
+    with TableStore(str(tmp_path / "tables.store")) as store:
+        assert len(store.table_ids()) == len(paths) == 17
+        for path in paths:
+            expected = load(path)
+            table = store.table(expected["table_id"])
+            assert table["document"] == "Isollete_tables"
+            assert table["rows"] == expected["rows"]
+            assert table["columns"] == expected["columns"]
+
+
+def test_metadata_is_decoded_per_table(tmp_path):
+    build_store(glob.glob(os.path.join(TABLES_DIR, "*.json")), str(tmp_path / "tables.store"))
+    with TableStore(str(tmp_path / "tables.store")) as store:
+        assert store._metas == {}
+        store.column("Table A-7", store.meta("Table A-7")["columns"][0])
+        assert list(store._metas) == ["Isollete_tables/Table A-7"]
+
+
+def test_repeated_table_ids_are_kept_per_document(tmp_path):
+    for document in ("AR-08-32", "AR-09-11"):
+        shutil.copytree(TABLES_DIR, tmp_path / document)
+    path = tmp_path / "AR-09-11" / "table_a_7_the_regulate_temperature_internal_variables.json"
+    table = load(path)
+    table["rows"] = table["rows"][:1]
+    path.write_text(json.dumps(table), encoding="utf-8")
+
+    paths = glob.glob(str(tmp_path / "AR-*" / "*.json"))
+    build_store(paths, str(tmp_path / "all.store"))
+    with TableStore(str(tmp_path / "all.store")) as store:
+        assert len(store.table_ids()) == 34
+        assert len(store.rows("AR-09-11/Table A-7")) == 1
+        assert len(store.rows(store.resolve("Table A-7", "AR-08-32"))) > 1
+        with pytest.raises(KeyError, match="matches 2 tables"):
+            store.meta("Table A-7")
+
+
+def test_open_tables_rebuilds_when_a_table_changes(tmp_path):
+    tables = tmp_path / "tables"
+    shutil.copytree(TABLES_DIR, tables)
+    stores = str(tmp_path / "stores")
+    with open_tables(str(tables), stores) as first:
+        with open_tables(str(tables), stores) as again:
+            assert again is first
+
+        path = tables / "table_a_7_the_regulate_temperature_internal_variables.json"
+        table = load(path)
+        table["rows"] = table["rows"][:1]
+        path.write_text(json.dumps(table), encoding="utf-8")
+        with open_tables(str(tables), stores) as second:
+            assert second is not first and second.digest != first.digest
+            assert len(second.rows("Table A-7")) == 1
+        # the replaced store stays usable until its reader is done, then it is closed
+        assert len(first.rows("Table A-7")) > 1
+    assert first._map.closed and not second._map.closed
+
+    path.write_text(json.dumps(load(path)) + "\n", encoding="utf-8")
+    with open_tables(str(tables), stores) as third:
+        assert third is not second
+    assert second._map.closed  # replaced with no reader left: closed right away
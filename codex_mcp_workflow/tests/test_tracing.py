@@ -0,0 +1,76 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from agents.exceptions import MaxTurnsExceeded
+
+from tools import tracing
+from tools.tracing import SpanHooks, TraceWriter, summarize, traced_run
+
+AGENT = SimpleNamespace(name="Repair")
+TOOL = SimpleNamespace(name="verify_model")
+
+
+def usage(input_tokens, output_tokens, reasoning_tokens=0, requests=1):
+    return SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens, requests=requests,
+                           output_tokens_details=SimpleNamespace(reasoning_tokens=reasoning_tokens),
+                           total_tokens=input_tokens + output_tokens)
+
+
+def read_spans(path):
+    with open(path, "r", encoding="utf-8") as infile:
+        return [json.loads(line) for line in infile]
+
+
+def tool_context(call_id, arguments):
+    return SimpleNamespace(tool_call_id=call_id, tool_arguments=arguments)
+
+
+async def one_turn(hooks):
+    await hooks.on_agent_start(None, AGENT)
+    await hooks.on_llm_start(None, AGENT, "system", [{"role": "user", "content": "fix MA"}])
+    await hooks.on_llm_end(None, AGENT, SimpleNamespace(usage=usage(100, 20, 8, requests=2), output=["patch"]))
+    for call_id in ("c1", "c2"):  # the same call twice: the second one is a retry
+        await hooks.on_tool_start(tool_context(call_id, '{"dir": "m"}'), AGENT, TOOL)
+        await hooks.on_tool_end(tool_context(call_id, '{"dir": "m"}'), AGENT, TOOL, "ok: 3 verified")
+    await hooks.on_handoff(None, AGENT, SimpleNamespace(name="Verifier"))
+    await hooks.on_agent_end(None, AGENT, "done")
+
+
+def test_spans_are_one_json_line_each(tmp_path):
+    path = str(tmp_path / "logs" / "trace.jsonl")
+    hooks = SpanHooks(TraceWriter(path), component="MA", run_id="run1")
+    asyncio.run(one_turn(hooks))
+
+    spans = read_spans(path)
+    assert [s["span"] for s in spans] == ["llm", "tool", "tool", "handoff", "agent"]
+    assert all(s["run"] == "run1" and s["component"] == "MA" and s["agent"] == "Repair" for s in spans)
+    llm = spans[0]
+    assert (llm["input_tokens"], llm["output_tokens"], llm["reasoning_tokens"], llm["retries"]) == (100, 20, 8, 1)
+    assert llm["payload_in"] == len("system") + len(json.dumps([{"role": "user", "content": "fix MA"}]))
+    assert [(s["tool"], s["retries"], s["payload_in"], s["payload_out"]) for s in spans[1:3]] == [
+        ("verify_model", 0, 12, 14), ("verify_model", 1, 12, 14),
+    ]
+    assert spans[3]["to_agent"] == "Verifier"
+
+    report = summarize(path)["MA"]
+    assert set(report["by"]) == {"agent:Repair", "tool:verify_model"}
+    assert report["by"]["tool:verify_model"]["calls"] == 2 and report["tokens"] == 120
+    assert report["hot_by_tokens"] == "agent:Repair"
+
+
+def test_failed_runs_report_their_usage(tmp_path, monkeypatch):
+    async def run(agent, input, hooks, **kwargs):
+        exc = MaxTurnsExceeded("Max turns (2) exceeded")
+        exc.run_data = SimpleNamespace(raw_responses=[None, None],
+                                       context_wrapper=SimpleNamespace(usage=usage(300, 40, requests=2)))
+        raise exc
+
+    monkeypatch.setattr(tracing.Runner, "run", run)
+    path = str(tmp_path / "trace.jsonl")
+    with pytest.raises(MaxTurnsExceeded):
+        asyncio.run(traced_run(AGENT, "prompt", TraceWriter(path), "MA", max_turns=2))
+    (span,) = read_spans(path)
+    assert span["span"] == "run" and span["status"] == "error"
+    assert (span["turns"], span["input_tokens"], span["output_tokens"], span["requests"]) == (2, 300, 40, 2)
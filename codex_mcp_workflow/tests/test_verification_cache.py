@@ -0,0 +1,70 @@
+from tools.sysml_index import DependencyGraph, SysmlIndex
+from tools.verification_cache import component_key, contract_key, referenced_types
+
+# Consumer depends on Producer through the connection, Other on nothing.
+MODEL = """package Comp {
+  part def Producer {
+    out port o : DataPort;
+    language "GUMBO" /*{
+      integration
+        guarantee gp : o >= 0;
+    }*/
+  }
+  part def Consumer {
+    in port i : DataPort;
+    language "GUMBO" /*{
+      integration
+        assume ac : i >= 0;
+    }*/
+  }
+  part def Other {
+    language "GUMBO" /*{
+      integration
+        guarantee go : true;
+    }*/
+  }
+  part def Sys {
+    part p : Producer;
+    part c : Consumer;
+    connection pc : PortConnection connect p.o to c.i;
+  }
+}
+"""
+
+
+def keys(tmp_path, text, tool="sireum-1"):
+    (tmp_path / "Comp.sysml").write_text(text, encoding="utf-8")
+    index = SysmlIndex(str(tmp_path), parse=False)
+    index.refresh()
+    graph = DependencyGraph(index)
+    return {name.split("::")[-1]: component_key(graph, name, tool=tool) for name in graph.components}
+
+
+def test_dependency_annex_edit_invalidates_dependents(tmp_path):
+    before = keys(tmp_path, MODEL)
+    after = keys(tmp_path, MODEL.replace("o >= 0;", "o >= 1;"))
+    assert after["Producer"] != before["Producer"]
+    assert after["Consumer"] != before["Consumer"]
+    assert after["Other"] == before["Other"]
+
+
+def test_comments_and_layout_do_not_change_keys(tmp_path):
+    before = keys(tmp_path, MODEL)
+    edited = MODEL.replace("guarantee gp : o >= 0;", "guarantee gp :   o >= 0;  // still the same")
+    assert keys(tmp_path, edited) == before
+
+
+def test_tool_version_changes_every_key(tmp_path):
+    before = keys(tmp_path, MODEL)
+    after = keys(tmp_path, MODEL, tool="sireum-2")
+    assert all(after[name] != before[name] for name in before)
+
+
+def test_contract_key_tracks_referenced_types():
+    annex = "integration guarantee g : x == Isolette_Data_Model::Status.On;"
+    assert referenced_types(annex) == ["Isolette_Data_Model::Status"]
+    types = {"Isolette_Data_Model::Status": "v1"}
+    key = contract_key(annex, types, tool="t")
+    assert contract_key(annex, {"Isolette_Data_Model::Status": "v2"}, tool="t") != key
+    assert contract_key(annex.replace("==", " == "), types, tool="t") == key
+    assert contract_key(annex, {}, tool="t") != key  # an undefined type counts as "external"
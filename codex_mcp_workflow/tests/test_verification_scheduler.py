@@ -0,0 +1,88 @@
+import pytest
+
+from tools.sysml_index import DependencyGraph, SysmlIndex
+from tools.verification_scheduler import attribute, slice_tree
+
+# A and B feed each other (a dependency cycle); C consumes A's output.
+MODEL = """package P {
+  part def A {
+    in port i : DataPort;
+    out port o : DataPort;
+    language "GUMBO" /*{
+      integration
+        guarantee ga : o >= 0;
+    }*/
+  }
+  part def B {
+    in port i : DataPort;
+    out port o : DataPort;
+    language "GUMBO" /*{ // é
+      integration
+        guarantee gb : o >= 1;
+    }*/
+  }
+  part def C {
+    in port i : DataPort;
+    language "GUMBO" /*{
+      integration
+        assume ac : i >= 0;
+    }*/
+  }
+  part def Sys {
+    part a : A;
+    part b : B;
+    part c : C;
+    connection ab : PortConnection connect a.o to b.i;
+    connection ba : PortConnection connect b.o to a.i;
+    connection ac : PortConnection connect a.o to c.i;
+  }
+}
+"""
+
+
+@pytest.fixture
+def graph(tmp_path):
+    root = tmp_path / "sysml"
+    root.mkdir()
+    (root / "P.sysml").write_text(MODEL, encoding="utf-8")
+    index = SysmlIndex(str(root), parse=False)
+    index.refresh()
+    return DependencyGraph(index)
+
+
+def result(errors, status="failed"):
+    return {"job": "run", "status": status, "exit_code": 1, "parse_errors": errors, "proofs": [], "time_sec": 1.0}
+
+
+def test_cycle_shares_a_level(graph):
+    assert sorted(graph.components) == ["P::A", "P::B", "P::C"]
+    assert graph.levels(set(graph.components)) == [["P::A", "P::B"], ["P::C"]]
+    assert graph.levels({"P::C"}) == [["P::C"]]
+
+
+def test_slice_blanks_other_annexes_line_for_line(graph, tmp_path):
+    sliced = slice_tree(graph, {"P::A"}, str(tmp_path / "slice"))
+    text = (tmp_path / "slice" / "P.sysml").read_text(encoding="utf-8")
+    original = MODEL.splitlines()
+    lines = text.splitlines()
+    assert sliced == str(tmp_path / "slice") and len(lines) == len(original)
+    assert "guarantee ga" in text and "guarantee gb" not in text and "assume ac" not in text
+    assert [len(line) for line in lines] == [len(line) for line in original]
+    assert "part def B {" in text and "part def Sys {" in text
+
+
+def test_errors_map_back_to_their_owning_component(graph, tmp_path):
+    sliced = str(tmp_path / "slice")
+    path = f"{sliced}/P.sysml"
+    errors = [
+        {"file": path, "line": 7, "col": 9, "message": "in A"},
+        {"file": path, "line": 15, "col": 9, "message": "in B"},
+        {"file": path, "line": 32, "col": 5, "message": "in Sys"},
+    ]
+    mine = attribute(result(errors), "P::A", graph, sliced)
+    assert mine["job"] == "P::A" and mine["status"] == "failed"
+    assert [e["message"] for e in mine["parse_errors"]] == ["in A", "in Sys"]
+    assert mine["parse_errors"][0]["file"] == f"{graph.root}/P.sysml"
+
+    theirs = attribute(result(errors[1:2]), "P::C", graph, sliced)
+    assert theirs["status"] == "verified" and theirs["parse_errors"] == []
@@ -0,0 +1,248 @@
+"""Non-blocking variants of the agent tools, for use on the orchestrator's event loop.
+
+External programs called from here (pdftotext, pdfinfo) are asyncio subprocesses that
+are killed when the tool call is cancelled or times out. Everything else (caches, SysML
+index, annex writer, Sireum runs) runs in the default thread pool via `in_thread`: a call
+keeps its concurrency slot until its thread has returned, and Sireum calls get a cancel
+event that kills their cold runs or replaces their warm servers when the call times out
+or is cancelled. Every tool kind has its own concurrency cap and timeout, so long calls
+overlap without oversubscribing the machine. The tools keep the names and descriptions
+of their blocking counterparts, so agent instructions do not change.
+"""
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from agents import function_tool
+
+from . import gumbo_tools, pdf_tools, sireum_tools
+from .context_slicer import component_slice
+from .golden_index import golden_snippets
+from .gumbo_precheck import precheck_part
+from .gumbo_tools import annex_lookup, gumbo_annex
+from .gumbo_translator import translate_requirements
+from .pdf_tools import (
+    PAGES_PER_BATCH, SectionScanner, faa_payload, page_ranges, parse_page_count, payload_cache, payload_key,
+    pdftotext_command,
+)
+from .salvage import salvage
+from .sireum_runner import DEFAULT_TIMEOUT, POOL_SIZE, model_level_job, parse_output, summarize
+from .sireum_tools import source_dir, verify_model
+from .sysml_writer import apply_annex_edits
+from .verification_scheduler import schedule
+
+# per tool kind: (max concurrent calls, timeout in seconds)
+LIMITS: Dict[str, List[float]] = {
+    "pdf": [os.cpu_count() or 1, float(os.getenv("PDF_TOOL_TIMEOUT", "600"))],
+    "gumbo": [8, float(os.getenv("GUMBO_TOOL_TIMEOUT", "60"))],
+    "sireum": [POOL_SIZE, DEFAULT_TIMEOUT],
+}
+
+_SEMAPHORES: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _semaphore(kind: str) -> asyncio.Semaphore:
+    per_loop = _SEMAPHORES.setdefault(asyncio.get_running_loop(), {})
+    if kind not in per_loop:
+        per_loop[kind] = asyncio.Semaphore(int(LIMITS[kind][0]))
+    return per_loop[kind]
+
+
+async def limited(kind: str, awaitable, timeout: Optional[float] = None):
+    """Await under the kind's concurrency cap and timeout (asyncio.TimeoutError on expiry).
+    Only for awaitables that stop when cancelled; blocking work goes through `in_thread`."""
+    async with _semaphore(kind):
+        return await asyncio.wait_for(awaitable, timeout or LIMITS[kind][1])
+
+
+async def in_thread(kind: str, func, *args, cancellable: bool = False, timeout: Optional[float] = None):
+    """`func(*args)` in the default thread pool under the kind's cap and timeout.
+
+    A thread cannot be interrupted, so the slot is released when the thread returns, not
+    when the caller stops waiting. A `cancellable` func also gets `cancel=threading.Event()`,
+    set on timeout or cancellation so it can kill its subprocesses and return early.
+    """
+    semaphore = _semaphore(kind)
+    await semaphore.acquire()
+    cancel = threading.Event() if cancellable else None
+    call = functools.partial(func, *args, cancel=cancel) if cancellable else functools.partial(func, *args)
+    try:
+        future = asyncio.get_running_loop().run_in_executor(None, call)
+    except BaseException:
+        semaphore.release()
+        raise
+
+    def finished(done: asyncio.Future) -> None:
+        semaphore.release()
+        if not done.cancelled():
+            done.exception()  # retrieved, so an abandoned call's error is not logged as unhandled
+
+    future.add_done_callback(finished)
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), timeout or LIMITS[kind][1])
+    except BaseException:
+        if cancel is not None:
+            cancel.set()
+        raise
+
+
+async def run_process(args: List[str], timeout: Optional[float] = None, cwd: Optional[str] = None):
+    """(exit code, stdout, stderr) of a subprocess; killed on timeout or cancellation."""
+    proc = await asyncio.create_subprocess_exec(
+        *args, cwd=cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except BaseException:  # timeout or cancellation: do not leave the process running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    return proc.returncode, stdout, stderr
+
+
+# --- pdf ---------------------------------------------------------------------
+
+async def pdftotext_async(pdf_path: str, first: Optional[int] = None, last: Optional[int] = None) -> str:
+    code, stdout, stderr = await run_process(pdftotext_command(pdf_path, first, last))
+    if code != 0:
+        raise RuntimeError(f"pdftotext failed ({code}): {stderr.decode(errors='ignore').strip()}")
+    return stdout.decode("utf-8", errors="ignore")
+
+
+async def extract_faa_payload_async(pdf_path: str, pages_per_batch: int = PAGES_PER_BATCH) -> dict:
+    """Same payload as pdf_tools.extract_faa_payload. Page batches are converted concurrently,
+    at most two per pdf slot in flight, and scanned in page order as they complete."""
+    try:
+        code, info, _ = await run_process(["pdfinfo", pdf_path])
+    except OSError:
+        code, info = 1, b""
+    ranges = page_ranges(parse_page_count(info.decode(errors="ignore")) if code == 0 else None, pages_per_batch)
+    scanner = SectionScanner()
+    if not ranges:
+        scanner.feed(await limited("pdf", pdftotext_async(pdf_path)))
+        return faa_payload(scanner.rows)
+    window = 2 * int(LIMITS["pdf"][0])
+    pending: Deque[asyncio.Task] = deque()
+    try:
+        for first, last in ranges:
+            pending.append(asyncio.ensure_future(limited("pdf", pdftotext_async(pdf_path, first, last))))
+            if len(pending) >= window:
+                scanner.feed(await pending.popleft())
+        while pending:
+            scanner.feed(await pending.popleft())
+    finally:
+        for task in pending:  # on failure or cancellation, stop the batches still running
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return faa_payload(scanner.rows)
+
+
+async def cached_faa_payload_async(pdf_path: str) -> dict:
+    cache = payload_cache()
+    key = await asyncio.to_thread(payload_key, pdf_path)
+    payload = await asyncio.to_thread(cache.get, key)
+    if payload is None:
+        payload = await extract_faa_payload_async(pdf_path)
+        await asyncio.to_thread(cache.put, key, payload)
+    return payload
+
+
+# --- sireum ------------------------------------------------------------------
+
+async def verify_model_async(model_path: str, use_cache: bool = True) -> dict:
+    """sireum_tools.verify_model without blocking the loop. When the call times out or is
+    cancelled its Sireum jobs are cancelled too; a timeout is reported as a timed-out job."""
+    started = time.perf_counter()
+    try:
+        return await in_thread("sireum", verify_model, model_path, use_cache, cancellable=True)
+    except asyncio.TimeoutError:
+        job = model_level_job(source_dir(model_path), name=os.path.basename(model_path) or model_path)
+        elapsed = time.perf_counter() - started
+        return summarize([parse_output(job, None, "", elapsed, status="timeout")], elapsed)
+
+
+# --- tools -------------------------------------------------------------------
+
+async def _call(kind: str, func, *args, cancellable: bool = False) -> str:
+    try:
+        return json.dumps(await in_thread(kind, func, *args, cancellable=cancellable))
+    except asyncio.TimeoutError:
+        return json.dumps({"error": f"{kind} tool timed out after {LIMITS[kind][1]:g}s"})
+
+
+@function_tool(name_override="extract_faa_tables", description_override=pdf_tools.extract_faa_tables.description)
+async def extract_faa_tables_async(pdf_path: str) -> str:
+    # batches take the pdf slots themselves; only the overall timeout applies here
+    try:
+        payload = await asyncio.wait_for(cached_faa_payload_async(pdf_path), LIMITS["pdf"][1])
+    except asyncio.TimeoutError:
+        return json.dumps({"error": f"pdf tool timed out after {LIMITS['pdf'][1]:g}s"})
+    return json.dumps(payload, ensure_ascii=False)
+
+
+@function_tool(name_override="generate_gumbo", description_override=gumbo_tools.generate_gumbo.description)
+async def generate_gumbo_async(json_tables: str, sysml_model_path: str) -> str:
+    data = json.loads(json_tables)
+    try:
+        return await in_thread("gumbo", gumbo_annex, data, data.get("component"))
+    except asyncio.TimeoutError:
+        return json.dumps({"error": f"gumbo tool timed out after {LIMITS['gumbo'][1]:g}s"})
+
+
+@function_tool(name_override="lookup_gumbo_annex", description_override=gumbo_tools.lookup_gumbo_annex.description)
+async def lookup_gumbo_annex_async(sysml_root: str, part_name: str) -> str:
+    return await _call("gumbo", annex_lookup, sysml_root, part_name)
+
+
+@function_tool(name_override="precheck_gumbo", description_override=gumbo_tools.precheck_gumbo.description)
+async def precheck_gumbo_async(sysml_root: str, part_name: str) -> str:
+    return await _call("gumbo", precheck_part, sysml_root, part_name)
+
+
+@function_tool(name_override="component_context", description_override=gumbo_tools.component_context.description)
+async def component_context_async(tables_json_path: str, component: str) -> str:
+    return await _call("gumbo", component_slice, tables_json_path, component)
+
+
+@function_tool(name_override="golden_snippets")
+async def golden_snippets_async(query: str, k: int) -> str:
+    """Top-k verified GUMBO cases/assumes/guarantees from the golden model most similar to `query`
+    (a failing case or a requirement sentence), within the per-prompt token budget.
+    Returns JSON with 'snippets' (part, kind, name, text, tokens, score) and 'tokens'.
+    """
+    return await _call("gumbo", golden_snippets, query, k)
+
+
+@function_tool(name_override="translate_gumbo_requirements",
+               description_override=gumbo_tools.translate_gumbo_requirements.description)
+async def translate_gumbo_requirements_async(json_tables: str, component: str) -> str:
+    requirements = json.loads(json_tables).get("requirements", [])
+    return await _call("gumbo", translate_requirements, requirements, component)
+
+
+@function_tool(name_override="insert_gumbo_annexes", description_override=gumbo_tools.insert_gumbo_annexes.description)
+async def insert_gumbo_annexes_async(sysml_model_path: str, annexes_json: str) -> str:
+    return await _call("gumbo", apply_annex_edits, sysml_model_path, json.loads(annexes_json))
+
+
+@function_tool(name_override="run_sireum", description_override=sireum_tools.run_sireum.description)
+async def run_sireum_async(model_path: str) -> str:
+    return json.dumps(await verify_model_async(model_path))
+
+
+@function_tool(name_override="run_sireum_incremental", description_override=sireum_tools.run_sireum_incremental.description)
+async def run_sireum_incremental_async(model_path: str) -> str:
+    return await _call("sireum", schedule, source_dir(model_path), cancellable=True)
+
+
+@function_tool(name_override="salvage_contracts", description_override=sireum_tools.salvage_contracts.description)
+async def salvage_contracts_async(model_path: str, candidates_json: str) -> str:
+    return await _call("sireum", salvage, source_dir(model_path), json.loads(candidates_json), cancellable=True)
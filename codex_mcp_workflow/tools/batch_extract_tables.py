@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Batch table extraction over a corpus of requirement documents.
+
+    python -m tools.batch_extract_tables --input-dir docs/ --output-dir tables/
+    python -m tools.batch_extract_tables --manifest corpus.json --output-dir tables/
+
+A manifest is a JSON list of {"path": ..., "specs": <specs.json>, "output_dir": ...}
+entries; "specs" and "output_dir" are optional. With --input-dir every .pdf/.txt file
+is a document and `<stem>.specs.json` next to it, if present, is its spec set. Tables
+go to <output-dir>/<stem>/ by default, so two documents that would share an output
+directory are rejected before anything runs.
+Documents run in a process pool; each table is written as soon as it is parsed and
+one JSON line per document is appended to the report as documents finish.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from .content_cache import CACHE_ROOT, DEFAULT_MAX_BYTES, ContentCache, file_digest, make_key
+from .extract_isolette_tables import (
+    COLUMN_MODE,
+    EXTRACTOR_VERSION,
+    TABLE_SPECS,
+    extract_tables,
+    load_lines,
+    spec_fingerprint,
+    write_table,
+)
+
+DOCUMENT_SUFFIXES = (".pdf", ".txt")
+PDFTOTEXT_TIMEOUT = 300
+CACHE_DIR = os.path.join(CACHE_ROOT, "isolette_tables")
+
+
+def load_specs(path: Optional[str]) -> List[dict]:
+    if not path:
+        return TABLE_SPECS
+    with open(path, "r", encoding="utf-8") as infile:
+        return json.load(infile)
+
+
+def document_lines(path: str, timeout: float) -> List[str]:
+    if not path.lower().endswith(".pdf"):
+        return load_lines(path)
+    out = subprocess.run(
+        ["pdftotext", "-layout", path, "-"], check=True, capture_output=True, timeout=timeout
+    ).stdout
+    return out.decode("utf-8", errors="ignore").splitlines(keepends=True)
+
+
+def jobs_from_manifest(manifest: str, output_dir: str, default_specs: Optional[str]) -> List[dict]:
+    with open(manifest, "r", encoding="utf-8") as infile:
+        entries = json.load(infile)
+    base = os.path.dirname(os.path.abspath(manifest))
+    jobs = []
+    for entry in entries:
+        path = os.path.join(base, entry["path"])
+        stem = os.path.splitext(os.path.basename(path))[0]
+        jobs.append({
+            "path": path,
+            "specs": os.path.join(base, entry["specs"]) if "specs" in entry else default_specs,
+            "output_dir": os.path.join(base, entry["output_dir"]) if "output_dir" in entry
+            else os.path.join(output_dir, stem),
+        })
+    return unique_outputs(jobs)
+
+
+def jobs_from_directory(input_dir: str, output_dir: str, default_specs: Optional[str]) -> List[dict]:
+    jobs = []
+    for name in sorted(os.listdir(input_dir)):
+        stem, suffix = os.path.splitext(name)
+        if suffix.lower() not in DOCUMENT_SUFFIXES:
+            continue
+        specs = os.path.join(input_dir, f"{stem}.specs.json")
+        jobs.append({
+            "path": os.path.join(input_dir, name),
+            "specs": specs if os.path.exists(specs) else default_specs,
+            "output_dir": os.path.join(output_dir, stem),
+        })
+    return unique_outputs(jobs)
+
+
+def unique_outputs(jobs: List[dict]) -> List[dict]:
+    """`jobs`, unless two of them would write to the same output directory (ValueError)."""
+    seen: Dict[str, str] = {}
+    clashes = []
+    for job in jobs:
+        output_dir = os.path.abspath(job["output_dir"])
+        if output_dir in seen:
+            clashes.append(f"{seen[output_dir]} and {job['path']} -> {job['output_dir']}")
+        seen.setdefault(output_dir, job["path"])
+    if clashes:
+        raise ValueError("documents share an output directory (rename one or set its output_dir): "
+                         + "; ".join(clashes))
+    return jobs
+
+
+def extract_document(
+    job: dict,
+    column_mode: str = COLUMN_MODE,
+    timeout: float = PDFTOTEXT_TIMEOUT,
+    cache_dir: Optional[str] = CACHE_DIR,
+) -> dict:
+    """Extract every table of one document; failures are recorded, never raised.
+    With a `cache_dir`, a document whose content and spec set were already extracted
+    with the same column mode is served from the cache without running pdftotext.
+    """
+    report: Dict[str, object] = {"path": job["path"], "output_dir": job["output_dir"], "tables": []}
+    started = time.perf_counter()
+    try:
+        specs = load_specs(job.get("specs"))
+        cache = ContentCache(cache_dir, DEFAULT_MAX_BYTES) if cache_dir else None
+        key = make_key(file_digest(job["path"]), spec_fingerprint(specs), column_mode, EXTRACTOR_VERSION) \
+            if cache else None
+        cached = cache.get(key) if cache else None
+        report["cache_hit"] = cached is not None
+        if cached is None:
+            lines = document_lines(job["path"], timeout)
+            tables = extract_tables(lines, specs, column_mode)
+        else:
+            tables = iter(cached)
+        report["load_sec"] = round(time.perf_counter() - started, 4)
+        os.makedirs(job["output_dir"], exist_ok=True)
+        table_started = time.perf_counter()
+        finished = []
+        for filename, output in tables:
+            write_table(job["output_dir"], filename, output)
+            finished.append([filename, output])
+            now = time.perf_counter()
+            report["tables"].append({
+                "table_id": output["table_id"],
+                "file": filename,
+                "rows": len(output["rows"]),
+                "time_sec": round(now - table_started, 4),
+            })
+            table_started = now
+        if cache and cached is None:
+            cache.put(key, finished)
+        report["status"] = "ok"
+    except subprocess.TimeoutExpired:
+        report["status"] = "failed"
+        report["error"] = f"pdftotext timed out after {timeout}s"
+    except Exception as exc:
+        report["status"] = "failed"
+        report["error"] = f"{type(exc).__name__}: {exc}"
+        report["traceback"] = traceback.format_exc()
+    report["time_sec"] = round(time.perf_counter() - started, 4)
+    return report
+
+
+def run_batch(
+    jobs: List[dict],
+    report_path: str,
+    workers: Optional[int] = None,
+    column_mode: str = COLUMN_MODE,
+    timeout: float = PDFTOTEXT_TIMEOUT,
+    cache_dir: Optional[str] = CACHE_DIR,
+) -> List[dict]:
+    reports = []
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, "a", encoding="utf-8") as report_file, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(extract_document, job, column_mode, timeout, cache_dir): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                report = future.result()
+            except Exception as exc:  # worker process died
+                report = {"path": futures[future]["path"], "status": "failed",
+                          "error": f"{type(exc).__name__}: {exc}"}
+            report_file.write(json.dumps(report, ensure_ascii=False) + "\n")
+            report_file.flush()
+            reports.append(report)
+            print(f"[{report['status']}] {report['path']} ({report.get('time_sec', 0.0)}s)", file=sys.stderr)
+    return reports
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input-dir", help="directory of .pdf/.txt documents")
+    source.add_argument("--manifest", help="JSON list of documents and their spec sets")
+    parser.add_argument("--output-dir", required=True, help="root directory for per-document tables")
+    parser.add_argument("--specs", help="default spec set (JSON list); TABLE_SPECS if omitted")
+    parser.add_argument("--report", help="JSONL report path (default: <output-dir>/report.jsonl)")
+    parser.add_argument("--workers", type=int, help="process pool size (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=PDFTOTEXT_TIMEOUT, help="pdftotext timeout per document")
+    parser.add_argument("--column-mode", choices=["python", "numpy"], default=COLUMN_MODE)
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="extraction cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="always re-extract")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.manifest:
+            jobs = jobs_from_manifest(args.manifest, args.output_dir, args.specs)
+        else:
+            jobs = jobs_from_directory(args.input_dir, args.output_dir, args.specs)
+    except ValueError as exc:
+        parser.error(str(exc))
+    report_path = args.report or os.path.join(args.output_dir, "report.jsonl")
+    reports = run_batch(
+        jobs, report_path, args.workers, args.column_mode, args.timeout,
+        None if args.no_cache else args.cache_dir,
+    )
+    failed = [r for r in reports if r["status"] != "ok"]
+    print(f"{len(reports) - len(failed)}/{len(reports)} documents extracted; report: {report_path}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Parse benchmark for the Earley (gumbo.lark) and LALR (gumbo_lalr.lark) grammars.
+
+    python -m tools.bench_gumbo_parse --cases 10 100 1000 10000 --earley-max 1000
+
+Generates annexes with the given number of compute_cases, reports parser construction
+time (cold build vs. cached LALR load) and parse time per grammar, and checks that both
+grammars give the same tree (see gumbo_parser.comparable).
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+from .gumbo_parser import build_parser, comparable, parse_with
+
+CASE_TEMPLATE = """      case REQ_MA_{idx} "If mode NORMAL and temp below alarm {idx} |<pdf#page=115>":
+        assume monitor_mode == Isolette_Data_Model::Monitor_Mode.Normal_Monitor_Mode &
+               (current_tempWstatus.degrees < lower_alarm_temp.degrees + {idx} [s32] |
+                current_tempWstatus.degrees > upper_alarm_temp.degrees - 1 [s32]);
+        guarantee alarm_control == Isolette_Data_Model::On_Off.Onn implies In(lastCmd) != lastCmd;
+"""
+
+
+def generate_annex(cases: int) -> str:
+    head = """  state
+    lastCmd: Isolette_Data_Model::On_Off;
+
+  functions
+    def in_band(t: Base_Types::Integer_32, lo: Base_Types::Integer_32): Base_Types::Boolean := lo <= t;
+
+  integration
+    assume Table_A_12_LowerAlarmTemp "Range [96..101]|<pdf#page=112>":
+      96 [s32] <= lower_alarm_temp.degrees & lower_alarm_temp.degrees <= 101 [s32];
+
+  initialize
+    guarantee initlastCmd: lastCmd == Isolette_Data_Model::On_Off.Off;
+
+  compute
+    compute_cases
+"""
+    return head + "".join(CASE_TEMPLATE.format(idx=idx) for idx in range(1, cases + 1))
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="GUMBO parse benchmark")
+    parser.add_argument("--cases", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--earley-max", type=int, default=1000, help="skip Earley above this many cases")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_path = os.path.join(tmpdir, "gumbo_lalr.parser")
+        _, earley_build = _timed(lambda: build_parser(lalr=False))
+        _, lalr_cold = _timed(lambda: build_parser(cache_path=cache_path))
+        lalr, lalr_cached = _timed(lambda: build_parser(cache_path=cache_path))
+    earley = build_parser(lalr=False)
+    print(f"construct  earley {earley_build * 1000:9.1f} ms   lalr cold {lalr_cold * 1000:7.1f} ms"
+          f"   lalr cached {lalr_cached * 1000:6.1f} ms")
+    print(f"{'cases':>7} {'bytes':>10} {'lalr ms':>10} {'earley ms':>10} {'speedup':>8}")
+    for cases in args.cases:
+        annex = generate_annex(cases)
+        lalr_tree, lalr_sec = _timed(lambda: parse_with(lalr, annex))
+        if cases <= args.earley_max:
+            earley_tree, earley_sec = _timed(lambda: parse_with(earley, annex))
+            if comparable(earley_tree) != comparable(lalr_tree):
+                raise SystemExit(f"{cases} cases: Earley and LALR parse trees differ")
+            earley_col, speedup = f"{earley_sec * 1000:10.1f}", f"{earley_sec / lalr_sec:7.1f}x"
+        else:
+            earley_col, speedup = f"{'skipped':>10}", f"{'-':>8}"
+        print(f"{cases:>7} {len(annex):>10} {lalr_sec * 1000:10.1f} {earley_col} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
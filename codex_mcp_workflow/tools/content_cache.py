@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, List, Optional, Tuple
+
+CACHE_ROOT = os.getenv("CODEX_WORKFLOW_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "codex_mcp_workflow"))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as infile:
+        for chunk in iter(lambda: infile.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_key(*parts: Any) -> str:
+    """Stable SHA-256 over JSON-serializable key parts."""
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    """On-disk JSON payloads addressed by key.
+    Entries are touched on every hit. Writes keep a running size estimate; once it grows
+    past `max_bytes` the directory is rescanned and the least recently used entries are
+    evicted down to LOW_WATER of the limit.
+    """
+
+    LOW_WATER = 0.9
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None  # bytes on disk, scanned on the first put
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as infile:
+                payload = json.load(infile)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:  # evicted by another writer since it was read
+            pass
+        return payload
+
+    def put(self, key: str, payload: Any) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as outfile:
+                json.dump(payload, outfile, ensure_ascii=False)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self._path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if self._size is None:
+            self._size = self._scan()[1]
+        else:
+            self._size += size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        entries = []
+        total = 0
+        with os.scandir(self.root) as scan:
+            for entry in scan:
+                if entry.name.endswith(".json"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        return entries, total
+
+    def evict(self) -> None:
+        entries, total = self._scan()
+        target = int(self.max_bytes * self.LOW_WATER) if total > self.max_bytes else self.max_bytes
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
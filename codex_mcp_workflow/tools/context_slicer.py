@@ -0,0 +1,184 @@
+"""Per-component context bundles: only the table rows, constants and requirements a part def uses.
+
+A component (MRI, MRM, MHS, MMI, MMM, MA) owns the Isollete_tables whose title names its
+function or its subsystem (Regulate/Monitor Temperature), e.g. Table A-12 and A-13 for MMI.
+Its requirements are the extracted rows tagged REQ-<code>-n. Every variable name those
+requirements and owned tables mention (longest match first, "Temperature" = "Temp") pulls
+in the matching rows of the other tables, extracted variables and assumptions.
+
+The bundle keeps the payload keys (requirements, assumptions, variables), so it can be
+passed to `generate_gumbo` and `translate_gumbo_requirements` as is.
+
+    python -m tools.context_slicer build/tables.json --component MA
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional
+
+from .content_cache import CACHE_ROOT, ContentCache, make_key
+from .golden_index import count_tokens
+from .gumbo_precheck import TABLES_DIR
+from .gumbo_translator import REQ_ID_RE, statement_text, requirement_component
+from .table_store import open_tables
+
+CACHE_DIR = os.path.join(CACHE_ROOT, "context_slices")
+SLICER_VERSION = 1
+# row names that are fragments of rows the PDF extraction split, not variables
+GENERIC_NAMES = {"temp", "status", "value"}
+
+# component -> (function, subsystem), as named in the FAA table titles
+FUNCTIONS = {
+    "MRI": ("Manage Regulator Interface", "Regulate Temperature"),
+    "MRM": ("Manage Regulator Mode", "Regulate Temperature"),
+    "MHS": ("Manage Heat Source", "Regulate Temperature"),
+    "MMI": ("Manage Monitor Interface", "Monitor Temperature"),
+    "MMM": ("Manage Monitor Mode", "Monitor Temperature"),
+    "MA": ("Manage Alarm", "Monitor Temperature"),
+}
+
+
+def _norm(text: str) -> str:
+    text = re.sub(r"[^a-z0-9.]+", " ", text.lower()).replace("temperature", "temp")
+    return " ".join(text.split())
+
+
+def load_tables(tables_dir: str = TABLES_DIR) -> List[Dict[str, Any]]:
+    with open_tables(tables_dir) as store:
+        return [store.table(key) for key in store.table_ids()]
+
+
+def _table_labels(tables: List[Dict[str, Any]]) -> List[str]:
+    """Table ids, qualified by document only where an id repeats across documents."""
+    ids = [table["table_id"] for table in tables]
+    return [
+        table["table_id"] if ids.count(table["table_id"]) == 1 else f"{table.get('document', '')}/{table['table_id']}"
+        for table in tables
+    ]
+
+
+def _row_text(row: Dict[str, str]) -> str:
+    return " ".join(value for value in row.values() if isinstance(value, str))
+
+
+def referenced_names(texts: List[str], names: List[str]) -> List[str]:
+    """Normalized `names` mentioned in `texts`; a longer name hides the shorter ones inside it."""
+    corpus = f" {' | '.join(_norm(text) for text in texts)} "
+    found = []
+    for name in sorted(set(names), key=len, reverse=True):
+        if name and f" {name} " in corpus:
+            found.append(name)
+            corpus = corpus.replace(f" {name} ", " | ")
+    return sorted(found)
+
+
+def slice_payload(payload: Dict[str, Any], component: str, tables: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Minimal context for one component out of the extracted payload and the FAA tables."""
+    if component not in FUNCTIONS:
+        raise ValueError(f"unknown component {component!r} (expected one of {', '.join(FUNCTIONS)})")
+    tables = load_tables() if tables is None else tables
+    owners = [_norm(title) for title in FUNCTIONS[component]]
+    owned = [t for t in tables if any(owner in _norm(t.get("title", "")) for owner in owners)]
+    requirements = [r for r in payload.get("requirements", []) if requirement_component(statement_text(r)) == component]
+    all_names = [_norm(row.get("Name", "")) for t in tables for row in t.get("rows", [])]
+    all_names = [name for name in all_names if name not in GENERIC_NAMES]
+    texts = [statement_text(r) for r in requirements] + [_row_text(row) for t in owned for row in t.get("rows", [])]
+    names = referenced_names(texts, all_names)
+    if not requirements:  # rows without REQ ids: keep those that mention the component's variables
+        requirements = [
+            r for r in payload.get("requirements", [])
+            if requirement_component(statement_text(r)) is None and referenced_names([statement_text(r)], names)
+        ]
+
+    sliced_tables, constants = {}, {}
+    for table, label in zip(tables, _table_labels(tables)):
+        rows = table.get("rows", []) if table in owned else [
+            row for row in table.get("rows", []) if _norm(row.get("Name", "")) in names
+        ]
+        if "Value" in table.get("columns", []):
+            for row in rows:
+                constants[row["Name"]] = " ".join(filter(None, [row.get("Value"), row.get("Units")]))
+            rows = [row for row in rows if "Value" not in row]
+        if rows:
+            sliced_tables[label] = {"title": table.get("title", ""), "columns": table["columns"], "rows": rows}
+
+    def mentions(rows: List[Any]) -> List[Any]:
+        return [row for row in rows if referenced_names([statement_text(row)], names)]
+
+    return {
+        "component": component,
+        "requirement_ids": sorted({m.group(0) for m in map(REQ_ID_RE.search, map(statement_text, requirements)) if m}),
+        "requirements": requirements,
+        "assumptions": mentions(payload.get("assumptions", [])),
+        "variables": mentions(payload.get("variables", [])),
+        "constants": constants,
+        "tables": sliced_tables,
+        "names": names,
+    }
+
+
+def token_counts(payload: Dict[str, Any], bundle: Dict[str, Any], tables: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Prompt tokens of the full payload plus tables against the bundle."""
+    before = count_tokens(json.dumps(payload, ensure_ascii=False)) + count_tokens(json.dumps(tables, ensure_ascii=False))
+    after = count_tokens(json.dumps(bundle, ensure_ascii=False))
+    return {"tokens_before": before, "tokens_after": after}
+
+
+def cached_slice(payload: Dict[str, Any], component: str, tables_dir: str = TABLES_DIR,
+                 cache: Optional[ContentCache] = None) -> Dict[str, Any]:
+    """`slice_payload` with token counts, behind a cache keyed on the payload, the tables and SLICER_VERSION."""
+    cache = cache or ContentCache(CACHE_DIR)
+    with open_tables(tables_dir) as store:
+        key = make_key(SLICER_VERSION, component, payload, store.digest)
+    bundle = cache.get(key)
+    if bundle is None:
+        tables = load_tables(tables_dir)
+        bundle = slice_payload(payload, component, tables)
+        bundle.update(token_counts(payload, bundle, tables))
+        cache.put(key, bundle)
+    return bundle
+
+
+def component_slice(tables_json: str, component: str) -> Dict[str, Any]:
+    """`cached_slice` of the extracted JSON at `tables_json`."""
+    with open(tables_json, "r", encoding="utf-8") as infile:
+        return cached_slice(json.load(infile), component)
+
+
+def slice_file(tables_json: str, component: str, out_dir: str) -> Dict[str, Any]:
+    """Write the component's bundle for the extracted JSON at `tables_json` next to its workspace."""
+    bundle = component_slice(tables_json, component)
+    path = os.path.join(out_dir, f"context_{component}.json")
+    with open(path, "w", encoding="utf-8") as outfile:
+        json.dump(bundle, outfile, ensure_ascii=False, indent=1)
+    return {"path": path, "tokens_before": bundle["tokens_before"], "tokens_after": bundle["tokens_after"]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-component context bundles with token counts.")
+    parser.add_argument("tables_json", help="payload of extract_faa_tables")
+    parser.add_argument("--component", choices=list(FUNCTIONS), help="print this component's bundle")
+    args = parser.parse_args(argv)
+    with open(args.tables_json, "r", encoding="utf-8") as infile:
+        payload = json.load(infile)
+    if args.component:
+        print(json.dumps(cached_slice(payload, args.component), ensure_ascii=False, indent=2))
+        return 0
+    report = {}
+    for component in FUNCTIONS:
+        bundle = cached_slice(payload, component)
+        report[component] = {
+            "requirement_ids": bundle["requirement_ids"],
+            "tables": sorted(bundle["tables"]),
+            "constants": sorted(bundle["constants"]),
+            "tokens_before": bundle["tokens_before"],
+            "tokens_after": bundle["tokens_after"],
+        }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Batched text embeddings with an on-disk vector store, and cosine distances in NumPy.
+
+Vectors are stored per model under CACHE_ROOT/embeddings/<model>/ and keyed by the
+SHA-256 of the text, so golden texts are embedded once and candidates only when new.
+Two backends: OpenAI embeddings, and a local hashing vectorizer over GUMBO tokens for
+offline runs and benchmarks.
+
+    python -m tools.embeddings current/Monitor.sysml golden/Monitor.sysml --backend hashing
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .content_cache import CACHE_ROOT
+from .sysml_index import SysmlIndex, lexemes
+from .sysml_writer import writer_lock
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+STORE_DIR = os.path.join(CACHE_ROOT, "embeddings")
+BATCH_SIZE = 256
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def gumbo_tokens(text: str) -> List[str]:
+    """GUMBO lexemes without whitespace and comments; identifiers lower-cased."""
+    return [lexeme.lower() if lexeme[0].isalpha() or lexeme[0] == "_" else lexeme for lexeme in lexemes(text)]
+
+
+class HashingBackend:
+    """Signed feature hashing of token unigrams and bigrams with sublinear tf, L2-normalized.
+
+    No corpus statistics are involved, so a text's vector never changes and can be cached.
+    """
+
+    def __init__(self, dim: int = 2048) -> None:
+        self.dim = dim
+        self.model = f"gumbo-hashing-{dim}"
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return digest % self.dim, (1.0 if digest >> 63 else -1.0)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = gumbo_tokens(text)
+            counts: Dict[str, int] = {}
+            for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                counts[feature] = counts.get(feature, 0) + 1
+            for feature, count in counts.items():
+                column, sign = self._bucket(feature)
+                vectors[row, column] += sign * (1.0 + np.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class OpenAIBackend:
+    def __init__(self, model: str = EMBEDDING_MODEL) -> None:
+        from openai import OpenAI
+
+        self.model = model
+        self.client = OpenAI()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        response = self.client.embeddings.create(model=self.model, input=list(texts))
+        return np.array([item.embedding for item in sorted(response.data, key=lambda d: d.index)], dtype=np.float32)
+
+
+class VectorStore:
+    """Append-only store for one model: keys.txt (one text hash per line) and vectors.f32 (rows).
+
+    Rows are written before their keys, so a crash leaves at most unreferenced rows behind.
+    """
+
+    def __init__(self, model: str, root: str = STORE_DIR) -> None:
+        self.dir = os.path.join(root, model.replace("/", "_"))
+        self.keys_path = os.path.join(self.dir, "keys.txt")
+        self.vectors_path = os.path.join(self.dir, "vectors.f32")
+        self.dim: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        os.makedirs(self.dir, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.keys_path, "r", encoding="utf-8") as infile:
+                lines = infile.read().splitlines()
+        except FileNotFoundError:
+            return
+        if not lines:
+            return
+        self.dim = int(lines[0])
+        keys = [line for line in lines[1:] if len(line) == 64]
+        self.rows = {key: row for row, key in enumerate(keys)}
+        if keys:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(keys), self.dim))
+
+    def get(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        return {key: np.asarray(self._vectors[self.rows[key]]) for key in keys if key in self.rows}
+
+    def put(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        with writer_lock(self.keys_path):
+            self._load()  # pick up rows appended by other processes
+            fresh = [(key, row) for row, key in enumerate(keys) if key not in self.rows]
+            if not fresh:
+                return
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self.keys_path, "w", encoding="utf-8") as outfile:
+                    outfile.write(f"{self.dim}\n")
+            with open(self.vectors_path, "ab") as outfile:
+                # drop rows left over by a crashed writer so rows and keys stay aligned
+                outfile.truncate(len(self.rows) * self.dim * 4)
+                outfile.write(np.ascontiguousarray(vectors[[row for _, row in fresh]], dtype=np.float32).tobytes())
+                outfile.flush()
+                os.fsync(outfile.fileno())
+            with open(self.keys_path, "a+", encoding="utf-8") as outfile:
+                outfile.seek(0)
+                torn = not outfile.read().endswith("\n")  # a crashed writer's partial key line
+                outfile.write(("\n" if torn else "") + "".join(f"{key}\n" for key, _ in fresh))
+            self._load()
+
+
+class Embedder:
+    """Deduplicates texts, serves stored vectors and embeds the rest in batches."""
+
+    def __init__(self, backend=None, store: Optional[VectorStore] = None, batch_size: int = BATCH_SIZE) -> None:
+        self.backend = backend or OpenAIBackend()
+        self.store = store or VectorStore(self.backend.model)
+        self.batch_size = batch_size
+        self.stats = {"texts": 0, "stored": 0, "embedded": 0, "backend_calls": 0, "backend_sec": 0.0}
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        keys = [text_key(text) for text in texts]
+        found = self.store.get(keys)
+        stored = len(found)  # distinct texts served from the store
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        by_key = dict(zip(keys, texts))
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            started = time.perf_counter()
+            vectors = self.backend.embed([by_key[key] for key in batch])
+            self.stats["backend_sec"] += time.perf_counter() - started
+            self.stats["backend_calls"] += 1
+            self.store.put(batch, vectors)
+            found.update(zip(batch, vectors))
+        self.stats["texts"] += len(texts)
+        self.stats["embedded"] += len(missing)
+        self.stats["stored"] += stored
+        if not texts:
+            return np.zeros((0, self.store.dim or 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys]).astype(np.float32, copy=False)
+
+
+def cosine_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Matrix of 1 - cos(a_i, b_j), clipped to [0, 2] against float rounding."""
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return np.clip(1.0 - a @ b.T, 0.0, 2.0)
+
+
+def paired_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """1 - cos(a_i, b_i) for each row pair, clipped like `cosine_distances`."""
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return np.clip(1.0 - np.einsum("ij,ij->i", a, b), 0.0, 2.0)
+
+
+def contract_distances(embedder: Embedder, candidates: Dict[str, str], golden: Dict[str, str]) -> Dict[str, float]:
+    """Cosine distance of each candidate to the golden text of the same contract, in one batch."""
+    names = [name for name in candidates if name in golden]
+    vectors = embedder.embed([candidates[n] for n in names] + [golden[n] for n in names])
+    distances = paired_distances(vectors[:len(names)], vectors[len(names):])
+    return {name: float(distance) for name, distance in zip(names, distances)}
+
+
+def annex_texts(path: str) -> Dict[str, str]:
+    """Part def name -> GUMBO annex text for a .sysml file or directory."""
+    index = SysmlIndex(path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path)), parse=False)
+    index.refresh()
+    parts = index.part_defs(None if os.path.isdir(path) else os.path.abspath(path))
+    return {part.name: index.annex_text(part) for part in parts if part.annex is not None}
+
+
+def get_backend(name: str):
+    return HashingBackend() if name == "hashing" else OpenAIBackend()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cosine distances between current and golden GUMBO annexes.")
+    parser.add_argument("current")
+    parser.add_argument("golden")
+    parser.add_argument("--backend", choices=["openai", "hashing"], default="openai")
+    args = parser.parse_args(argv)
+    embedder = Embedder(get_backend(args.backend))
+    distances = contract_distances(embedder, annex_texts(args.current), annex_texts(args.golden))
+    print(json.dumps({"model": embedder.backend.model, "distances": distances, "stats": embedder.stats}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
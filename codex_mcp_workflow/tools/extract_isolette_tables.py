@@ -1,12 +1,30 @@
 #!/usr/bin/env python3
 #AmerTahat Nov 2025
+import argparse
 import json
 import os
 import re
-from typing import Dict, List, Optional, Tuple
+import sys
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # only needed for COLUMN_MODE = "numpy"
+    np = None
 
 TEXT_PATH = "Steve_Meller_FAA_docAR-08-32.txt"
 OUTPUT_DIR = "Isollete_tables"
+# bump whenever the tables produced for the same text and TABLE_SPECS, or the
+# pdf_tools payload for the same PDF and SECTIONS, change
+EXTRACTOR_VERSION = "2"
+# "python" walks each line character by character; "numpy" infers all columns of a block at once.
+# Both give the same tables. NumPy's per-call overhead loses on short blocks, so blocks under
+# NUMPY_MIN_LINES lines take the python path in either mode; from there on numpy is ~2-3x faster
+# (`--benchmark`). The Isolette tables are mostly shorter, hence the default.
+COLUMN_MODE = "python"
+NUMPY_MIN_LINES = 8
 
 TABLE_SPECS = [
     {
@@ -136,17 +154,22 @@ def get_segments(line: str) -> List[Tuple[int, str]]:
     return [(pos, text) for pos, text in segments if text]
 
 
-def compute_column_starts_from_header(header_lines: List[str], columns: List[str]) -> List[int]:
+def compute_column_starts_from_header(
+    header_lines: List[str],
+    columns: List[str],
+    header_segments: Optional[List[List[Tuple[int, str]]]] = None,
+) -> List[int]:
+    if header_segments is None:
+        header_segments = [get_segments(line) for line in header_lines]
     best_segments: List[Tuple[int, str]] = []
-    for line in header_lines:
-        segments = get_segments(line)
+    for segments in header_segments:
         if len(segments) > len(best_segments):
             best_segments = segments
     starts: List[Optional[int]] = [pos for pos, _ in best_segments]
     if len(starts) < len(columns):
         additional: List[int] = []
-        for line in header_lines:
-            for pos, _ in get_segments(line):
+        for segments in header_segments:
+            for pos, _ in segments:
                 if pos not in starts and pos not in additional:
                     additional.append(pos)
         if additional:
@@ -225,6 +248,57 @@ def collect_table_lines(lines: List[str], start: int, next_start: Optional[int])
     return collected
 
 
+class CaptionLocator:
+    """Aho-Corasick automaton over table captions.
+    `locate` scans every line once and returns, for each caption, the sorted line
+    offsets it occurs on; these are the `start` values `collect_table_lines` expects.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+        for idx, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                nxt = self.goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][char] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(idx)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def locate(self, lines: List[str]) -> Dict[str, List[int]]:
+        offsets: Dict[str, List[int]] = {pattern: [] for pattern in self.patterns}
+        goto, fail, out = self.goto, self.fail, self.out
+        for line_no, line in enumerate(lines):
+            state = 0
+            hits = set()
+            for char in line:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                hits.update(out[state])
+            for idx in hits:
+                offsets[self.patterns[idx]].append(line_no)
+        return offsets
+
+
 def split_header_body(lines: List[str], header_count: int) -> Tuple[List[str], List[str]]:
     headers: List[str] = []
     body: List[str] = []
@@ -279,14 +353,32 @@ def finalize_row(values: List[str], columns: List[str]) -> Dict[str, str]:
     return row
 
 
-def parse_rows(
+Assignment = List[Tuple[int, int, str]]
+
+
+def assign_segments(segments: List[Tuple[int, str]], columns: List[str], column_starts: List[int]) -> Assignment:
+    assigned: Assignment = []
+    if len(segments) == len(columns):
+        for idx_seg, (pos, text) in enumerate(segments):
+            text_norm = normalize(text)
+            if not text_norm:
+                continue
+            assigned.append((idx_seg, pos, text_norm))
+    else:
+        for pos, text in segments:
+            text_norm = normalize(text)
+            if not text_norm:
+                continue
+            col_idx = assign_column(pos, column_starts)
+            assigned.append((col_idx, pos, text_norm))
+    return assigned
+
+
+def infer_columns(
     header_lines: List[str],
-    lines: List[str],
+    data_lines: List[str],
     columns: List[str],
-) -> Tuple[List[Dict[str, str]], List[str]]:
-    notes, data_lines = extract_notes_and_data(lines)
-    if not data_lines:
-        return [], notes
+) -> Tuple[List[int], List[Assignment]]:
     column_starts = compute_column_starts_from_header(header_lines, columns)
     first_column_min = min(
         len(raw) - len(raw.lstrip(" "))
@@ -310,31 +402,121 @@ def parse_rows(
     for idx in range(1, len(column_starts)):
         if column_starts[idx] < column_starts[idx - 1]:
             column_starts[idx] = column_starts[idx - 1]
-    rows: List[List[str]] = []
-    current: Optional[List[str]] = None
+    assignments: List[Assignment] = []
     for raw in data_lines:
-        stripped = raw.strip()
-        if not stripped:
+        if not raw.strip():
             continue
         segments = get_segments(raw)
         if not segments:
             continue
-        assigned: List[Tuple[int, int, str]] = []
-        if len(segments) == len(columns):
-            for idx_seg, (pos, text) in enumerate(segments):
-                text_norm = normalize(text)
-                if not text_norm:
-                    continue
-                assigned.append((idx_seg, pos, text_norm))
-        else:
-            for pos, text in segments:
-                text_norm = normalize(text)
-                if not text_norm:
-                    continue
-                col_idx = assign_column(pos, column_starts)
-                assigned.append((col_idx, pos, text_norm))
-        if not assigned:
-            continue
+        assigned = assign_segments(segments, columns, column_starts)
+        if assigned:
+            assignments.append(assigned)
+    return column_starts, assignments
+
+
+if np is not None:
+    # characters str.split() breaks on besides the space (the last entry stands for everything above)
+    _OTHER_WHITESPACE = np.array([chr(code).isspace() and code != 32 for code in range(0x3002)])
+
+
+def segment_block(lines: List[str]) -> Tuple[List[List[Tuple[int, str]]], "np.ndarray"]:
+    """NumPy equivalent of `get_segments` followed by `normalize`, over a whole block at once.
+    Builds the character-occupancy matrix of the block and marks gutter cells (spaces
+    that belong to a run of two or more); segments are the maximal non-gutter runs, so
+    their words are already single-spaced and only segments holding other whitespace
+    (tabs, form feeds) go through `normalize`. Also returns the leading-space count of
+    every line.
+    """
+    if not lines:
+        return [], np.zeros(0, dtype=np.int64)
+    width = max(len(line) for line in lines) + 2
+    padded = "".join(" " + line.ljust(width - 1) for line in lines)
+    codes = np.frombuffer(padded.encode("utf-32-le"), dtype=np.uint32).reshape(len(lines), width)
+    space = codes == 32
+    gutter = space.copy()
+    gutter[:, 1:-1] &= space[:, :-2] | space[:, 2:]
+    edges = np.diff((~gutter).astype(np.int8), axis=1, prepend=0, append=0)
+    start_rows, start_cols = np.nonzero(edges == 1)
+    end_cols = np.nonzero(edges == -1)[1]
+    other = _OTHER_WHITESPACE[np.minimum(codes, len(_OTHER_WHITESPACE) - 1)]
+    flat_starts = start_rows * width + start_cols
+    flat_ends = start_rows * width + end_cols
+    other_before = np.concatenate(([0], np.cumsum(other.ravel())))
+    needs_normalize = (other_before[flat_ends] - other_before[flat_starts]) > 0
+    segments: List[List[Tuple[int, str]]] = [[] for _ in lines]
+    for row, start, text, messy in zip(
+        start_rows.tolist(),
+        (start_cols - 1).tolist(),
+        [padded[a:b] for a, b in zip(flat_starts.tolist(), flat_ends.tolist())],
+        needs_normalize.tolist(),
+    ):
+        if messy:
+            text = normalize(text)
+            if not text:
+                continue
+        segments[row].append((start, text))
+    return segments, (~space[:, 1:]).argmax(axis=1)
+
+
+def infer_columns_numpy(
+    header_lines: List[str],
+    data_lines: List[str],
+    columns: List[str],
+) -> Tuple[List[int], List[Assignment]]:
+    if np is None:
+        raise RuntimeError("column_mode='numpy' requires NumPy")
+    block, indents = segment_block(list(header_lines) + list(data_lines))
+    header_segments, data_segments = block[:len(header_lines)], block[len(header_lines):]
+    column_starts = compute_column_starts_from_header(header_lines, columns, header_segments)
+    column_starts[0] = min(column_starts[0], int(indents[len(header_lines):].min()))
+    counts = np.array([len(segments) for segments in data_segments])
+    positions = np.array([pos for segments in data_segments for pos, _ in segments], dtype=np.int64)
+    line_of = np.repeat(np.arange(len(data_segments)), counts)
+    seg_index = np.arange(len(positions)) - np.repeat(np.cumsum(counts) - counts, counts)
+    for idx in range(len(columns)):
+        at_index = positions[seg_index == idx]
+        if at_index.size:
+            column_starts[idx] = int(at_index.min())
+    for idx in range(1, len(column_starts)):
+        if column_starts[idx] < column_starts[idx - 1]:
+            column_starts[idx] = column_starts[idx - 1]
+    if not positions.size:
+        return column_starts, []
+    nearest = np.abs(positions[:, None] - np.array(column_starts)[None, :]).argmin(axis=1)
+    exact = counts[line_of] == len(columns)
+    col_of = np.where(exact, seg_index, nearest).tolist()
+    assignments: List[Assignment] = [[] for _ in data_segments]
+    flat = [segment for segments in data_segments for segment in segments]
+    for line_idx, col_idx, (pos, text) in zip(line_of.tolist(), col_of, flat):
+        assignments[line_idx].append((col_idx, pos, text))
+    return column_starts, [assigned for assigned in assignments if assigned]
+
+
+def parse_rows(
+    header_lines: List[str],
+    lines: List[str],
+    columns: List[str],
+    column_mode: str = COLUMN_MODE,
+) -> Tuple[List[Dict[str, str]], List[str]]:
+    notes, data_lines = extract_notes_and_data(lines)
+    if not data_lines:
+        return [], notes
+    if column_mode == "numpy" and len(header_lines) + len(data_lines) >= NUMPY_MIN_LINES:
+        column_starts, assignments = infer_columns_numpy(header_lines, data_lines, columns)
+    else:
+        column_starts, assignments = infer_columns(header_lines, data_lines, columns)
+    return merge_rows(assignments, columns, column_starts), notes
+
+
+def merge_rows(
+    assignments: List[Assignment],
+    columns: List[str],
+    column_starts: List[int],
+) -> List[Dict[str, str]]:
+    rows: List[List[str]] = []
+    current: Optional[List[str]] = None
+    for assigned in assignments:
         col0_positions = [pos for col, pos, _ in assigned if col == 0]
         col0_texts = [text for col, _, text in assigned if col == 0]
         col1_positions = [pos for col, pos, _ in assigned if col == 1]
@@ -394,7 +576,7 @@ def parse_rows(
                 current[col_idx] = target_text
     if current is not None and any(current):
         rows.append(current)
-    return [finalize_row(row, columns) for row in rows], notes
+    return [finalize_row(row, columns) for row in rows]
 
 
 def slugify(text: str) -> str:
@@ -404,30 +586,37 @@ def slugify(text: str) -> str:
     return slug or "table"
 
 
-def main() -> None:
-    lines = load_lines(TEXT_PATH)
-    for spec in TABLE_SPECS:
+def locate_specs(lines: List[str], specs: List[dict]) -> List[dict]:
+    located = CaptionLocator(spec["match"] for spec in specs).locate(lines)
+    missing = [spec["match"] for spec in specs if not located.get(spec["match"])]
+    duplicates = {match: offsets for match, offsets in located.items() if len(offsets) > 1}
+    for match, offsets in duplicates.items():
+        print(f"warning: '{match}' found on lines {offsets}; using line {offsets[0]}", file=sys.stderr)
+    if missing:
+        raise RuntimeError("Could not locate in source text: " + "; ".join(f"'{m}'" for m in missing))
+    resolved: List[dict] = []
+    for spec in specs:
         match = spec["match"]
-        spec_start = None
-        for idx, line in enumerate(lines):
-            if match in line:
-                spec_start = idx
-                break
-        if spec_start is None:
-            raise RuntimeError(f"Could not locate '{match}' in source text")
-        spec["start"] = spec_start
+        spec = dict(spec, start=located[match][0])
         if "title" not in spec:
             spec["title"] = match.split(". ", 1)[1] if ". " in match else match
-    ordered_specs = sorted(TABLE_SPECS, key=lambda s: s["start"])
+        resolved.append(spec)
+    return sorted(resolved, key=lambda s: s["start"])
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+def extract_tables(
+    lines: List[str],
+    specs: List[dict],
+    column_mode: str = COLUMN_MODE,
+) -> Iterator[Tuple[str, dict]]:
+    """Yield (filename, table JSON) for every spec, in document order."""
+    ordered_specs = locate_specs(lines, specs)
     for idx, spec in enumerate(ordered_specs):
         match = spec["match"]
         next_start = ordered_specs[idx + 1]["start"] if idx + 1 < len(ordered_specs) else None
         block_lines = collect_table_lines(lines, spec["start"], next_start)
         headers, body = split_header_body(block_lines, spec["header_lines"])
-        rows, notes = parse_rows(headers, body, spec["columns"])
+        rows, notes = parse_rows(headers, body, spec["columns"], column_mode)
         extra_notes = spec.get("notes", [])
         all_notes = extra_notes + notes
 
@@ -442,10 +631,80 @@ def main() -> None:
             output["notes"] = all_notes
 
         filename = f"{slugify(table_id)}_{slugify(spec.get('title', match))}.json"
-        path = os.path.join(OUTPUT_DIR, filename)
-        with open(path, "w", encoding="utf-8") as outfile:
-            json.dump(output, outfile, indent=2, ensure_ascii=False)
+        yield filename, output
+
+
+def spec_fingerprint(specs: List[dict]) -> List[dict]:
+    """The parts of a spec set that determine the extracted tables."""
+    keys = ("match", "columns", "header_lines", "title", "notes")
+    return [{key: spec[key] for key in keys if key in spec} for spec in specs]
+
+
+def write_table(output_dir: str, filename: str, output: dict) -> str:
+    path = os.path.join(output_dir, filename)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as outfile:
+        json.dump(output, outfile, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def differing_tables(output_dir: str, tables: Iterable[Tuple[str, dict]]) -> List[str]:
+    """Filenames whose extracted table is missing from, or differs from, `output_dir`."""
+    differing = []
+    for filename, output in tables:
+        try:
+            with open(os.path.join(output_dir, filename), "r", encoding="utf-8") as infile:
+                if json.load(infile) == output:
+                    continue
+        except (OSError, ValueError):
+            pass
+        differing.append(filename)
+    return differing
+
+
+def benchmark(lines: List[str], specs: List[dict], repeat: int = 5) -> Dict[str, float]:
+    """Best-of-`repeat` seconds per column mode for extracting every table; raises if the modes disagree."""
+    timings: Dict[str, float] = {}
+    outputs = {}
+    for mode in ("python", "numpy"):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            outputs[mode] = list(extract_tables(lines, specs, mode))
+            best = min(best, time.perf_counter() - started)
+        timings[mode] = best
+    if outputs["python"] != outputs["numpy"]:
+        raise RuntimeError("column modes produced different tables")
+    return timings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Extract the Isolette tables from the FAA report text.")
+    parser.add_argument("--text", default=TEXT_PATH)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--mode", choices=["python", "numpy"], default=COLUMN_MODE, help="column inference")
+    parser.add_argument("--check", action="store_true",
+                        help="compare against the tables in --output-dir instead of writing them")
+    parser.add_argument("--benchmark", action="store_true", help="time both column modes on the text")
+    args = parser.parse_args(argv)
+    lines = load_lines(args.text)
+    if args.benchmark:
+        timings = benchmark(lines, TABLE_SPECS)
+        print(", ".join(f"{mode}: {sec * 1000:.2f} ms" for mode, sec in timings.items())
+              + f" (numpy {timings['python'] / timings['numpy']:.2f}x)")
+        return 0
+    tables = extract_tables(lines, TABLE_SPECS, args.mode)
+    if args.check:
+        differing = differing_tables(args.output_dir, tables)
+        for filename in differing:
+            print(f"differs: {filename}", file=sys.stderr)
+        return 1 if differing else 0
+    os.makedirs(args.output_dir, exist_ok=True)
+    for filename, output in tables:
+        write_table(args.output_dir, filename, output)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
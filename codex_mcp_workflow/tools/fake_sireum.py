@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Offline stand-in for the Sireum CLI, for exercising tools/sireum_runner.py.
+
+    fake_sireum.py hamr sysml logika --sourcepath <dir>   # cold run
+    fake_sireum.py server                                 # warm JSON-lines server
+
+For every part def with a GUMBO annex under the source path it prints
+`[proof] <part>: verified`, or `[error] <file>:<line>:<col>: <part>: ...` when the annex
+contains the marker FAKE_FAIL. An annex containing FAKE_HANG sleeps forever (to exercise
+timeouts) and FAKE_SIREUM_DELAY adds a fixed delay in seconds to every run. The server
+pays FAKE_SIREUM_STARTUP seconds once, like a JVM warm-up, before its ready line.
+"""
+import json
+import os
+import re
+import sys
+import time
+
+PART_RE = re.compile(r"part\s+def\s+(\w+)[^{;]*\{")
+ANNEX_RE = re.compile(r'language\s+"GUMBO"\s*/\*\{(.*?)\}\*/', re.S)
+
+
+def logika(sourcepath: str):
+    lines = []
+    failed = False
+    time.sleep(float(os.getenv("FAKE_SIREUM_DELAY", "0")))
+    for dirpath, _, filenames in os.walk(sourcepath):
+        for filename in sorted(filenames):
+            if not filename.endswith(".sysml"):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, "r", encoding="utf-8") as infile:
+                text = infile.read()
+            parts = [(m.start(), m.group(1)) for m in PART_RE.finditer(text)]
+            for annex in ANNEX_RE.finditer(text):
+                owner = max((p for p in parts if p[0] < annex.start()), default=(0, "?"))[1]
+                body = annex.group(1)
+                if "FAKE_HANG" in body:
+                    while True:
+                        time.sleep(60)
+                if "FAKE_FAIL" in body:
+                    offset = annex.start(1) + body.index("FAKE_FAIL")
+                    line = text.count("\n", 0, offset) + 1
+                    col = offset - text.rfind("\n", 0, offset)
+                    lines.append(f"[error] {path}:{line}:{col}: {owner}: contract could not be proven")
+                    failed = True
+                else:
+                    lines.append(f"[proof] {owner}: verified")
+    return (1 if failed else 0), "\n".join(lines) + "\n"
+
+
+def run(args, cwd=None):
+    if args[:3] != ["hamr", "sysml", "logika"] or "--sourcepath" not in args:
+        return 2, f"[error] unsupported command: {' '.join(args)}\n"
+    sourcepath = args[args.index("--sourcepath") + 1]
+    if cwd:
+        sourcepath = os.path.join(cwd, sourcepath)
+    return logika(sourcepath)
+
+
+def serve():
+    time.sleep(float(os.getenv("FAKE_SIREUM_STARTUP", "0")))
+    sys.stdout.write(json.dumps({"ready": True}) + "\n")
+    sys.stdout.flush()
+    for line in sys.stdin:
+        request = json.loads(line)
+        exit_code, output = run(request["args"], request.get("cwd"))
+        sys.stdout.write(json.dumps({"id": request["id"], "exit_code": exit_code, "output": output}) + "\n")
+        sys.stdout.flush()
+
+
+def main(argv):
+    if argv[:1] == ["server"]:
+        serve()
+        return 0
+    exit_code, output = run(argv)
+    sys.stdout.write(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
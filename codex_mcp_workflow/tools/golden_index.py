@@ -0,0 +1,223 @@
+"""Nearest-neighbour index over the golden models' GUMBO snippets, for compact prompts.
+
+Every compute case (with all of its assume and guarantee clauses) and every integration,
+initialize and compute assume/guarantee of the golden annexes is one snippet. Snippet vectors form a single
+L2-normalized NumPy matrix persisted as an .npz under CACHE_ROOT/golden_index/, keyed on
+the golden files' digests and the embedding model, so the golden model is embedded once.
+A query is one embedding plus one matrix-vector product and an argpartition.
+
+    python -m tools.golden_index golden_examples/isolette/sysml "REQ-MA-2 alarm on out of range" -k 3
+"""
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .content_cache import CACHE_ROOT, file_digest, make_key
+from .embeddings import Embedder, HashingBackend, annex_texts, get_backend
+from .gumbo_parser import WORKFLOW_DIR
+
+try:
+    import tiktoken
+except ImportError:  # token counts fall back to the ~4 characters per token estimate
+    tiktoken = None
+
+GOLDEN_PATH = os.path.join(WORKFLOW_DIR, os.getenv("GOLDEN_SYSML", "golden_examples/isolette/sysml"))
+INDEX_DIR = os.path.join(CACHE_ROOT, "golden_index")
+TOKEN_BUDGET = int(os.getenv("GOLDEN_TOKEN_BUDGET", "600"))
+INDEX_VERSION = 2  # bump when snippet extraction or retrieval_text changes
+
+_SECTION_RE = re.compile(r"\b(state|functions|integration|initialize|compute)\b")
+_STATEMENT = r'(?:"[^"]*"|[^;"])*;'
+_SNIPPET_RE = re.compile(
+    r'\bcase\s+\w+\s*(?:"[^"]*")?\s*:(?:\s*(?:assume|guarantee)\b' + _STATEMENT + r")+"
+    + r'|\b(?:assume|guarantee)\s+\w+\s*(?:"[^"]*")?\s*:' + _STATEMENT
+)
+_WORD_SPLIT_RE = re.compile(r'["_]')
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Prompt tokens of `text` (cl100k_base when tiktoken is installed)."""
+    global _encoding
+    if tiktoken is None:
+        return math.ceil(len(text) / 4)
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return len(_encoding.encode(text))
+
+
+def retrieval_text(text: str) -> str:
+    """Text as embedded: quoted titles and snake_case names split into words, so English
+    requirements and failing GUMBO cases land near the same snippets."""
+    return _WORD_SPLIT_RE.sub(" ", text)
+
+
+def annex_snippets(part: str, text: str) -> List[Dict[str, Any]]:
+    """Cases and assume/guarantee clauses of one annex, each with its section."""
+    sections = [(m.start(), m.group(1)) for m in _SECTION_RE.finditer(re.sub(r'"[^"]*"', lambda m: " " * len(m.group(0)), text))]
+    snippets = []
+    for match in _SNIPPET_RE.finditer(text):
+        section = next((name for start, name in reversed(sections) if start < match.start()), None)
+        snippet = " ".join(match.group(0).split())
+        kind = snippet.split(None, 1)[0]
+        snippets.append({
+            "part": part,
+            "section": section,
+            "kind": kind,
+            "name": re.match(r"\w+\s+(\w+)", snippet).group(1),
+            "text": snippet,
+            "tokens": count_tokens(snippet),
+        })
+    return snippets
+
+
+def _sources(path: str) -> List[str]:
+    if not os.path.isdir(path):
+        return [os.path.abspath(path)]
+    return sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(path) for name in names if name.endswith(".sysml")
+    )
+
+
+class GoldenIndex:
+    """Snippet matrix of a golden model; `search` returns the top-k snippets by cosine similarity."""
+
+    def __init__(self, snippets: List[Dict[str, Any]], vectors: np.ndarray, backend=None) -> None:
+        self.snippets = snippets
+        self.vectors = vectors
+        self.backend = backend or HashingBackend()
+        # the hashing vectorizer is cheaper than a store lookup; remote embeddings go through the store
+        self._embed = self.backend.embed if isinstance(self.backend, HashingBackend) else Embedder(self.backend).embed
+
+    @classmethod
+    def build(cls, path: str = GOLDEN_PATH, backend=None, index_dir: str = INDEX_DIR) -> "GoldenIndex":
+        """Load the persisted index for `path`, or embed its snippets and persist them."""
+        backend = backend or HashingBackend()
+        sources = _sources(path)
+        key = make_key(INDEX_VERSION, backend.model, [[source, file_digest(source)] for source in sources])
+        index_path = os.path.join(index_dir, f"{key}.npz")
+        if os.path.exists(index_path):
+            return cls.load(index_path, backend)
+        snippets = []
+        for source in sources:
+            for part, text in sorted(annex_texts(source).items()):
+                snippets.extend(annex_snippets(part, text))
+        vectors = Embedder(backend).embed([retrieval_text(s["text"]) for s in snippets]) if snippets else np.zeros((0, 0), np.float32)
+        index = cls(snippets, vectors, backend)
+        index.save(index_path)
+        return index
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp.npz")
+        try:
+            with os.fdopen(fd, "wb") as outfile:
+                np.savez(outfile, vectors=self.vectors, snippets=np.array(json.dumps(self.snippets)))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str, backend=None) -> "GoldenIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(json.loads(str(data["snippets"])), data["vectors"], backend)
+
+    def search(self, query: str, k: int = 5, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Top-k snippets most similar to `query` (a failing case or a requirement), best first."""
+        if not self.snippets:
+            return []
+        scores = self.vectors @ self._embed([retrieval_text(query)])[0]
+        if kind is not None:
+            scores = np.where([s["kind"] == kind for s in self.snippets], scores, -np.inf)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [dict(self.snippets[i], score=round(float(scores[i]), 4)) for i in top if np.isfinite(scores[i])]
+
+    def select(self, query: str, max_tokens: int = TOKEN_BUDGET, k: int = 8) -> List[Dict[str, Any]]:
+        """The top-k snippets, best first, that fit in `max_tokens`."""
+        chosen, used = [], 0
+        for snippet in self.search(query, k):
+            if used + snippet["tokens"] <= max_tokens:
+                chosen.append(snippet)
+                used += snippet["tokens"]
+        return chosen
+
+
+def prompt_block(index: Optional[GoldenIndex], query: str, max_tokens: int = TOKEN_BUDGET, k: int = 8) -> str:
+    """Golden snippets for a prompt; the whole block, header included, stays within `max_tokens`."""
+    header = "Similar verified GUMBO from the golden model:"
+    lines, used = [header], count_tokens(header)
+    for snippet in index.search(query, k) if index is not None else []:
+        entry = f"// {snippet['part']}\n{snippet['text']}"
+        cost = count_tokens(entry) + 1  # plus the joining newline
+        if used + cost <= max_tokens:
+            lines.append(entry)
+            used += cost
+    return "\n".join(lines) if len(lines) > 1 else ""
+
+
+_shared: Dict[str, GoldenIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_golden_index(path: str = GOLDEN_PATH) -> Optional[GoldenIndex]:
+    """Per-process index for `path`, built once even when first requested from several
+    threads; None while the golden model is missing (checked again on every call)."""
+    path = os.path.abspath(path)
+    index = _shared.get(path)
+    if index is None:
+        with _shared_lock:
+            index = _shared.get(path)
+            if index is None:
+                if not os.path.exists(path):
+                    return None
+                index = _shared[path] = GoldenIndex.build(path)
+    return index
+
+
+def golden_snippets(query: str, k: int = 5, max_tokens: int = TOKEN_BUDGET, path: str = GOLDEN_PATH) -> Dict[str, Any]:
+    index = shared_golden_index(path)
+    if index is None:
+        return {"error": f"no golden model at {path} (set GOLDEN_SYSML)"}
+    snippets = index.select(query, max_tokens, k)
+    return {"snippets": snippets, "tokens": sum(s["tokens"] for s in snippets)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Top-k golden GUMBO snippets for a failing case or requirement.")
+    parser.add_argument("golden")
+    parser.add_argument("query")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--max-tokens", type=int, default=TOKEN_BUDGET)
+    parser.add_argument("--backend", choices=["openai", "hashing"], default="hashing")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    index = GoldenIndex.build(args.golden, get_backend(args.backend))
+    build_sec = time.perf_counter() - started
+    started = time.perf_counter()
+    snippets = index.select(args.query, args.max_tokens, args.k)
+    print(json.dumps({
+        "snippets": snippets,
+        "indexed": len(index.snippets),
+        "tokens": sum(s["tokens"] for s in snippets),
+        "build_sec": round(build_sec, 4),
+        "query_ms": round((time.perf_counter() - started) * 1000, 3),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""Runtime monitors compiled from a GUMBO annex, for batch checking of long traces.
+
+The annex's statements are compiled with the pre-check's ExprCompiler, but evaluated
+over trace columns (one array per variable, one element per timestep) instead of over
+a finite grid, so millions of steps are checked with a handful of NumPy passes:
+
+    integration/compute assumes   steps outside them are reported and not checked
+    integration/compute guarantees   invariants, checked at every step
+    initialize guarantees   checked at the first step of every run
+    compute_cases   assume -> guarantee at every step
+    latency   rule R6 of Gumbo_FSE_agent_Plan.txt, which the grammar cannot express:
+              once `trigger` starts holding, `response` must hold within `within_sec`
+              (heat source on within 6.0 s, alarm on within 5.0 s)
+
+In(x) is the previous step's x (the pre-state); statements reading it are not checked
+at the first step of a run. A trace is an .npz or .csv file whose columns are named like
+the annex variables (current_tempWstatus.degrees, monitor_mode, alarm_control, ...),
+plus optional `time` (seconds; default: step * --dt) and `run` (several simulations
+concatenated). Enum columns may hold full literals or just their last segment (Onn).
+Each check reports its first violating step.
+
+    python -m tools.gumbo_monitor model_dir Manage_Alarm_i trace.npz --alias lastCmd=alarm_control
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .gumbo_parser import parse_annex
+from .gumbo_precheck import Annex, ExprCompiler, Statement, Unsupported, state_name
+
+DT = 1.0  # seconds per step when the trace has no `time` column (thread period)
+
+
+class Latency:
+    """Once `trigger` holds, `response` must hold within `within_sec` (GUMBO expressions)."""
+
+    def __init__(self, name: str, trigger: str, response: str, within_sec: float) -> None:
+        self.name = name
+        self.trigger = trigger
+        self.response = response
+        self.within_sec = within_sec
+
+
+# Gumbo_FSE_agent_Plan.txt 4.5 / 4.6 (A.5.1.3 and A.5.2.3 latency rationale)
+HEAT_LATENCY = Latency(
+    "heat_on_within_6s",
+    "regulator_mode == Isolette_Data_Model::Regulator_Mode.Normal_Regulator_Mode"
+    " & current_tempWstatus.degrees < lower_desired_temp.degrees",
+    "heat_control == Isolette_Data_Model::On_Off.Onn",
+    6.0,
+)
+ALARM_LATENCY = Latency(
+    "alarm_on_within_5s",
+    "monitor_mode == Isolette_Data_Model::Monitor_Mode.Normal_Monitor_Mode"
+    " & (current_tempWstatus.degrees < lower_alarm_temp.degrees"
+    " | current_tempWstatus.degrees > upper_alarm_temp.degrees)",
+    "alarm_control == Isolette_Data_Model::On_Off.Onn",
+    5.0,
+)
+LATENCIES = [HEAT_LATENCY, ALARM_LATENCY]
+
+
+def _latency_trees(latency: Latency):
+    # the grammar has no expression entry point; parse the pair as a one-case compute section
+    tree = parse_annex(f"compute compute_cases case L: assume {latency.trigger}; guarantee {latency.response};")
+    body = next(tree.find_data("case_body"))
+    return body.children[0].children[-1], body.children[1].children[-1]
+
+
+# --- traces ----------------------------------------------------------------------
+
+def load_trace(path: str) -> Dict[str, np.ndarray]:
+    """Columns of an .npz or .csv trace (csv cells that are all numeric become floats)."""
+    if path.endswith(".npz"):
+        with np.load(path, allow_pickle=False) as data:
+            return {name: data[name] for name in data.files}
+    with open(path, "r", encoding="utf-8", newline="") as infile:
+        rows = list(csv.reader(infile))
+    header, rows = rows[0], rows[1:]
+    columns = {}
+    for i, name in enumerate(header):
+        cells = [row[i] for row in rows]
+        try:
+            columns[name] = np.array(cells, dtype=np.float64)
+        except ValueError:
+            columns[name] = np.array(cells)
+    return columns
+
+
+def _encode(column: np.ndarray, enum: str, compiler: ExprCompiler) -> np.ndarray:
+    """Enum literal strings (full or last segment) -> the compiler's literal codes."""
+    if column.dtype.kind not in "US":
+        return column.astype(np.int64)
+    values, inverse = np.unique(column, return_inverse=True)
+    codes = []
+    for value in values.astype(str):
+        last = value.rsplit(".", 1)[-1]
+        codes.append(compiler.literal(enum.split("::") + [last])[1])
+    return np.asarray(codes, dtype=np.int64)[inverse]
+
+
+def _boolean(column: np.ndarray) -> np.ndarray:
+    if column.dtype.kind in "US":
+        return np.isin(np.char.lower(column.astype(str)), ["true", "t", "1"])
+    return column.astype(bool)
+
+
+class TraceEnv(dict):
+    """Trace columns by annex variable name, plus In(x) as x shifted by one step."""
+
+    def __init__(self, annex: Annex, columns: Mapping[str, np.ndarray], aliases: Optional[Dict[str, str]] = None,
+                 dt: float = DT) -> None:
+        super().__init__()
+        compiler = annex.compiler
+        self.steps = len(next(iter(columns.values())))
+        run = columns.get("run")
+        self.first = np.ones(self.steps, dtype=bool)
+        if run is not None:
+            self.first[1:] = run[1:] != run[:-1]
+        else:
+            self.first[1:] = False
+        self.run = run if run is not None else np.zeros(self.steps, dtype=np.int64)
+        self.time = columns["time"].astype(np.float64) if "time" in columns else np.arange(self.steps) * dt
+        self.columns = dict(columns)
+        for name, source in (aliases or {}).items():
+            if source not in columns:
+                raise ValueError(f"alias {name}={source}: trace has no column {source!r} "
+                                 f"(columns: {', '.join(sorted(columns))})")
+            self.columns[name] = columns[source]
+        for name, column in self.columns.items():
+            if name in ("time", "run"):
+                continue
+            if name in compiler.enum_of:
+                self[name] = _encode(column, compiler.enum_of[name], compiler)
+            elif name in compiler.booleans or name.endswith(".flag"):
+                self[name] = _boolean(column)
+            else:
+                self[name] = column
+        for name in list(self):
+            shifted = np.empty_like(self[name])
+            shifted[1:] = self[name][:-1]
+            shifted[:1] = self[name][:1]  # step 0 of a run is masked wherever In() is read
+            self.setdefault(state_name(name), shifted)
+
+
+# --- monitoring --------------------------------------------------------------------
+
+def _holds(fn, env: TraceEnv) -> np.ndarray:
+    return np.broadcast_to(np.asarray(fn(env), dtype=bool), (env.steps,))
+
+
+def _first(mask: np.ndarray, env: TraceEnv, names: Sequence[str], compiler: ExprCompiler) -> Optional[Dict[str, Any]]:
+    hits = np.flatnonzero(mask)
+    if not len(hits):
+        return None
+    step = int(hits[0])
+    values = {}
+    for name in sorted(names):
+        value = env[name][step].item()
+        values[name] = compiler.decode(value) if name in compiler.enum_of else value
+    return {"step": step, "run": env.run[step].item(), "time": float(env.time[step]), "values": values}
+
+
+def check_latency(latency: Latency, trigger: np.ndarray, response: np.ndarray, env: TraceEnv) -> Dict[str, Any]:
+    """Violations of `trigger -> response within latency.within_sec`, in O(steps)."""
+    index = np.arange(env.steps)
+    previous = np.empty_like(trigger)
+    previous[1:] = trigger[:-1]
+    previous[:1] = False
+    onset = trigger & (~previous | env.first)
+    onset_step = np.maximum.accumulate(np.where(onset, index, -1))
+    waited = env.time - env.time[np.maximum(onset_step, 0)]
+    # answered in time: a response since the episode's onset, at most within_sec after it
+    on_time = np.maximum.accumulate(np.where(response & (waited <= latency.within_sec), index, -1))
+    late = trigger & (onset_step >= 0) & (on_time < onset_step) & (waited > latency.within_sec)
+    hits = np.flatnonzero(late)
+    # one violation per trigger episode
+    episodes = np.unique(onset_step[late]) if len(hits) else np.array([], dtype=np.int64)
+    first = None
+    if len(hits):
+        step = int(hits[0])
+        first = {"step": step, "onset_step": int(onset_step[step]), "run": env.run[step].item(),
+                 "time": float(env.time[step]), "waited_sec": float(waited[step])}
+    return {"name": latency.name, "within_sec": latency.within_sec, "triggers": int(onset.sum()),
+            "violations": int(len(episodes)), "first_violation": first}
+
+
+def monitor(annex: Annex, columns: Mapping[str, np.ndarray], aliases: Optional[Dict[str, str]] = None,
+            latencies: Sequence[Latency] = LATENCIES, dt: float = DT) -> Dict[str, Any]:
+    """Check a trace against the annex; every check reports its first violating step."""
+    started = time.perf_counter()
+    compiler = annex.compiler
+    compiled_latencies = []
+    skipped = []
+    for latency in latencies:
+        try:
+            (trigger, trigger_vars), (response, response_vars) = (
+                compiler.compile(tree) for tree in _latency_trees(latency))
+        except Unsupported as exc:
+            skipped.append({"name": latency.name, "reason": str(exc)})
+            continue
+        compiled_latencies.append((latency, trigger, response, trigger_vars | response_vars))
+    env = TraceEnv(annex, columns, aliases, dt)
+
+    def usable(stmt: Statement, name: str) -> bool:
+        missing = sorted(v for v in stmt.variables if v not in env)
+        if stmt.error or missing:
+            skipped.append({"name": name, "reason": stmt.error or f"trace has no {', '.join(missing)}"})
+            return False
+        return True
+
+    def checked(stmt: Statement) -> np.ndarray:
+        """Steps where the statement is evaluated: not the first step of a run if it reads In()."""
+        if any(name.startswith("In(") for name in stmt.variables):
+            return ~env.first
+        return np.ones(env.steps, dtype=bool)
+
+    environment = [s for s in annex.integration + annex.compute if s.kind == "assume"]
+    invariants = [s for s in annex.integration + annex.compute if s.kind == "guarantee"]
+    valid = np.ones(env.steps, dtype=bool)
+    report_env = []
+    for stmt in environment:
+        if usable(stmt, stmt.name):
+            outside = checked(stmt) & ~_holds(stmt.fn, env)
+            valid &= ~outside
+            report_env.append({"name": stmt.name, "violations": int(outside.sum()),
+                               "first_violation": _first(outside, env, stmt.variables, compiler)})
+
+    def violations(name: str, statements: List[Statement], where: np.ndarray, context=()) -> Dict[str, Any]:
+        bad = np.zeros(env.steps, dtype=bool)
+        names = {v for stmt in context for v in stmt.variables}
+        for stmt in statements:
+            if usable(stmt, name):
+                bad |= where & checked(stmt) & ~_holds(stmt.fn, env)
+                names |= stmt.variables
+        return {"name": name, "violations": int(bad.sum()), "first_violation": _first(bad, env, names, compiler)}
+
+    report_invariants = [violations(stmt.name, [stmt], valid) for stmt in invariants]
+    report_init = [violations(stmt.name, [stmt], valid & env.first) for stmt in annex.initialize]
+    report_cases = []
+    for case in annex.cases:
+        if not all(usable(stmt, case.name) for stmt in case.assumes):
+            continue
+        active = valid.copy()
+        for stmt in case.assumes:
+            active &= checked(stmt) & _holds(stmt.fn, env)
+        entry = violations(case.name, case.guarantees, active, case.assumes)
+        entry["active"] = int(active.sum())
+        report_cases.append(entry)
+
+    report_latency = []
+    for latency, trigger, response, variables in compiled_latencies:
+        missing = sorted(v for v in variables if v not in env)
+        if missing:
+            skipped.append({"name": latency.name, "reason": f"trace has no {', '.join(missing)}"})
+            continue
+        report_latency.append(check_latency(latency, _holds(trigger, env) & valid, _holds(response, env), env))
+
+    elapsed = time.perf_counter() - started
+    checks = report_invariants + report_init + report_cases + report_latency
+    return {
+        "status": "failed" if any(check["violations"] for check in checks) else "passed",
+        "steps": env.steps,
+        "runs": int(env.first.sum()),
+        "environment": report_env,
+        "invariants": report_invariants,
+        "initialize": report_init,
+        "cases": report_cases,
+        "latency": report_latency,
+        "skipped": skipped,
+        "time_sec": round(elapsed, 4),
+        "steps_per_sec": int(env.steps / elapsed) if elapsed else None,
+    }
+
+
+def monitor_part(sysml_root: str, part_name: str, trace_path: str, aliases: Optional[Dict[str, str]] = None,
+                 **kwargs) -> Dict[str, Any]:
+    """`monitor` a trace file against a part def's annex in an indexed SysML tree."""
+    from .sysml_index import shared_index
+
+    index = shared_index(sysml_root)
+    for part in index.find(part_name):
+        if part.annex is None:
+            continue
+        if part.annex.error:
+            return {"part_name": part_name, "status": "parse_error", "error": part.annex.error}
+        tree = part.annex.ast if part.annex.ast is not None else parse_annex(index.annex_text(part))
+        return {"part_name": part_name, **monitor(Annex(tree), load_trace(trace_path), aliases, **kwargs)}
+    return {"part_name": part_name, "status": "no_annex"}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check simulated traces against compiled GUMBO monitors.")
+    parser.add_argument("source", help="annex file, or a SysML directory (then PART is required)")
+    parser.add_argument("part", nargs="?", help="part def name when SOURCE is a SysML directory")
+    parser.add_argument("trace", help=".npz or .csv trace")
+    parser.add_argument("--alias", action="append", default=[], metavar="VAR=COLUMN",
+                        help="read a variable from another trace column, e.g. lastCmd=alarm_control")
+    parser.add_argument("--dt", type=float, default=DT, help="seconds per step without a `time` column")
+    parser.add_argument("--latency", action="append", default=[], nargs=4,
+                        metavar=("NAME", "SEC", "TRIGGER", "RESPONSE"),
+                        help="extra latency requirement (TRIGGER and RESPONSE are GUMBO expressions)")
+    args = parser.parse_args(argv)
+    aliases = dict(item.split("=", 1) for item in args.alias)
+    latencies = list(LATENCIES)
+    for name, within, trigger, response in args.latency:
+        latencies.append(Latency(name, trigger, response, float(within)))
+    try:
+        if args.part:
+            report = monitor_part(args.source, args.part, args.trace, aliases, latencies=latencies, dt=args.dt)
+        else:
+            with open(args.source, "r", encoding="utf-8") as infile:
+                annex = Annex(parse_annex(infile.read()))
+            report = monitor(annex, load_trace(args.trace), aliases, latencies, args.dt)
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(json.dumps(report, indent=2, default=str))
+    return 0 if report["status"] == "passed" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import gc
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+from lark import Lark, Token, Tree
+
+from .content_cache import CACHE_ROOT
+
+WORKFLOW_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EARLEY_GRAMMAR = os.path.join(WORKFLOW_DIR, "gumbo.lark")
+LALR_GRAMMAR = os.path.join(WORKFLOW_DIR, "gumbo_lalr.lark")
+# lark stores a hash of the grammar and options in the cache and rebuilds on mismatch
+PARSER_CACHE = os.path.join(CACHE_ROOT, "gumbo_lalr.parser")
+
+ANNEX_RE = re.compile(r'language\s+"GUMBO"\s*/\*\{(.*?)\}\*/', re.S)
+
+
+def _read(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as infile:
+        return infile.read()
+
+
+def build_parser(lalr: bool = True, cache_path: Optional[str] = PARSER_CACHE) -> Lark:
+    if not lalr:
+        return Lark(_read(EARLEY_GRAMMAR), start="start")
+    if cache_path:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    return Lark(_read(LALR_GRAMMAR), start="start", parser="lalr", lexer="contextual", cache=cache_path or False)
+
+
+@lru_cache(maxsize=None)
+def get_parser(lalr: bool = True) -> Lark:
+    """Process-wide parser; the LALR tables are loaded from PARSER_CACHE when present."""
+    return build_parser(lalr)
+
+
+def annex_bodies(text: str) -> List[str]:
+    """Bodies of every `language "GUMBO" /*{ ... }*/` block in a SysML source."""
+    return [match.group(1) for match in ANNEX_RE.finditer(text)]
+
+
+def parse_with(parser: Lark, body: str) -> Tree:
+    # large annexes allocate millions of tree nodes; cyclic GC passes would dominate the parse
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return parser.parse(body)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def parse_annex(text: str, lalr: bool = True) -> Tree:
+    """Parse an annex given either as a full `language "GUMBO"` block or as its body."""
+    match = ANNEX_RE.search(text)
+    return parse_with(get_parser(lalr), match.group(1) if match else text)
+
+
+def comparable(tree: Tree) -> Tree:
+    """`tree` with the two known Earley/LALR differences removed, so trees of both grammars
+    compare equal: Earley keeps WS_INLINE tokens, and its dynamic lexer reads the keywords
+    `true`/`false` as an identifier (`var`) where the LALR lexer gives the literal."""
+    if isinstance(tree, Token) or not isinstance(tree, Tree):
+        return tree
+    if tree.data == "var" and len(tree.children) == 1 and tree.children[0] in ("true", "false"):
+        return Tree(f"{tree.children[0]}_literal", [])
+    return Tree(tree.data, [
+        comparable(child) for child in tree.children
+        if not (isinstance(child, Token) and child.type == "WS_INLINE")
+    ])
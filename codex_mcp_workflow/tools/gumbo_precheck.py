@@ -0,0 +1,584 @@
+"""Exhaustive finite-domain pre-check of a GUMBO annex, before it goes to Logika.
+
+Every expression of the annex (parsed with gumbo.lark) is compiled into a NumPy closure.
+The free variables get finite domains: integer ranges and constants from Isollete_tables
+(matched by name, e.g. lower_alarm_tempWstatus.degrees -> Table A-12 "Lower Alarm Temp"
+[96..101]), reals sampled every REAL_STEP, booleans, and enums from the literals the
+annex compares them with (INIT/NORMAL/FAILED modes, Valid/Invalid statuses). Each
+variable is one axis of a broadcast grid, so every case's assume is evaluated over the
+whole Cartesian product at once and the annex is checked in milliseconds for:
+
+    gaps            valid inputs no compute case covers
+    overlaps        inputs two cases both cover (conflicting if their guarantees clash)
+    contradictions  inputs where no output satisfies every active case
+    unsat / dead    cases whose guarantee can never hold / whose assume never does
+
+Inputs are the variables read by assumes, state variables and In(x); the remaining
+variables of the guarantees are outputs. Statements using an unsupported call or a
+variable without a domain are skipped and listed.
+
+    python -m tools.gumbo_precheck model_dir Manage_Alarm_i
+    python -m tools.gumbo_precheck annex.gumbo --domain current_tempWstatus.degrees=95..104
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from lark import Token, Tree
+
+from .gumbo_parser import WORKFLOW_DIR, parse_annex
+from .table_store import open_tables
+
+TABLES_DIR = os.path.join(WORKFLOW_DIR, "Isollete_tables")
+REAL_STEP = 0.5  # finest threshold offset used by the contracts (alarm hysteresis bands)
+MAX_POINTS = 20_000_000
+MAX_WITNESSES = 5
+
+Fn = Callable[[Mapping[str, Any]], Any]
+
+# calls the compiler knows besides In() and the annex's own functions
+BUILTINS: Dict[str, Callable[..., Any]] = {
+    "round_to_nearest_int": lambda x: np.floor(np.asarray(x) + 0.5).astype(np.int64),
+    "abs": np.abs,
+    "min": np.minimum,
+    "max": np.maximum,
+}
+TRUE_NAMES = {"T", "true"}
+FALSE_NAMES = {"F", "false"}
+
+
+class Unsupported(ValueError):
+    pass
+
+
+def _children(node: Tree) -> List[Any]:
+    return [child for child in node.children if not isinstance(child, Token) or child.type not in ("OR", "AND")]
+
+
+def _unwrap(node: Any) -> Any:
+    """Skip the single-child precedence wrappers (implication_expr -> ... -> mul_expr)."""
+    while isinstance(node, Tree) and len(node.children) == 1 and node.data != "var":
+        node = node.children[0]
+    return node
+
+
+def _is_literal(path: Sequence[str]) -> bool:
+    # namespaces and types are capitalized (Isolette_Data_Model::Status.On_Status); variables are not
+    return len(path) >= 2 and path[0][:1].isupper()
+
+
+def state_name(name: str) -> str:
+    """Environment key of the pre-state value In(name)."""
+    return f"In({name})"
+
+
+class ExprCompiler:
+    """GUMBO expression trees -> closures over an environment of NumPy arrays.
+
+    While compiling it records what the expressions imply about their variables: which
+    enum each one is compared with, and which ones are used as booleans.
+    """
+
+    def __init__(self, functions: Optional[Dict[str, Tuple[List[str], Tree]]] = None) -> None:
+        self.functions = functions or {}
+        self.literals: Dict[str, int] = {}  # "Isolette_Data_Model::Status.On_Status" -> code
+        self.enum_of: Dict[str, str] = {}  # variable -> enum type ("Isolette_Data_Model::Status")
+        self.booleans: Set[str] = set()
+
+    def literal(self, path: Sequence[str]) -> Tuple[str, int]:
+        enum = "::".join(path[:-1])
+        name = f"{enum}.{path[-1]}"
+        return enum, self.literals.setdefault(name, len(self.literals))
+
+    def enum_values(self, enum: str) -> List[int]:
+        return [code for name, code in self.literals.items() if name.rsplit(".", 1)[0] == enum]
+
+    def decode(self, code: int) -> str:
+        for name, value in self.literals.items():
+            if value == code:
+                return name
+        return str(code)
+
+    def compile(self, tree: Tree, boolean: bool = True) -> Tuple[Fn, Set[str]]:
+        """(closure, variables read); `boolean` marks a bare variable as a boolean."""
+        variables: Set[str] = set()
+        fn, info = self._compile(tree, {}, variables)
+        if boolean:
+            self._mark_bool(info)
+        return fn, variables
+
+    def _mark_bool(self, info) -> None:
+        if info and info[0] == "var":
+            self.booleans.add(info[1])
+
+    def _compile(self, node, scope: Dict[str, Tuple[Fn, Any]], variables: Set[str]) -> Tuple[Fn, Any]:
+        if isinstance(node, Token):
+            raise Unsupported(f"unexpected token {node!r}")
+        kind = node.data
+        parts = _children(node)
+
+        if kind in ("number", "typed_number"):
+            text = str(parts[0])
+            value = float(text) if any(c in text for c in ".eE") else int(text)
+            return (lambda env: value), None
+        if kind == "true_literal":
+            return (lambda env: True), None
+        if kind == "false_literal":
+            return (lambda env: False), None
+        if kind == "var":
+            path = [str(token) for token in parts]
+            if len(path) == 1 and path[0] in TRUE_NAMES:
+                return (lambda env: True), None
+            if len(path) == 1 and path[0] in FALSE_NAMES:
+                return (lambda env: False), None
+            if path[0] in scope and len(path) == 1:
+                return scope[path[0]]
+            if _is_literal(path):
+                enum, code = self.literal(path)
+                return (lambda env: code), ("lit", enum)
+            name = ".".join(path)
+            variables.add(name)
+            return (lambda env: env[name]), ("var", name)
+        if kind == "paren_expr" or len(parts) == 1 and kind in (
+                "implication_expr", "or_expr", "and_expr", "compare_expr", "add_expr", "mul_expr"):
+            return self._compile(parts[0], scope, variables)
+
+        if kind == "not_expr":
+            inner, info = self._compile(parts[0], scope, variables)
+            self._mark_bool(info)
+            return (lambda env: np.logical_not(inner(env))), None
+        if kind in ("and_expr", "or_expr", "implication_expr", "sequent_call"):
+            operands = [op for op in parts if not isinstance(op, Token)]
+            compiled = []
+            for operand in operands:
+                fn, info = self._compile(operand, scope, variables)
+                self._mark_bool(info)
+                compiled.append(fn)
+            if kind == "and_expr":
+                return (lambda env: _fold(np.logical_and, compiled, env)), None
+            if kind == "or_expr":
+                return (lambda env: _fold(np.logical_or, compiled, env)), None
+
+            def implies(env, fns=compiled):  # right-associative: a implies b implies c
+                result = fns[-1](env)
+                for fn in reversed(fns[:-1]):
+                    result = np.logical_or(np.logical_not(fn(env)), result)
+                return result
+            return implies, None
+        if kind == "compare_expr":
+            operands = [self._compile(op, scope, variables) for op in parts[0::2]]
+            operators = [str(op) for op in parts[1::2]]
+            for (_, left), op, (_, right) in zip(operands, operators, operands[1:]):
+                if op in ("==", "!=") and left and right and {left[0], right[0]} == {"var", "lit"}:
+                    var, lit = (left, right) if left[0] == "var" else (right, left)
+                    self.enum_of[var[1]] = lit[1]
+            fns = [fn for fn, _ in operands]
+
+            def compare(env):
+                values = [fn(env) for fn in fns]
+                result = True
+                for left, op, right in zip(values, operators, values[1:]):
+                    result = np.logical_and(result, _COMPARE[op](left, right))
+                return result
+            return compare, None
+        if kind in ("add_expr", "mul_expr"):
+            fns = [self._compile(op, scope, variables)[0] for op in parts[0::2]]
+            operators = [str(op) for op in parts[1::2]]
+
+            def arith(env):
+                result = fns[0](env)
+                for op, fn in zip(operators, fns[1:]):
+                    result = _ARITH[op](result, fn(env))
+                return result
+            return arith, None
+        if kind == "call_expr":
+            name = str(parts[0])
+            args = parts[1:]
+            if name == "In":
+                target = _unwrap(args[0]) if len(args) == 1 else None
+                if not isinstance(target, Tree) or target.data != "var":
+                    raise Unsupported("In() takes a single state variable")
+                key = state_name(".".join(str(token) for token in target.children))
+                variables.add(key)
+                return (lambda env: env[key]), ("var", key)
+            compiled_args = [self._compile(arg, scope, variables) for arg in args]
+            if name in self.functions:
+                params, body = self.functions[name]
+                if len(params) != len(compiled_args):
+                    raise Unsupported(f"{name}() takes {len(params)} argument(s)")
+                return self._compile(body, dict(zip(params, compiled_args)), variables)
+            if name in BUILTINS:
+                builtin = BUILTINS[name]
+                fns = [fn for fn, _ in compiled_args]
+                return (lambda env: builtin(*(fn(env) for fn in fns))), None
+            raise Unsupported(f"unsupported call {name}()")
+        raise Unsupported(f"unsupported expression {kind}")
+
+
+def _fold(op, fns: List[Fn], env) -> Any:
+    result = fns[0](env)
+    for fn in fns[1:]:
+        result = op(result, fn(env))
+    return result
+
+
+def _divide(left, right):
+    if np.issubdtype(np.asarray(left).dtype, np.integer) and np.issubdtype(np.asarray(right).dtype, np.integer):
+        return np.floor_divide(left, right)
+    return np.true_divide(left, right)
+
+
+_COMPARE = {"<=": np.less_equal, ">=": np.greater_equal, "<": np.less, ">": np.greater,
+            "==": np.equal, "!=": np.not_equal}
+_ARITH = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": _divide}
+
+
+# --- annex structure ----------------------------------------------------------
+
+class Statement:
+    def __init__(self, section: str, name: str, kind: str, tree: Tree) -> None:
+        self.section = section  # integration | initialize | compute | case
+        self.name = name
+        self.kind = kind  # assume | guarantee
+        self.tree = tree
+        self.fn: Optional[Fn] = None
+        self.variables: Set[str] = set()
+        self.error: Optional[str] = None
+
+
+class Case:
+    def __init__(self, name: str, title: Optional[str]) -> None:
+        self.name = name
+        self.title = title
+        self.assumes: List[Statement] = []
+        self.guarantees: List[Statement] = []
+
+    @property
+    def statements(self) -> List[Statement]:
+        return self.assumes + self.guarantees
+
+
+class Annex:
+    """Sections of a parsed GUMBO annex, with every statement compiled."""
+
+    def __init__(self, tree: Tree) -> None:
+        self.state: Dict[str, str] = {}  # name -> type
+        functions: Dict[str, Tuple[List[str], Tree]] = {}
+        self.integration: List[Statement] = []
+        self.initialize: List[Statement] = []
+        self.compute: List[Statement] = []
+        self.cases: List[Case] = []
+        for section in tree.iter_subtrees_topdown():
+            if section.data == "state_decl":
+                self.state[str(section.children[0])] = "::".join(str(t) for t in section.children[1].children)
+            elif section.data == "func_decl":
+                name = str(section.children[0])
+                params = [str(p.children[0]) for p in section.find_data("func_param")]
+                functions[name] = (params, section.children[-1])
+            elif section.data == "integration_block":
+                self.integration += [_named(stmt, "integration") for stmt in section.children]
+            elif section.data == "initialize_block":
+                self.initialize += [_named(stmt, "initialize") for stmt in section.children]
+            elif section.data == "compute_section":
+                for child in section.children:
+                    if isinstance(child, Tree) and child.data == "top_level_stmt":
+                        self.compute.append(_named(child.children[0], "compute"))
+                    elif isinstance(child, Tree) and child.data == "case_statement":
+                        self.cases.append(_case(child))
+        self.compiler = ExprCompiler(functions)
+        for stmt in self.statements():
+            try:
+                stmt.fn, stmt.variables = self.compiler.compile(stmt.tree)
+            except Unsupported as exc:
+                stmt.error = str(exc)
+        for name, type_name in self.state.items():
+            if type_name.endswith("Boolean"):
+                self.compiler.booleans.update((name, state_name(name)))
+            elif not type_name.startswith("Base_Types"):
+                self.compiler.enum_of.setdefault(name, type_name)
+                self.compiler.enum_of.setdefault(state_name(name), type_name)
+
+    def statements(self) -> Iterable[Statement]:
+        yield from self.integration
+        yield from self.initialize
+        yield from self.compute
+        for case in self.cases:
+            yield from case.statements
+
+
+def _named(stmt: Tree, section: str) -> Statement:
+    kind = "assume" if "assume" in stmt.data else "guarantee"
+    if stmt.data.startswith("anon"):
+        return Statement(section, kind, kind, stmt.children[-1])
+    return Statement(section, str(stmt.children[0]), kind, stmt.children[-1])
+
+
+def _case(node: Tree) -> Case:
+    title = next((str(c).strip('"') for c in node.children[1:] if isinstance(c, Token)), None)
+    case = Case(str(node.children[0]), title)
+    body = next(c for c in node.children if isinstance(c, Tree) and c.data == "case_body")
+    for stmt in body.children:
+        target = case.assumes if stmt.data == "anon_assume_statement" else case.guarantees
+        target.append(Statement("case", case.name, "assume" if target is case.assumes else "guarantee",
+                                stmt.children[-1]))
+    return case
+
+
+# --- domains -------------------------------------------------------------------
+
+def _name_tokens(name: str) -> List[str]:
+    name = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name)
+    return [token for token in re.split(r"[^A-Za-z0-9]+", name.lower()) if token]
+
+
+def _range(text: str, real_step: float) -> Optional[np.ndarray]:
+    match = re.search(r"\[\s*(-?[\d.]+)\s*\.\.\s*(-?[\d.]+)\s*\]", text)
+    if not match:
+        return None
+    low, high = match.groups()
+    if "." in low or "." in high:
+        return np.arange(float(low), float(high) + real_step / 2, real_step)
+    return np.arange(int(low), int(high) + 1, dtype=np.int64)
+
+
+def table_domains(tables_dir: str = TABLES_DIR, real_step: float = REAL_STEP) -> Dict[Tuple[str, ...], np.ndarray]:
+    """Name tokens of every table variable with a numeric range or value -> its values.
+    Only the name, Range and Value columns are read from the table store."""
+    domains: Dict[Tuple[str, ...], np.ndarray] = {}
+    with open_tables(tables_dir) as store:
+        for key in store.table_ids():
+            columns = store.meta(key)["columns"]
+            if "Range" not in columns and "Value" not in columns:
+                continue
+            firsts = store.column(key, columns[0])
+            names = store.column(key, "Name") if "Name" in columns else firsts
+            ranges = store.column(key, "Range") if "Range" in columns else [""] * len(firsts)
+            constants = store.column(key, "Value") if "Value" in columns else [""] * len(firsts)
+            for name, first, range_text, value in zip(names, firsts, ranges, constants):
+                name = name or first
+                values = _range(range_text, real_step)
+                if values is None and re.fullmatch(r"\s*-?\d+(\.\d+)?\s*", value):
+                    text = value.strip()
+                    values = np.array([float(text) if "." in text else int(text)])
+                if values is not None and name:
+                    domains.setdefault(tuple(_name_tokens(name)), values)
+    return domains
+
+
+def match_domain(variable: str, domains: Dict[Tuple[str, ...], np.ndarray]) -> Optional[np.ndarray]:
+    """Table domain of a contract variable: In() and the Wstatus/.degrees wrapping are
+    ignored and each name token may abbreviate the table's (temp -> temperature)."""
+    base = variable[3:-1] if variable.startswith("In(") else variable
+    base = re.sub(r"_?[Ww]status$", "", base.split(".")[0])
+    tokens = _name_tokens(base)
+    for name, values in domains.items():
+        if len(name) == len(tokens) and all(full.startswith(short) for short, full in zip(tokens, name)):
+            return values
+    return None
+
+
+def parse_domain(text: str, real_step: float = REAL_STEP) -> np.ndarray:
+    """`lo..hi` (integers, or reals every real_step) or a comma-separated list."""
+    if ".." in text:
+        return _range(f"[{text}]", real_step)
+    values = [value.strip() for value in text.split(",")]
+    return np.array([float(v) if "." in v else int(v) for v in values])
+
+
+# --- the check -------------------------------------------------------------------
+
+class Grid:
+    """One broadcast axis per variable; inputs first, outputs last."""
+
+    def __init__(self, inputs: List[str], outputs: List[str], domains: Dict[str, np.ndarray]) -> None:
+        self.inputs = inputs
+        self.outputs = outputs
+        self.names = inputs + outputs
+        self.values = [domains[name] for name in self.names]
+        self.shape = tuple(len(values) for values in self.values)
+        self.input_shape = self.shape[:len(inputs)] + (1,) * len(outputs)
+        self.env = {}
+        for axis, (name, values) in enumerate(zip(self.names, self.values)):
+            shape = [1] * len(self.names)
+            shape[axis] = len(values)
+            self.env[name] = values.reshape(shape)
+
+    @property
+    def points(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    def evaluate(self, statements: List[Statement], shape: Tuple[int, ...]) -> np.ndarray:
+        """Conjunction of the statements, broadcast to `shape` (input_shape or shape)."""
+        result = np.ones(shape, dtype=bool)
+        for stmt in statements:
+            result &= np.broadcast_to(np.asarray(stmt.fn(self.env), dtype=bool), shape)
+        return result
+
+    def exists_output(self, mask: np.ndarray) -> np.ndarray:
+        """Over input points: is there an output assignment with mask true?"""
+        if not self.outputs:
+            return mask
+        return mask.any(axis=tuple(range(len(self.inputs), len(self.names))), keepdims=True)
+
+
+def _witnesses(grid: Grid, mask: np.ndarray, compiler: ExprCompiler) -> List[Dict[str, Any]]:
+    found = []
+    for index in np.argwhere(mask)[:MAX_WITNESSES]:
+        point = {}
+        for name, values, i in zip(grid.inputs, grid.values, index):
+            value = values[i].item()
+            point[name] = compiler.decode(value) if name in compiler.enum_of else value
+        found.append(point)
+    return found
+
+
+def precheck(annex: Annex, domains: Optional[Dict[str, Any]] = None, tables_dir: str = TABLES_DIR,
+             real_step: float = REAL_STEP, max_points: int = MAX_POINTS) -> Dict[str, Any]:
+    """Gaps, overlaps and contradictions of the annex's compute_cases over the finite input space."""
+    started = time.perf_counter()
+    compiler = annex.compiler
+    tables = table_domains(tables_dir, real_step)
+    explicit = {name: np.asarray(values) for name, values in (domains or {}).items()}
+
+    def domain(name: str) -> Optional[np.ndarray]:
+        if name in explicit:
+            return explicit[name]
+        if name in compiler.enum_of:
+            return np.array(compiler.enum_values(compiler.enum_of[name]), dtype=np.int64)
+        if name in compiler.booleans or name.endswith(".flag"):
+            return np.array([False, True])
+        return match_domain(name, tables)
+
+    skipped, unbound = [], set()
+    usable: List[Statement] = []
+    for stmt in annex.statements():
+        missing = sorted(name for name in stmt.variables if domain(name) is None)
+        if stmt.error or missing:
+            unbound.update(missing)
+            skipped.append({"section": stmt.section, "name": stmt.name, "kind": stmt.kind,
+                            "reason": stmt.error or f"no domain for {', '.join(missing)}"})
+        else:
+            usable.append(stmt)
+    read = {name for stmt in usable if stmt.kind == "assume" for name in stmt.variables}
+    read |= {name for stmt in usable for name in stmt.variables if name in annex.state or name.startswith("In(")}
+    written = {name for stmt in usable if stmt.kind == "guarantee" for name in stmt.variables} - read
+    grid = Grid(sorted(read), sorted(written), {name: domain(name) for name in read | written})
+    if grid.points > max_points:
+        raise ValueError(f"{grid.points} points over {len(grid.names)} variables exceeds {max_points}; "
+                         f"narrow the domains")
+    ok = set(map(id, usable))
+
+    def only(statements: List[Statement]) -> List[Statement]:
+        return [stmt for stmt in statements if id(stmt) in ok]
+
+    env_assumes = [s for s in only(annex.integration + annex.compute) if s.kind == "assume"]
+    env_guarantees = [s for s in only(annex.integration + annex.compute) if s.kind == "guarantee"]
+    valid = grid.evaluate(env_assumes, grid.input_shape)
+    always = grid.evaluate(env_guarantees, grid.shape)
+    cases = [case for case in annex.cases if only(case.assumes) == case.assumes]
+    active = [grid.evaluate(case.assumes, grid.input_shape) & valid for case in cases]
+    holds = [grid.evaluate(only(case.guarantees), grid.shape) & always for case in cases]
+
+    report_cases = []
+    for case, assume, guarantee in zip(cases, active, holds):
+        unsat = assume & ~grid.exists_output(guarantee)
+        report_cases.append({"case": case.name, "covered": int(assume.sum()), "dead": not assume.any(),
+                             "unsat": int(unsat.sum()), "unsat_witnesses": _witnesses(grid, unsat, compiler)})
+
+    covered = np.zeros(grid.input_shape, dtype=bool)
+    for assume in active:
+        covered |= assume
+    gaps = valid & ~covered
+
+    overlaps = []
+    for i in range(len(cases)):
+        for j in range(i + 1, len(cases)):
+            both = active[i] & active[j]
+            if not both.any():
+                continue
+            conflict = both & ~grid.exists_output(holds[i] & holds[j])
+            overlaps.append({"cases": [cases[i].name, cases[j].name], "points": int(both.sum()),
+                             "conflicts": int(conflict.sum()), "conflict_witnesses": _witnesses(grid, conflict, compiler)})
+
+    joint = np.broadcast_to(always, grid.shape).copy()
+    for assume, guarantee in zip(active, holds):
+        joint &= ~assume | guarantee
+    contradictions = valid & ~grid.exists_output(joint)
+
+    init = only(annex.initialize)
+    report = {
+        "points": grid.points,
+        "valid_inputs": int(valid.sum()),
+        "inputs": {name: len(values) for name, values in zip(grid.inputs, grid.values)},
+        "outputs": {name: len(values) for name, values in zip(grid.outputs, grid.values[len(grid.inputs):])},
+        "cases": report_cases,
+        "gaps": int(gaps.sum()),
+        "gap_witnesses": _witnesses(grid, gaps, compiler),
+        "overlaps": overlaps,
+        "contradictions": int(contradictions.sum()),
+        "contradiction_witnesses": _witnesses(grid, contradictions, compiler),
+        "initialize_satisfiable": bool(grid.evaluate(init, grid.shape).any()) if init else None,
+        "skipped": skipped,
+        "unbound": sorted(unbound),
+    }
+    report["status"] = "failed" if (
+        report["contradictions"] or report["initialize_satisfiable"] is False
+        or any(c["unsat"] or c["dead"] for c in report_cases)
+        or any(o["conflicts"] for o in overlaps)
+    ) else "passed"
+    report["time_sec"] = round(time.perf_counter() - started, 4)
+    return report
+
+
+def precheck_annex(text: str, domains: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+    """`precheck` of an annex given as a `language "GUMBO"` block or as its body."""
+    return precheck(Annex(parse_annex(text)), domains, **kwargs)
+
+
+def precheck_part(sysml_root: str, part_name: str, domains: Optional[Dict[str, Any]] = None,
+                  **kwargs) -> Dict[str, Any]:
+    """`precheck` of a part def's annex in an indexed SysML tree."""
+    from .sysml_index import shared_index
+
+    index = shared_index(sysml_root)
+    for part in index.find(part_name):
+        if part.annex is None:
+            continue
+        if part.annex.error:
+            return {"part_name": part_name, "status": "parse_error", "error": part.annex.error}
+        tree = part.annex.ast if part.annex.ast is not None else parse_annex(index.annex_text(part))
+        try:
+            return {"part_name": part_name, **precheck(Annex(tree), domains, **kwargs)}
+        except ValueError as exc:  # input space too large to enumerate
+            return {"part_name": part_name, "status": "skipped", "error": str(exc)}
+    return {"part_name": part_name, "status": "no_annex"}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Finite-domain pre-check of GUMBO compute_cases.")
+    parser.add_argument("source", help="annex file, or a SysML directory together with PART")
+    parser.add_argument("part", nargs="?", help="part def name when SOURCE is a SysML directory")
+    parser.add_argument("--domain", action="append", default=[], metavar="VAR=LO..HI",
+                        help="override or add a variable's domain (repeatable)")
+    parser.add_argument("--real-step", type=float, default=REAL_STEP)
+    args = parser.parse_args(argv)
+    domains = {}
+    for item in args.domain:
+        name, _, values = item.partition("=")
+        domains[name] = parse_domain(values, args.real_step)
+    if args.part:
+        report = precheck_part(args.source, args.part, domains, real_step=args.real_step)
+    else:
+        with open(args.source, "r", encoding="utf-8") as infile:
+            report = precheck_annex(infile.read(), domains, real_step=args.real_step)
+    print(json.dumps(report, indent=2))
+    return 0 if report["status"] == "passed" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,113 @@
 
 from agents import function_tool
-import json, os
+import json, os, re
+from typing import Optional
+from .context_slicer import cached_slice, component_slice
+from .gumbo_precheck import precheck_part
+from .gumbo_translator import range_assumes, render_cases, translate_requirements
+from .sysml_index import shared_index
+from .sysml_writer import apply_annex_edits
 
-@function_tool
-def generate_gumbo(json_tables: str, sysml_model_path: str) -> str:
-    """Build a classic GUMBO annex (Lark grammar). Returns annex text.
-    (You can extend this to write the updated model file on disk.)
+def gumbo_annex(data: dict, component: Optional[str] = None) -> str:
+    """Classic GUMBO annex text for extracted tables (see `generate_gumbo`).
+    Requirements the translation rules cover get concrete cases; the rest stay
+    `assume true; guarantee true;` placeholders, marked TODO(llm).
+    With a component, only its slice of the tables is used (see tools/context_slicer.py).
     """
-    data = json.loads(json_tables)
+    if component and data.get("component") != component:
+        data = cached_slice(data, component)
+    translation = translate_requirements(data.get("requirements", []), component)
+    variables = [v for case in translation["cases"] for v in re.findall(r"[A-Za-z_][\w.]*", case["assume"] + " " + case["guarantee"])]
     lines = []
     lines.append('language "GUMBO" /*{')
+    # state
+    if translation["state"]:
+        lines.append('    state')
+        for name, type_name in sorted(translation["state"].items()):
+            lines.append(f'        {name}: {type_name};')
+        lines.append('')
     # integration
     lines.append('    integration')
     for i, a in enumerate(data.get("assumptions", []), 1):
-        desc = a.get("raw", f"Assumption {i}").replace('"','\"')
+        desc = a.get("raw", f"Assumption {i}").replace('"', "'")
         lines.append(f'        assume A{i} "{desc}" : true;')
+    for a in range_assumes(variables):
+        lines.append(f'        assume {a["name"]} "{a["title"]}" : {a["expr"]};')
     lines.append('')
     # initialize
     lines.append('    initialize')
-    lines.append('        guarantee GI1 "init" : monitor_status = Init_Status;')
+    lines.append('        guarantee GI1 "init" : monitor_status == Init_Status;')
     lines.append('')
     # compute
     lines.append('    compute')
     lines.append('        compute_cases')
-    for i, r in enumerate(data.get("requirements", []), 1):
-        desc = r.get("raw", f"Requirement {i}").replace('"','\"')
-        lines.append(f'            case REQ_{i} "{desc}" :')
-        lines.append('                assume true;')
-        lines.append('                guarantee true;')
-    lines.append('*/')
+    lines.extend(render_cases(translation))
+    lines.append('}*/')
     return "\n".join(lines)
+
+@function_tool
+def generate_gumbo(json_tables: str, sysml_model_path: str) -> str:
+    """Build a classic GUMBO annex (Lark grammar). Returns annex text.
+    (You can extend this to write the updated model file on disk.)
+    """
+    data = json.loads(json_tables)
+    return gumbo_annex(data, data.get("component"))
+
+def annex_lookup(sysml_root: str, part_name: str) -> dict:
+    index = shared_index(sysml_root)
+    found = []
+    for part in index.find(part_name):
+        entry = {"path": part.path, "part_range": [part.start, part.end], "annex": None}
+        if part.annex is not None:
+            entry["annex"] = {
+                "range": [part.annex.start, part.annex.end],
+                "digest": part.annex.digest,
+                "parse_error": part.annex.error,
+                "text": index.annex_text(part),
+            }
+        found.append(entry)
+    return {"part_name": part_name, "matches": found}
+
+@function_tool
+def lookup_gumbo_annex(sysml_root: str, part_name: str) -> str:
+    """Look up a part def (e.g. Manage_Monitor_Interface_i) in the indexed SysML tree.
+    Returns JSON with its file, byte ranges, annex hash, parse error (if any) and annex text.
+    """
+    return json.dumps(annex_lookup(sysml_root, part_name))
+
+
+@function_tool
+def insert_gumbo_annexes(sysml_model_path: str, annexes_json: str) -> str:
+    """Insert or replace GUMBO annexes in a SysML model in a single atomic write.
+    `annexes_json` maps part def names (e.g. Manage_Monitor_Interface_i) to annex text
+    as returned by `generate_gumbo`. Returns JSON with the number of edits and bytes changed.
+    """
+    stats = apply_annex_edits(sysml_model_path, json.loads(annexes_json))
+    return json.dumps(stats)
+
+
+@function_tool
+def precheck_gumbo(sysml_root: str, part_name: str) -> str:
+    """Exhaustively check a part def's compute_cases over the table-derived input domains,
+    in milliseconds and without Sireum. Returns JSON with 'status', 'gaps', 'overlaps',
+    'contradictions' (with witness inputs) and per-case 'unsat'/'dead' flags.
+    """
+    return json.dumps(precheck_part(sysml_root, part_name))
+
+
+@function_tool
+def component_context(tables_json_path: str, component: str) -> str:
+    """Minimal context for one component (MRI, MRM, MHS, MMI, MMM, MA): its requirements, the table
+    rows and constants it references, and the matching variables and assumptions, with token counts
+    before/after slicing. Pass this bundle to `generate_gumbo` instead of the full tables JSON.
+    """
+    return json.dumps(component_slice(tables_json_path, component), ensure_ascii=False)
+
+
+@function_tool
+def translate_gumbo_requirements(json_tables: str, component: str) -> str:
+    """Translate a component's (MRI, MRM, MHS, MMI, MMM, MA) "shall" statements into GUMBO cases with
+    the deterministic R1-R7 rules. Returns JSON with 'cases' (assume/guarantee), 'state' declarations,
+    'unmatched' statements (only these need writing by hand) and 'local_fraction'.
+    """
+    return json.dumps(translate_requirements(json.loads(json_tables).get("requirements", []), component))
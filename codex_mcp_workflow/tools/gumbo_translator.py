@@ -0,0 +1,397 @@
+"""Rule-based English -> GUMBO translation of "shall" statements and table ranges.
+
+The meta-rules of Gumbo_FSE_agent_Plan.txt section 3 are mechanical, so requirements that
+follow them are translated here instead of by the Spec/Repair agents:
+
+    R1/R3/R7  If <guard>, the <out> shall be set to <value>     guarantee out == value
+    R2        If <guard>, the value of <out> shall not be changed  guarantee out == In(last)
+    R4        ... shall be set to the <range> (mux) / is UNSPECIFIED  copies / vacuous
+    R5        ... shall be set to <x> rounded to the nearest integer  round_to_nearest_int(x)
+
+Guards are clauses joined by and/or ("the Current Temperature is less than the Lower
+Alarm Temp or greater than the Upper Alarm Temp"): a clause without a subject reuses the
+previous one, a subject without a predicate takes the next one's, and consecutive
+clauses on the same subject are grouped before and/or precedence applies. Table rows
+with an integer range become integration assumes (section 2.3).
+
+Names come from VOCABULARY (English phrase -> GUMBO variable, enum literals, state
+variable). Whatever does not match a rule or the vocabulary is returned as `unmatched`
+for the LLM, with the fraction handled locally.
+
+    python -m tools.gumbo_translator tables.json --component MA
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from .gumbo_parser import WORKFLOW_DIR
+from .table_store import open_tables
+
+TABLES_DIR = os.path.join(WORKFLOW_DIR, "Isollete_tables")
+DATA_MODEL = "Isolette_Data_Model"
+
+_MODES = {"init": "Init_{}_Mode", "normal": "Normal_{}_Mode", "failed": "Failed_{}_Mode"}
+ON_OFF = {"on": "Onn", "off": "Off"}
+STATUS = {"init": "Init_Status", "on": "On_Status", "failed": "Failed_Status"}
+
+
+def _mode(kind: str) -> Dict[str, Any]:
+    return {"expr": f"{kind.lower()}_mode", "enum": f"{DATA_MODEL}::{kind}_Mode", "state": "lastMode",
+            "values": {word: literal.format(kind) for word, literal in _MODES.items()}}
+
+
+def _temp(name: str, wstatus: bool = True) -> Dict[str, Any]:
+    entry = {"expr": f"{name}.degrees"}
+    if wstatus:
+        entry.update(input=f"{name}Wstatus.degrees", status=f"{name}Wstatus.status")
+    return entry
+
+
+# English phrase (lower case, "temperature" spelled "temp") -> GUMBO naming of the isolette models
+VOCABULARY: Dict[str, Dict[str, Any]] = {
+    "regulator mode": _mode("Regulator"),
+    "regulator interface mode": _mode("Regulator"),
+    "monitor mode": _mode("Monitor"),
+    "monitor interface mode": _mode("Monitor"),
+    "heat control": {"expr": "heat_control", "enum": f"{DATA_MODEL}::On_Off", "values": ON_OFF, "state": "lastCmd"},
+    "alarm control": {"expr": "alarm_control", "enum": f"{DATA_MODEL}::On_Off", "values": ON_OFF, "state": "lastCmd"},
+    "alarm": {"expr": "alarm_control", "enum": f"{DATA_MODEL}::On_Off", "values": ON_OFF, "state": "lastCmd"},
+    "regulator status": {"expr": "regulator_status", "enum": f"{DATA_MODEL}::Status", "values": STATUS},
+    "monitor status": {"expr": "monitor_status", "enum": f"{DATA_MODEL}::Status", "values": STATUS},
+    "regulator interface failure": {"expr": "interface_failure.flag", "bool": True},
+    "monitor interface failure": {"expr": "interface_failure.flag", "bool": True},
+    "current temp": {"expr": "current_tempWstatus.degrees", "status": "current_tempWstatus.status"},
+    "display temp": {"expr": "displayed_temp.degrees"},
+    "displayed temp": {"expr": "displayed_temp.degrees"},
+    "lower desired temp": _temp("lower_desired_temp"),
+    "upper desired temp": _temp("upper_desired_temp"),
+    "lower alarm temp": _temp("lower_alarm_temp"),
+    "upper alarm temp": _temp("upper_alarm_temp"),
+}
+RANGES: Dict[str, Tuple[str, str]] = {
+    "desired range": ("lower desired temp", "upper desired temp"),
+    "desired temp range": ("lower desired temp", "upper desired temp"),
+    "alarm range": ("lower alarm temp", "upper alarm temp"),
+    "alarm temp range": ("lower alarm temp", "upper alarm temp"),
+}
+VALUE_STATUS = {"valid": f"{DATA_MODEL}::ValueStatus.Valid", "invalid": f"{DATA_MODEL}::ValueStatus.Invalid"}
+
+_ID = r"(?:(?P<id>REQ[-_ ][A-Z]+[-_ ]\d+)\s*[:.\-]?\s*)?"
+_IF = r"If\s+(?P<guard>.+?),\s*(?:then\s+)?"
+_SET = r"\s+shall\s+be\s+(?:set\s+(?:equal\s+)?to\s+)?"
+RULES: List[Tuple[str, "re.Pattern[str]"]] = [
+    ("R2", re.compile(_ID + _IF + r"(?P<out>.+?)\s+shall\s+not\s+be\s+changed\.?$", re.I)),
+    ("R4", re.compile(_ID + _IF + r"(?P<out>.+?)\s+(?:is|shall\s+be)\s+UNSPECIFIED\.?$", re.I)),
+    ("R5", re.compile(_ID + _IF + r"(?P<out>.+?)" + _SET + r"(?P<value>.+?)\s+rounded\s+to\s+the\s+nearest\s+integer\.?$", re.I)),
+    ("R1", re.compile(_ID + _IF + r"(?P<out>.+?)" + _SET + r"(?P<value>.+?)\.?$", re.I)),
+]
+# longest first, and before the guard is split on and/or ("less than or equal to")
+COMPARATORS = [
+    ("less than or equal to", "<="), ("greater than or equal to", ">="), ("not equal to", "!="),
+    ("less than", "<"), ("greater than", ">"), ("equal to", "=="), ("at most", "<="), ("at least", ">="),
+]
+_COMPARATOR_RE = re.compile("|".join(re.escape(phrase) for phrase, _ in COMPARATORS), re.I)
+_JOIN_RE = re.compile(r"\s+(and|or)\s+", re.I)
+_OPERAND_RE = re.compile(r"^(?P<name>.*?)\s*(?:(?P<op>[+-])\s*(?P<num>\d+(?:\.\d+)?))?\s*(?:°\s*F?|degrees)?$")
+_NUMBER_RE = re.compile(r"^-?\d+(?:\.\d+)?$")
+
+
+class Unmatched(ValueError):
+    pass
+
+
+def _phrase(text: str) -> Tuple[str, bool]:
+    """Vocabulary key of a noun phrase, and whether it asked for its Status attribute."""
+    text = text.strip().lower().replace("temperature", "temp")
+    status = False
+    match = re.match(r"^(?:the\s+)?status\s+(?:attribute\s+)?of\s+(.*)$", text)
+    if match:
+        text, status = match.group(1), True
+    text = re.sub(r"^(?:the\s+)?(?:value\s+of\s+)?(?:the\s+)?(?:manage\s+)?", "", text)
+    text = re.sub(r"\s+(?:variable|value|attribute)$", "", text)
+    return text.strip(), status
+
+
+def _entry(text: str) -> Tuple[str, Dict[str, Any], bool]:
+    key, status = _phrase(text)
+    if key not in VOCABULARY:
+        raise Unmatched(f"unknown term {text.strip()!r}")
+    return key, VOCABULARY[key], status
+
+
+def _operand(text: str) -> str:
+    text = text.strip()
+    if _NUMBER_RE.match(text):
+        return text
+    match = _OPERAND_RE.match(text)
+    _, entry, status = _entry(match.group("name"))
+    expr = entry["status"] if status else entry["expr"]
+    if match.group("op"):
+        expr = f"{expr} {match.group('op')} {match.group('num')}"
+    return expr
+
+
+class _Clause:
+    def __init__(self, subject: Optional[str], predicate: Optional[str]) -> None:
+        self.subject = subject
+        self.predicate = predicate
+
+
+def _split_clause(text: str) -> _Clause:
+    text = text.strip()
+    if text[:2] in ("<=", ">=", "!=", "==") or text[:1] in "<>":
+        return _Clause(None, text)
+    match = re.match(r"^(?P<subject>.+?)\s+(?:is|are|has\s+been|was)\s+(?P<predicate>.+)$", text, re.I)
+    if match:
+        return _Clause(match.group("subject"), match.group("predicate"))
+    if text.lower() in ("true", "false", "valid", "invalid") or text.lower() in _MODES:
+        return _Clause(None, text)
+    return _Clause(text, None)
+
+
+def _condition(subject: str, predicate: str, pre_state: Optional[Dict[str, Any]]) -> str:
+    _, entry, status = _entry(subject)
+    predicate = predicate.strip().rstrip(".")
+    word = predicate.lower()
+    if status or "status" in entry and word in VALUE_STATUS:
+        target = entry.get("status")
+        if target is None or word not in VALUE_STATUS:
+            raise Unmatched(f"cannot compare the status of {subject.strip()!r} with {predicate!r}")
+        return f"{target} == {VALUE_STATUS[word]}"
+    expr = entry["expr"]
+    if pre_state is not None and entry["expr"] == pre_state["expr"]:  # mode transitions: the guard reads the previous mode
+        expr = f"In({entry['state']})"
+    if entry.get("bool") and word in ("true", "false"):
+        return expr if word == "true" else f"not {expr}"
+    if word in entry.get("values", {}):
+        return f"{expr} == {entry['enum']}.{entry['values'][word]}"
+    match = re.match(r"^(<=|>=|!=|==|<|>)\s*(.+)$", predicate)
+    if match:
+        return f"{expr} {match.group(1)} {_operand(match.group(2))}"
+    raise Unmatched(f"cannot translate {subject.strip()!r} is {predicate!r}")
+
+
+def _join(items: List[str], connectors: List[str]) -> str:
+    """and binds tighter than or; each multi-clause conjunction gets parentheses."""
+    disjuncts, current = [], [items[0]]
+    for connector, item in zip(connectors, items[1:]):
+        if connector == "and":
+            current.append(item)
+        else:
+            disjuncts.append(current)
+            current = [item]
+    disjuncts.append(current)
+    if len(disjuncts) == 1:
+        return " & ".join(current)
+    return " | ".join(f"({' & '.join(d)})" if len(d) > 1 else d[0] for d in disjuncts)
+
+
+def translate_guard(text: str, pre_state: Optional[Dict[str, Any]] = None) -> str:
+    text = _COMPARATOR_RE.sub(lambda m: dict((p, s) for p, s in COMPARATORS)[m.group(0).lower()], text)
+    pieces = _JOIN_RE.split(text)
+    clauses = [_split_clause(piece) for piece in pieces[0::2]]
+    connectors = [piece.lower() for piece in pieces[1::2]]
+    for i, clause in enumerate(clauses):  # "less than A or greater than B": reuse the subject
+        if clause.subject is None:
+            if i == 0:
+                raise Unmatched(f"guard clause without a subject: {pieces[0]!r}")
+            clause.subject = clauses[i - 1].subject
+    for i in range(len(clauses) - 1, -1, -1):  # "A or B is Invalid": share the predicate
+        if clauses[i].predicate is None:
+            if i == len(clauses) - 1:
+                raise Unmatched(f"guard clause without a predicate: {pieces[-1]!r}")
+            clauses[i].predicate = clauses[i + 1].predicate
+    # group consecutive clauses on the same subject: "mode is NORMAL and temp is <a or >b"
+    groups: List[Tuple[List[str], List[str]]] = []
+    group_connectors: List[str] = []
+    previous = None
+    for i, clause in enumerate(clauses):
+        condition = _condition(clause.subject, clause.predicate, pre_state)
+        key = _phrase(clause.subject)
+        if groups and key == previous:
+            groups[-1][0].append(condition)
+            groups[-1][1].append(connectors[i - 1])
+        else:
+            if groups:
+                group_connectors.append(connectors[i - 1])
+            groups.append(([condition], []))
+        previous = key
+    parts = []
+    for conditions, inner in groups:
+        joined = _join(conditions, inner)
+        parts.append(f"({joined})" if len(conditions) > 1 and len(groups) > 1 else joined)
+    return _join(parts, group_connectors)
+
+
+def _assignment(out: str, value: str) -> str:
+    key, entry, _ = _entry(out) if _phrase(out)[0] not in RANGES else (None, None, False)
+    word = value.strip().lower()
+    if entry is None:  # mux: copy one range onto another
+        value_key = _phrase(value)[0]
+        if value_key not in RANGES:
+            raise Unmatched(f"cannot copy {value.strip()!r} onto {out.strip()!r}")
+        targets = [VOCABULARY[name] for name in RANGES[_phrase(out)[0]]]
+        sources = [VOCABULARY[name] for name in RANGES[value_key]]
+        return " & ".join(f"{t['expr']} == {s.get('input', s['expr'])}" for t, s in zip(targets, sources))
+    if entry.get("bool") and word in ("true", "false"):
+        return entry["expr"] if word == "true" else f"not {entry['expr']}"
+    if word in entry.get("values", {}):
+        return f"{entry['expr']} == {entry['enum']}.{entry['values'][word]}"
+    if _NUMBER_RE.match(word):
+        return f"{entry['expr']} == {word}"
+    source = _entry(value)[1]
+    return f"{entry['expr']} == {source.get('input', source['expr'])}"
+
+
+def statement_text(requirement: Any) -> str:
+    if isinstance(requirement, str):
+        return requirement
+    return requirement.get("text") or requirement.get("raw") or " ".join(requirement.get("cells", []))
+
+
+def translate_statement(text: str) -> Dict[str, Any]:
+    """One "shall" statement -> {"id", "rule", "assume", "guarantee", "state"}; raises Unmatched."""
+    sentence = " ".join(text.split())
+    for rule, pattern in RULES:
+        match = pattern.search(sentence)
+        if not match:
+            continue
+        out = match.group("out")
+        state = {}
+        if rule == "R4":
+            guarantee = "true"  # UNSPECIFIED: left unconstrained
+        elif rule == "R2":
+            _, entry, _ = _entry(out)
+            if "state" not in entry:
+                raise Unmatched(f"no state variable to hold {out.strip()!r}")
+            guarantee = f"{entry['expr']} == In({entry['state']})"
+            state[entry["state"]] = entry["enum"]
+        elif rule == "R5":
+            _, entry, _ = _entry(out)
+            guarantee = f"{entry['expr']} == round_to_nearest_int({_operand(match.group('value'))})"
+        else:
+            guarantee = _assignment(out, match.group("value"))
+        out_entry = VOCABULARY.get(_phrase(out)[0], {})
+        pre_state = out_entry if "state" in out_entry else None
+        assume = translate_guard(match.group("guard"), pre_state)
+        transition = pre_state is not None and f"In({pre_state['state']})" in assume
+        if transition:  # R7: the guard reads the output's previous value
+            state[pre_state["state"]] = pre_state["enum"]
+        req_id = _case_id(match.group("id")) if match.group("id") else None
+        return {"id": req_id, "rule": "R7" if transition else rule, "assume": assume, "guarantee": guarantee,
+                "state": state, "text": sentence}
+    raise Unmatched("no rule matches")
+
+
+REQ_ID_RE = re.compile(r"REQ[-_ ]([A-Z]+)[-_ ]\d+")
+
+
+def _case_id(req_id: str) -> str:
+    return re.sub(r"[-\s]", "_", req_id)
+
+
+def requirement_component(text: str) -> Optional[str]:
+    match = REQ_ID_RE.search(text)
+    return match.group(1) if match else None
+
+
+def translate_requirements(requirements: List[Any], component: Optional[str] = None) -> Dict[str, Any]:
+    """Translate what the rules cover; the rest is returned as `unmatched` for the LLM."""
+    cases, unmatched, state = [], [], {}
+    for requirement in requirements:
+        text = statement_text(requirement)
+        if component and requirement_component(text) not in (component, None):
+            continue
+        if not re.search(r"\bshall\b|\bUNSPECIFIED\b", text, re.I):
+            unmatched.append({"text": " ".join(text.split()), "reason": "not a shall statement"})
+            continue
+        try:
+            case = translate_statement(text)
+        except Unmatched as exc:
+            unmatched.append({"text": " ".join(text.split()), "reason": str(exc)})
+            continue
+        state.update(case.pop("state"))
+        cases.append(case)
+    total = len(cases) + len(unmatched)
+    return {
+        "component": component,
+        "cases": cases,
+        "state": state,
+        "unmatched": unmatched,
+        "local_fraction": round(len(cases) / total, 3) if total else None,
+    }
+
+
+def range_assumes(variables: List[str], tables_dir: str = TABLES_DIR) -> List[Dict[str, str]]:
+    """Integration assumes for table rows with an integer range whose variable is used (plan 2.3)."""
+    wanted = {}
+    for key, entry in VOCABULARY.items():
+        for expr in (entry.get("input"), entry["expr"]):
+            if expr in variables:
+                wanted.setdefault(key, expr)
+    assumes = []
+    for key, lower in list(wanted.items()):
+        upper = wanted.get("upper" + key[len("lower"):]) if key.startswith("lower ") else None
+        if upper:
+            title = key.title().replace(" ", "")
+            assumes.append({
+                "name": f"{title}_Order",
+                "title": f"{key} below {'upper' + key[len('lower'):]} (operator interface)",
+                "expr": f"{lower} < {upper}",
+            })
+    with open_tables(tables_dir) as store:
+        for table in store.tables_with_column("Range"):
+            table_id = store.meta(table)["table_id"]
+            names = store.column(table, "Name") if "Name" in store.meta(table)["columns"] else []
+            for row_name, row_range in zip(names, store.column(table, "Range")):
+                key = _phrase(row_name)[0]
+                match = re.fullmatch(r"\[\s*(-?\d+)\s*\.\.\s*(-?\d+)\s*\]", row_range.strip())
+                if key in wanted and match:
+                    name = f"{table_id}_{row_name}".replace("-", "_").replace(" ", "")
+                    expr = wanted.pop(key)
+                    assumes.append({
+                        "name": name,
+                        "title": f"{row_name} range {row_range} ({table_id})",
+                        "expr": f"{match.group(1)} [s32] <= {expr} & {expr} <= {match.group(2)} [s32]",
+                    })
+    return assumes
+
+
+def render_cases(translation: Dict[str, Any], indent: str = "            ") -> List[str]:
+    """compute_cases lines: translated cases, then placeholders marking what the LLM must write."""
+    lines = []
+    for i, case in enumerate(translation["cases"], 1):
+        title = case["text"].replace('"', "'")
+        lines.append(f'{indent}case {case["id"] or f"REQ_{i}"} "{title}" :')
+        lines.append(f"{indent}    assume {case['assume']};")
+        lines.append(f"{indent}    guarantee {case['guarantee']};")
+    for i, item in enumerate(translation["unmatched"], len(translation["cases"]) + 1):
+        title = item["text"].replace('"', "'")
+        req_id = REQ_ID_RE.search(item["text"])
+        lines.append(f"{indent}// TODO(llm): not matched by the translation rules ({item['reason']})")
+        lines.append(f'{indent}case {_case_id(req_id.group(0)) if req_id else f"REQ_{i}"} "{title}" :')
+        lines.append(f"{indent}    assume true;")
+        lines.append(f"{indent}    guarantee true;")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rule-based English -> GUMBO translation of shall statements.")
+    parser.add_argument("tables", help="extracted tables JSON (with 'requirements'), or a text file of statements")
+    parser.add_argument("--component", help="only REQ-<COMPONENT>-n statements (MRI, MRM, MHS, MMI, MMM, MA)")
+    args = parser.parse_args(argv)
+    with open(args.tables, "r", encoding="utf-8") as infile:
+        text = infile.read()
+    try:
+        requirements = json.loads(text).get("requirements", [])
+    except ValueError:
+        requirements = [line for line in text.splitlines() if line.strip()]
+    print(json.dumps(translate_requirements(requirements, args.component), indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Record/replay cache for model responses, for fast offline reruns and benchmarks.
+
+Each agent's model is wrapped (`cache_agents`); a response is keyed on the agent name,
+model name, model settings, system instructions, tool/handoff schemas and the normalized
+input transcript. Normalization drops item ids, renumbers tool call ids in order of
+appearance, replaces temporary directories with <tmp> and removes timing fields
+(time_sec, ts, ...) from JSON tool outputs, so a rerun on unchanged inputs hits.
+
+Modes (LLM_CACHE_MODE or `orchestrate.py --llm-cache`):
+    off     no caching
+    record  always call the model and store the response
+    replay  serve stored responses only; a miss raises LLMCacheMiss (no network)
+    auto    serve stored responses, call and record on a miss
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from agents.items import ModelResponse
+from agents.models.default_models import get_default_model
+from agents.models.interface import Model
+from agents.models.multi_provider import MultiProvider
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputItem
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+from pydantic import TypeAdapter
+
+from .content_cache import CACHE_ROOT, ContentCache, make_key
+
+CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join(CACHE_ROOT, "llm_responses"))
+MAX_BYTES = 1024 * 1024 * 1024
+MODES = ("off", "record", "replay", "auto")
+VOLATILE_FIELDS = {"time_sec", "time_sec_saved", "wall_time_sec", "wall_sec", "ts", "startup_sec", "cache_hit"}
+
+_OUTPUT_ITEM = TypeAdapter(ResponseOutputItem)
+_TMP = re.compile(re.escape(tempfile.gettempdir()) + r"/[^/\s\"']+")
+
+
+class LLMCacheMiss(RuntimeError):
+    pass
+
+
+def _normalize_text(text: str) -> str:
+    return _TMP.sub("<tmp>", text)
+
+
+def _scrub(value: Any) -> Any:
+    """Temp paths replaced and timing fields dropped, recursively."""
+    if isinstance(value, dict):
+        return {k: _scrub(v) for k, v in value.items() if k not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [_scrub(v) for v in value]
+    if isinstance(value, str):
+        return _normalize_text(value)
+    return value
+
+
+def _dump(item: Any) -> Any:
+    if hasattr(item, "model_dump"):
+        return item.model_dump(exclude_none=True)
+    return item
+
+
+def normalize_input(input: Any) -> Any:
+    """The transcript with run-specific ids, temp paths and timings removed."""
+    if isinstance(input, str):
+        return _normalize_text(input)
+    call_ids: Dict[str, str] = {}
+    items = []
+    for item in input:
+        item = dict(_dump(item))
+        item.pop("id", None)
+        if "call_id" in item:
+            item["call_id"] = call_ids.setdefault(item["call_id"], f"call_{len(call_ids)}")
+        if item.get("type") == "function_call_output" and isinstance(item.get("output"), str):
+            try:
+                item["output"] = json.loads(item["output"])
+            except ValueError:
+                pass
+        items.append(_scrub(item))
+    return items
+
+
+def _tool_schema(tool: Any) -> Any:
+    schema = getattr(tool, "params_json_schema", None)
+    return [getattr(tool, "name", type(tool).__name__), schema]
+
+
+def _usage_payload(usage: Usage) -> dict:
+    return {
+        "requests": usage.requests,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+        "input_tokens_details": _dump(usage.input_tokens_details),
+        "output_tokens_details": _dump(usage.output_tokens_details),
+    }
+
+
+def _load_response(payload: dict) -> ModelResponse:
+    usage = payload["usage"]
+    return ModelResponse(
+        output=[_OUTPUT_ITEM.validate_python(item) for item in payload["output"]],
+        usage=Usage(
+            requests=usage["requests"],
+            input_tokens=usage["input_tokens"],
+            output_tokens=usage["output_tokens"],
+            total_tokens=usage["total_tokens"],
+            input_tokens_details=InputTokensDetails.model_validate(usage["input_tokens_details"]),
+            output_tokens_details=OutputTokensDetails.model_validate(usage["output_tokens_details"]),
+        ),
+        response_id=None,  # a replayed response cannot be continued server-side
+    )
+
+
+class LLMCache:
+    """Stored responses plus hit/miss counters, shared by every wrapped model."""
+
+    def __init__(self, mode: str = "auto", root: str = CACHE_DIR) -> None:
+        if mode not in MODES:
+            raise ValueError(f"unknown LLM cache mode {mode!r} (expected one of {', '.join(MODES)})")
+        self.mode = mode
+        self.store = ContentCache(root, MAX_BYTES)
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.time_sec_saved = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        if self.mode not in ("replay", "auto"):
+            return None  # record/off never read the store: neither a hit nor a miss
+        payload = self.store.get(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.tokens_saved += payload["usage"]["total_tokens"]
+                self.time_sec_saved += payload.get("time_sec", 0.0)
+        return payload
+
+    def put(self, key: str, response: ModelResponse, time_sec: float) -> None:
+        self.store.put(key, {
+            "output": [_dump(item) for item in response.output],
+            "usage": _usage_payload(response.usage),
+            "time_sec": round(time_sec, 3),
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "tokens_saved": self.tokens_saved,
+            "time_sec_saved": round(self.time_sec_saved, 3),
+        }
+
+
+class CachedModel(Model):
+    """Model wrapper for one agent; the underlying model is only created on a miss."""
+
+    def __init__(self, agent_name: str, model: Any, cache: LLMCache) -> None:
+        self.agent_name = agent_name
+        self.model_name = model if isinstance(model, str) else getattr(model, "model", None) or get_default_model()
+        self.cache = cache
+        self._model = model if isinstance(model, Model) else None
+        self._model_arg = None if isinstance(model, Model) else model
+
+    @property
+    def model(self) -> Model:
+        if self._model is None:
+            self._model = MultiProvider().get_model(self._model_arg)
+        return self._model
+
+    def key(self, system_instructions, input, model_settings, tools, output_schema, handoffs) -> str:
+        return make_key(
+            self.agent_name,
+            self.model_name,
+            model_settings.to_json_dict() if model_settings is not None else None,
+            _normalize_text(system_instructions or ""),
+            [_tool_schema(tool) for tool in tools],
+            output_schema.json_schema() if output_schema is not None else None,
+            [[handoff.tool_name, handoff.input_json_schema] for handoff in handoffs],
+            normalize_input(input),
+        )
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, conversation_id=None, prompt=None):
+        key = self.key(system_instructions, input, model_settings, tools, output_schema, handoffs)
+        payload = self.cache.get(key)
+        if payload is not None:
+            return _load_response(payload)
+        if self.cache.mode == "replay":
+            raise LLMCacheMiss(f"no recorded response for agent {self.agent_name!r} (key {key[:12]})")
+        started = time.perf_counter()
+        response = await self.model.get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, conversation_id=conversation_id, prompt=prompt,
+        )
+        self.cache.put(key, response, time.perf_counter() - started)
+        return response
+
+    def stream_response(self, *args, **kwargs):
+        """Streaming is not cached; it goes straight to the underlying model."""
+        return self.model.stream_response(*args, **kwargs)
+
+
+def cache_agents(agents: List[Any], cache: LLMCache) -> None:
+    """Wrap each agent's model in place (handoffs keep pointing at the same agents)."""
+    if cache.mode == "off":
+        return
+    for agent in agents:
+        if not isinstance(agent.model, CachedModel):
+            agent.model = CachedModel(agent.name, agent.model, cache)
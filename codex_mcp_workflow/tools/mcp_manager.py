@@ -0,0 +1,180 @@
+"""Long-lived Codex MCP servers shared by every run in a process.
+
+The `codex` executable is resolved once (CODEX_MCP_COMMAND, then PATH, then the newest
+npx cache entry, and only then `npx -y codex mcp`), so starts skip npx resolution. A
+supervisor task owns the servers: it connects them, health-checks each one with
+list_tools every CODEX_MCP_HEALTH_INTERVAL seconds and restarts a server that fails, in
+place, so agents holding the server object keep working. MCP sessions must be opened
+and closed on the same task, which is why restarts never happen on the caller's task.
+
+The servers live only as long as the `async with` block, so they are shared by the runs
+of one process, not across processes. To share one server across separate runs, start it
+once as a streamable-HTTP server and set CODEX_MCP_URL in every run: the manager then
+attaches to it (and reconnects after a failed health check) instead of spawning one, and
+never stops it (e.g. `python -m tools.stub_mcp_server --http` for offline runs).
+
+    python -m tools.mcp_manager --command "python tools/stub_mcp_server.py"
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import shlex
+import shutil
+import sys
+import time
+from typing import Dict, List, Optional
+
+from agents.mcp import MCPServerStdio, MCPServerStreamableHttp
+
+HEALTH_INTERVAL = float(os.getenv("CODEX_MCP_HEALTH_INTERVAL", "30"))
+HEALTH_TIMEOUT = float(os.getenv("CODEX_MCP_HEALTH_TIMEOUT", "10"))
+SESSION_TIMEOUT = 360000
+
+
+def resolve_codex_command() -> List[str]:
+    """The command line that starts `codex mcp`, without going through npx when possible."""
+    if os.getenv("CODEX_MCP_COMMAND"):
+        return shlex.split(os.environ["CODEX_MCP_COMMAND"])
+    codex = shutil.which("codex")
+    if codex is None:
+        cached = glob.glob(os.path.expanduser(os.path.join("~", ".npm", "_npx", "*", "node_modules", ".bin", "codex")))
+        codex = max(cached, key=os.path.getmtime) if cached else None
+    if codex is None:
+        return ["npx", "-y", "codex", "mcp"]
+    return [codex, "mcp"]
+
+
+class CodexMCPManager:
+    """Async context manager owning `size` Codex MCP servers.
+
+        async with CodexMCPManager() as manager:
+            agent = Agent(..., mcp_servers=[manager.server])
+    """
+
+    def __init__(self, command: Optional[List[str]] = None, size: int = 1, url: Optional[str] = None,
+                 health_interval: float = HEALTH_INTERVAL, health_timeout: float = HEALTH_TIMEOUT) -> None:
+        self.url = url if url is not None else os.getenv("CODEX_MCP_URL")
+        started = time.perf_counter()
+        self.command = command or ([] if self.url else resolve_codex_command())
+        self.resolve_sec = time.perf_counter() - started
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.servers = [self._make_server(i) for i in range(size)]
+        self.startup_sec: List[float] = []
+        self.restarts = 0
+        self.health_checks = 0
+        self.failed_checks = 0
+        self._ready = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _make_server(self, index: int):
+        name = f"Codex CLI {index}" if index else "Codex CLI"
+        if self.url:
+            return MCPServerStreamableHttp(name=name, params={"url": self.url},
+                                           client_session_timeout_seconds=SESSION_TIMEOUT)
+        return MCPServerStdio(name=name, params={"command": self.command[0], "args": self.command[1:]},
+                              client_session_timeout_seconds=SESSION_TIMEOUT)
+
+    @property
+    def server(self):
+        return self.servers[0]
+
+    def request_health_check(self) -> None:
+        """Ask the supervisor to check (and if needed restart) the servers now."""
+        self._wake.set()
+
+    async def _start(self, server) -> None:
+        started = time.perf_counter()
+        await server.connect()
+        self.startup_sec.append(round(time.perf_counter() - started, 3))
+
+    async def _healthy(self, server) -> bool:
+        self.health_checks += 1
+        try:
+            await asyncio.wait_for(server.list_tools(), self.health_timeout)
+            return True
+        except Exception:
+            self.failed_checks += 1
+            return False
+
+    async def _supervise(self) -> None:
+        try:
+            await asyncio.gather(*(self._start(server) for server in self.servers))
+        except BaseException as exc:
+            self._error = exc
+            self._ready.set()
+            await asyncio.gather(*(server.cleanup() for server in self.servers), return_exceptions=True)
+            return
+        self._ready.set()
+        try:
+            while not self._stop.is_set():
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.health_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                if self._stop.is_set():
+                    break
+                for server in self.servers:
+                    if not await self._healthy(server):
+                        await server.cleanup()
+                        try:
+                            await self._start(server)
+                            self.restarts += 1
+                        except Exception as exc:  # keep supervising; the next check retries
+                            print(f"codex mcp restart failed: {exc}", file=sys.stderr)
+        finally:
+            for server in self.servers:
+                await server.cleanup()
+
+    async def __aenter__(self) -> "CodexMCPManager":
+        self._task = asyncio.create_task(self._supervise())
+        await self._ready.wait()
+        if self._error is not None:
+            await self._task
+            raise self._error
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._wake.set()
+        await self._task
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "command": self.command,
+            "url": self.url,
+            "resolve_sec": round(self.resolve_sec, 6),
+            "startup_sec": self.startup_sec,
+            "servers": len(self.servers),
+            "health_checks": self.health_checks,
+            "failed_checks": self.failed_checks,
+            "restarts": self.restarts,
+        }
+
+
+async def _probe(command: Optional[List[str]], size: int) -> dict:
+    async with CodexMCPManager(command, size=size) as manager:
+        tools = await manager.server.list_tools()
+        stats = manager.stats()
+    stats["tools"] = [tool.name for tool in tools]
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Start Codex MCP servers, list their tools and report startup latency.")
+    parser.add_argument("--command", help="server command line (default: resolved codex mcp)")
+    parser.add_argument("--size", type=int, default=1)
+    args = parser.parse_args(argv)
+    command = shlex.split(args.command) if args.command else None
+    print(json.dumps(asyncio.run(_probe(command, args.size)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""Append-only metrics log for the adaptation plans (replaces rewriting progress.json).
+
+Records go to an SQLite database in WAL mode: one INSERT per record, each in its own
+transaction, so a crash loses at most the record being written. Every numeric field of
+a record also updates a running aggregate (count, sum, min, max and a P-squared streaming
+median) keyed by (plan, kind, field) in the same transaction, so reports read a handful
+of aggregate rows instead of the history.
+
+    python -m tools.metrics_store report --plan v3
+    python -m tools.metrics_store query --kind final --contract Manage_Alarm_i
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterator, List, Optional
+
+METRICS_PATH = os.path.join("Gumbo_FSE_plans_progress_json_logs", "metrics.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    plan TEXT,
+    contract TEXT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_kind ON records (kind, plan, contract);
+CREATE INDEX IF NOT EXISTS records_contract ON records (contract, kind);
+CREATE TABLE IF NOT EXISTS aggregates (
+    plan TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    field TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    low REAL NOT NULL,
+    high REAL NOT NULL,
+    quantile TEXT NOT NULL,
+    PRIMARY KEY (plan, kind, field)
+);
+"""
+
+
+class P2Median:
+    """Jain & Chlamtac's P-squared estimator of the median: five markers, O(1) per value."""
+
+    def __init__(self, state: Optional[dict] = None) -> None:
+        state = state or {}
+        self.heights: List[float] = state.get("q", [])
+        self.positions: List[float] = state.get("n", [1, 2, 3, 4, 5])
+        self.desired: List[float] = state.get("d", [1, 2, 3, 4, 5])
+
+    def state(self) -> dict:
+        return {"q": self.heights, "n": self.positions, "d": self.desired}
+
+    def add(self, x: float) -> None:
+        q, n, d = self.heights, self.positions, self.desired
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i, step in enumerate((0.0, 0.25, 0.5, 0.75, 1.0)):
+            d[i] += step
+        for i in (1, 2, 3):
+            delta = d[i] - n[i]
+            if (delta >= 1 and n[i + 1] - n[i] > 1) or (delta <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if delta > 0 else -1
+                parabolic = q[i] + s / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if q[i - 1] < parabolic < q[i + 1]:
+                    q[i] = parabolic
+                else:
+                    q[i] += s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                n[i] += s
+
+    def value(self) -> Optional[float]:
+        q = self.heights
+        if not q:
+            return None
+        if len(q) < 5:
+            mid = len(q) // 2
+            return q[mid] if len(q) % 2 else (q[mid - 1] + q[mid]) / 2
+        return q[2]
+
+
+class MetricsStore:
+    def __init__(self, path: str = METRICS_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def append(self, kind: str, payload: dict, plan: Optional[str] = None, contract: Optional[str] = None) -> int:
+        """Store one record and fold its numeric fields into the aggregates of (plan, kind)."""
+        plan = plan or ""  # records and aggregates share the "no plan" group
+        numbers = {
+            field: float(value) for field, value in payload.items()
+            if isinstance(value, (int, float)) and value == value
+        }
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.db.execute(
+                "INSERT INTO records (ts, plan, contract, kind, payload) VALUES (?, ?, ?, ?, ?)",
+                (time.time(), plan, contract, kind, json.dumps(payload)),
+            )
+            for field, value in numbers.items():
+                self._fold(plan, kind, field, value)
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return cursor.lastrowid
+
+    def _fold(self, plan: str, kind: str, field: str, value: float) -> None:
+        row = self.db.execute(
+            "SELECT count, total, low, high, quantile FROM aggregates WHERE plan = ? AND kind = ? AND field = ?",
+            (plan, kind, field),
+        ).fetchone()
+        count, total, low, high, median = (0, 0.0, value, value, P2Median()) if row is None else (
+            row[0], row[1], row[2], row[3], P2Median(json.loads(row[4]))
+        )
+        median.add(value)
+        self.db.execute(
+            "INSERT OR REPLACE INTO aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (plan, kind, field, count + 1, total + value, min(low, value), max(high, value), json.dumps(median.state())),
+        )
+
+    def query(
+        self,
+        kind: Optional[str] = None,
+        plan: Optional[str] = None,
+        contract: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict]:
+        clauses, params = [], []
+        for column, value in (("kind", kind), ("plan", plan), ("contract", contract)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        sql = "SELECT id, ts, plan, contract, kind, payload FROM records"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for row_id, ts, row_plan, row_contract, row_kind, payload in self.db.execute(sql, params):
+            yield {"id": row_id, "ts": ts, "plan": row_plan, "contract": row_contract, "kind": row_kind,
+                   **json.loads(payload)}
+
+    def aggregates(self, plan: Optional[str] = None, kind: Optional[str] = None) -> Dict[str, Dict[str, dict]]:
+        """{kind: {field: {count, sum, mean, min, max, median}}} for one plan ("" = records without a plan)."""
+        sql = "SELECT kind, field, count, total, low, high, quantile FROM aggregates WHERE plan = ?"
+        params: list = [plan or ""]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        result: Dict[str, Dict[str, dict]] = {}
+        for row_kind, field, count, total, low, high, quantile in self.db.execute(sql, params):
+            result.setdefault(row_kind, {})[field] = {
+                "count": count,
+                "sum": total,
+                "mean": total / count,
+                "min": low,
+                "max": high,
+                "median": P2Median(json.loads(quantile)).value(),
+            }
+        return result
+
+    def report(self, plan: Optional[str] = None) -> dict:
+        """The plan's aggregate metrics, from the running aggregates only.
+
+        Expects "baseline" and "final" records with the SCP plan's metric names; a final
+        record counts as verified when its `verified` field is true.
+        """
+        aggregates = self.aggregates(plan)
+        baseline, final = aggregates.get("baseline", {}), aggregates.get("final", {})
+
+        def stat(group: dict, field: str, name: str) -> Optional[float]:
+            return group.get(field, {}).get(name)
+
+        verified = stat(final, "verified", "sum") or 0
+        runtime, tokens = stat(final, "final_runtime", "sum"), stat(final, "final_tokens", "sum")
+        report = {"plan": plan, "aggregates": aggregates}
+        for group, field in (
+            (baseline, "baseline_tokens"), (final, "final_tokens"),
+            (baseline, "baseline_runtime"), (final, "final_runtime"),
+        ):
+            report[f"average_{field}"] = stat(group, field, "mean")
+            report[f"median_{field}"] = stat(group, field, "median")
+        report["tokens_saved"] = (stat(baseline, "baseline_tokens", "sum") or 0) - (tokens or 0)
+        report["runtime_saved"] = (stat(baseline, "baseline_runtime", "sum") or 0) - (runtime or 0)
+        report["contracts_per_minute"] = verified / (runtime / 60) if runtime else None
+        report["contracts_per_1k_tokens"] = verified / (tokens / 1000) if tokens else None
+        report["human_interventions"] = stat(aggregates.get("iteration", {}), "human_interventions", "sum")
+        return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query the append-only metrics store.")
+    parser.add_argument("command", choices=["report", "query"])
+    parser.add_argument("--db", default=METRICS_PATH)
+    parser.add_argument("--plan")
+    parser.add_argument("--kind")
+    parser.add_argument("--contract")
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+    store = MetricsStore(args.db)
+    if args.command == "report":
+        print(json.dumps(store.report(args.plan), indent=2))
+    else:
+        for record in store.query(args.kind, args.plan, args.contract, limit=args.limit):
+            print(json.dumps(record))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
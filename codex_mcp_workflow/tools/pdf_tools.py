@@ -1,37 +1,172 @@
-
-import json, subprocess, tempfile, os, re
+import json, subprocess, os, re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from agents import function_tool
+from .content_cache import CACHE_ROOT, DEFAULT_MAX_BYTES, ContentCache, file_digest, make_key
+from .extract_isolette_tables import EXTRACTOR_VERSION
+
+PAGES_PER_BATCH = 25
+CACHE_DIR = os.path.join(CACHE_ROOT, "faa_tables")
+
+# (section title, header words skipped inside that section)
+SECTIONS: List[Tuple[str, List[str]]] = [
+    ("Monitored Variables", ["Name", "Type"]),
+    ("Controlled Variables", ["Name", "Type"]),
+    ("Requirements", ["ID", "Condition", "Action"]),
+    ("Monitor Interface", ["ID"]),
+    ("Assumptions", ["ID"]),
+    ("Environmental Assumptions", ["ID"]),
+]
+
+
+def parse_page_count(info: str) -> Optional[int]:
+    """Page count from `pdfinfo` output."""
+    found = re.search(r"^Pages:\s+(\d+)", info, re.MULTILINE)
+    return int(found.group(1)) if found else None
+
+
+def _page_count(pdf_path: str) -> Optional[int]:
+    try:
+        info = subprocess.run(["pdfinfo", pdf_path], check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return parse_page_count(info)
+
+
+def page_ranges(pages: Optional[int], pages_per_batch: int = PAGES_PER_BATCH) -> List[Tuple[int, int]]:
+    """(first, last) page of each batch; empty when the document is converted in one go."""
+    if not pages or pages <= pages_per_batch:
+        return []
+    return [(first, min(first + pages_per_batch - 1, pages)) for first in range(1, pages + 1, pages_per_batch)]
+
+
+def pdftotext_command(pdf_path: str, first: Optional[int] = None, last: Optional[int] = None) -> List[str]:
+    # Minimal dependency approach using `pdftotext -layout`, written to stdout
+    cmd = ["pdftotext", "-layout"]
+    if first is not None:
+        cmd += ["-f", str(first), "-l", str(last)]
+    return cmd + [pdf_path, "-"]
+
+
+def _pdftotext(pdf_path: str, first: Optional[int] = None, last: Optional[int] = None) -> str:
+    out = subprocess.run(pdftotext_command(pdf_path, first, last), check=True, capture_output=True).stdout
+    return out.decode("utf-8", errors="ignore")
+
+
+def iter_page_batches(pdf_path: str, pages_per_batch: int = PAGES_PER_BATCH,
+                      max_workers: Optional[int] = None) -> Iterator[str]:
+    """Yield the layout text of `pdf_path` in page order, one batch of pages at a time.
+    Batches are converted in a process pool; at most two batches per worker are in flight.
+    """
+    ranges = page_ranges(_page_count(pdf_path), pages_per_batch)
+    if not ranges:
+        yield _pdftotext(pdf_path)
+        return
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for first, last in ranges:
+            pending.append(pool.submit(_pdftotext, pdf_path, first, last))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _parse_row(line: str, headers: List[str]) -> Optional[dict]:
+    lowered = line.lower()
+    if any(h in lowered for h in headers):
+        return None
+    cells = re.split(r"\s{2,}", line.strip())
+    if len(cells) >= 2 and any(cells):
+        return {"raw": line.strip(), "cells": cells}
+    return None
+
+
+class SectionScanner:
+    """Single streaming pass over the document text, fed one batch of pages at a time in order.
+    A section's span runs from the first occurrence of its title up to the first occurrence
+    of the next indexed title; rows are parsed as lines stream by, so only the current
+    batch of pages is ever held in memory.
+    """
+
+    def __init__(self, sections: List[Tuple[str, List[str]]] = SECTIONS) -> None:
+        self.rows: Dict[str, List[dict]] = {title: [] for title, _ in sections}
+        self._pending = [(title.lower(), title, [h.lower() for h in headers]) for title, headers in sections]
+        self._active: Optional[Tuple[str, List[str]]] = None
+
+    def feed(self, batch: str) -> None:
+        rows = self.rows
+        for line in batch.splitlines():
+            lowered = line.lower()
+            starts = sorted((lowered.find(key), title, headers)
+                            for key, title, headers in self._pending if key in lowered)
+            if not starts:
+                if self._active is not None:
+                    row = _parse_row(line, self._active[1])
+                    if row is not None:
+                        rows[self._active[0]].append(row)
+                continue
+            # split the line at every newly indexed title; each piece belongs to its own span
+            cuts = [(0, self._active)] + [(pos, (title, headers)) for pos, title, headers in starts]
+            for idx, (pos, owner) in enumerate(cuts):
+                end = cuts[idx + 1][0] if idx + 1 < len(cuts) else len(line)
+                if owner is not None and end > pos:
+                    row = _parse_row(line[pos:end], owner[1])
+                    if row is not None:
+                        rows[owner[0]].append(row)
+            found = {title for _, title, _ in starts}
+            self._pending = [entry for entry in self._pending if entry[1] not in found]
+            self._active = (starts[-1][1], starts[-1][2])
+
+
+def scan_sections(batches: Iterable[str],
+                  sections: List[Tuple[str, List[str]]] = SECTIONS) -> Dict[str, List[dict]]:
+    """`SectionScanner` over every batch, in order."""
+    scanner = SectionScanner(sections)
+    for batch in batches:
+        scanner.feed(batch)
+    return scanner.rows
+
+
+def faa_payload(rows: Dict[str, List[dict]]) -> dict:
+    """Tool payload from the rows of `scan_sections`."""
+    return {
+        "variables": rows["Monitored Variables"] + rows["Controlled Variables"],
+        "requirements": rows["Requirements"] or rows["Monitor Interface"],  # heuristic
+        "assumptions": rows["Assumptions"] or rows["Environmental Assumptions"],  # heuristic
+    }
+
+
+def extract_faa_payload(pdf_path: str, pages_per_batch: int = PAGES_PER_BATCH,
+                        max_workers: Optional[int] = None) -> dict:
+    return faa_payload(scan_sections(iter_page_batches(pdf_path, pages_per_batch, max_workers)))
+
+
+def payload_cache() -> ContentCache:
+    return ContentCache(CACHE_DIR, DEFAULT_MAX_BYTES)
+
+
+def payload_key(pdf_path: str) -> str:
+    """Cache key of a PDF's payload: its content, SECTIONS and EXTRACTOR_VERSION."""
+    return make_key(file_digest(pdf_path), SECTIONS, EXTRACTOR_VERSION)
+
+
+def cached_faa_payload(pdf_path: str, cache: Optional[ContentCache] = None) -> dict:
+    """`extract_faa_payload` behind a cache keyed on `payload_key`."""
+    cache = cache or payload_cache()
+    key = payload_key(pdf_path)
+    payload = cache.get(key)
+    if payload is None:
+        payload = extract_faa_payload(pdf_path)
+        cache.put(key, payload)
+    return payload
+
 
 @function_tool
 def extract_faa_tables(pdf_path: str) -> str:
     """Extract FAA AR-08-32 tables from a PDF into standardized JSON.
     Returns: JSON string with 'variables', 'requirements', 'assumptions', etc.
     """
-    tmpdir = tempfile.mkdtemp()
-    txt = os.path.join(tmpdir, "out.txt")
-    # Minimal dependency approach using `pdftotext -layout`
-    subprocess.run(["pdftotext", "-layout", pdf_path, txt], check=True)
-    text = open(txt, "r", encoding="utf-8", errors="ignore").read()
-
-    def parse_table(section_title: str, headers: list[str]):
-        out = []
-        if section_title.lower() in text.lower():
-            block = text[text.lower().find(section_title.lower()):]
-            for line in block.splitlines():
-                if any(h.lower() in line.lower() for h in headers):
-                    continue
-                cells = re.split(r"\s{2,}", line.strip())
-                if len(cells) >= 2 and any(cells):
-                    out.append({"raw": line.strip(), "cells": cells})
-        return out
-
-    variables = parse_table("Monitored Variables", ["Name", "Type"]) +                 parse_table("Controlled Variables", ["Name", "Type"])
-    requirements = parse_table("Requirements", ["ID", "Condition", "Action"]) or                    parse_table("Monitor Interface", ["ID"])  # heuristic
-    assumptions = parse_table("Assumptions", ["ID"]) or                   parse_table("Environmental Assumptions", ["ID"])  # heuristic
-
-    payload = {
-        "variables": variables,
-        "requirements": requirements,
-        "assumptions": assumptions,
-    }
-    return json.dumps(payload, ensure_ascii=False)
+    return json.dumps(cached_faa_payload(pdf_path), ensure_ascii=False)
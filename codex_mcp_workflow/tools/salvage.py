@@ -0,0 +1,195 @@
+"""Greedy salvage (step 5 of SCP_Cosine_Self_Adaptation_Plan.txt) with bisection.
+
+The plan adds accepted candidates back one at a time, largest distance reduction first,
+keeping each one that still verifies: one Logika run per candidate. When a prefix of
+that order verifies, every candidate in it would have been kept, so the engine instead
+searches for the longest verifying prefix of the remaining candidates, keeps it, drops
+the candidate right after it and repeats. Each search probes `workers` prefix lengths in
+parallel, narrowing the range (workers + 1)-fold per round, so the result equals the
+one-at-a-time greedy one (assuming adding a candidate never repairs a failure) in about
+log(n) rounds per rejected candidate. That only pays off while rejections are rare: once
+more than SALVAGE_GREEDY_FALLBACK of the decided candidates (after at least MIN_DECIDED)
+have been rejected, the rest are added one at a time as in the plan. Call counts and
+wall time saved go to the metrics store (tools/metrics_store.py).
+
+    python -m tools.salvage isolette/sysml candidates.json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence
+
+from .metrics_store import METRICS_PATH, MetricsStore
+from .sireum_runner import POOL_SIZE
+from .sysml_index import SysmlIndex
+from .sysml_writer import apply_annex_edits
+
+Verifier = Callable[[FrozenSet[str]], bool]
+
+GREEDY_FALLBACK = float(os.getenv("SALVAGE_GREEDY_FALLBACK", "0.25"))
+MIN_DECIDED = 4
+
+
+class SalvageEngine:
+    """Find the greedy maximal verifying subset of ordered candidates on top of a verifying base."""
+
+    def __init__(self, verify: Verifier, workers: int = POOL_SIZE, fallback: float = GREEDY_FALLBACK) -> None:
+        self.verify = verify
+        self.workers = max(1, workers)
+        self.fallback = fallback
+        self.calls = 0
+        self.rounds = 0
+        self.call_time_sec = 0.0
+        self._memo: Dict[FrozenSet[str], bool] = {}
+        self._lock = threading.Lock()
+
+    def _timed(self, subset: FrozenSet[str]) -> bool:
+        started = time.perf_counter()
+        ok = bool(self.verify(subset))
+        with self._lock:
+            self.calls += 1
+            self.call_time_sec += time.perf_counter() - started
+        return ok
+
+    def check(self, subsets: Sequence[FrozenSet[str]]) -> List[bool]:
+        """Verify subsets in parallel; repeated subsets are answered from memory."""
+        todo = [s for s in dict.fromkeys(subsets) if s not in self._memo]
+        if todo:
+            self.rounds += 1
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(todo))) as executor:
+                for subset, ok in zip(todo, executor.map(self._timed, todo)):
+                    self._memo[subset] = ok
+        return [self._memo[s] for s in subsets]
+
+    def longest_prefix(self, kept: FrozenSet[str], pending: Sequence[str]) -> int:
+        """Largest k such that kept + pending[:k] verifies (k = 0 is assumed to)."""
+        low, high = 0, len(pending)  # low verifies; everything above high is unknown-or-failing
+        while low < high:
+            span = high - low
+            if span <= self.workers:
+                probes = list(range(low + 1, high + 1))
+            else:
+                probes = sorted({low + (span * (i + 1)) // (self.workers + 1) for i in range(self.workers)})
+            results = self.check([kept | frozenset(pending[:k]) for k in probes])
+            passing = [k for k, ok in zip(probes, results) if ok]
+            failing = [k for k, ok in zip(probes, results) if not ok]
+            low = max(passing, default=low)
+            high = min([k - 1 for k in failing if k > low], default=high)
+        return low
+
+    def run(self, candidates: Sequence[str], base: Sequence[str] = ()) -> dict:
+        started = time.perf_counter()
+        kept = frozenset(base)
+        pending = list(candidates)
+        accepted: List[str] = []
+        rejected: List[str] = []
+        strategy = "bisection"
+        while pending:
+            decided = len(accepted) + len(rejected)
+            if decided >= MIN_DECIDED and len(rejected) > self.fallback * decided:
+                strategy = "bisection+greedy"
+                break
+            k = self.longest_prefix(kept, pending)
+            accepted.extend(pending[:k])
+            kept |= frozenset(pending[:k])
+            if k < len(pending):
+                rejected.append(pending[k])
+            pending = pending[k + 1:]
+        for candidate in pending:  # greedy fallback: one call per remaining candidate
+            if self.check([kept | {candidate}])[0]:
+                accepted.append(candidate)
+                kept |= {candidate}
+            else:
+                rejected.append(candidate)
+        wall = time.perf_counter() - started
+        mean_call = self.call_time_sec / self.calls if self.calls else 0.0
+        greedy_time = mean_call * len(candidates)
+        return {
+            "accepted": accepted,
+            "rejected": rejected,
+            "strategy": strategy,
+            "verify_calls": self.calls,
+            "verify_rounds": self.rounds,
+            "greedy_calls": len(candidates),
+            "calls_saved": max(0, len(candidates) - self.calls),
+            "calls_over_greedy": max(0, self.calls - len(candidates)),
+            "wall_time_sec": round(wall, 3),
+            "greedy_time_sec_est": round(greedy_time, 3),
+            "wall_time_saved_sec": round(max(0.0, greedy_time - wall), 3),
+        }
+
+
+def hybrid_verifier(sourcepath: str, annexes: Dict[str, str], cancel: Optional[threading.Event] = None) -> Verifier:
+    """Verifier that copies `sourcepath`, writes the chosen candidate annexes and runs Logika.
+    Once `cancel` is set every call raises CancelledError, which ends the salvage."""
+    from .sireum_tools import verify_model
+
+    index = SysmlIndex(sourcepath, parse=False)
+    index.refresh()
+    files: Dict[str, str] = {}
+    for name in annexes:
+        parts = index.find(name)
+        if len(parts) != 1:
+            raise KeyError(f"part def {name} found {len(parts)} times under {sourcepath}")
+        files[name] = os.path.relpath(parts[0].path, index.root)
+
+    def verify(subset: FrozenSet[str]) -> bool:
+        if cancel is not None and cancel.is_set():
+            raise CancelledError("salvage cancelled")
+        with tempfile.TemporaryDirectory(prefix="salvage-") as tmp:
+            hybrid = os.path.join(tmp, os.path.basename(index.root))
+            shutil.copytree(index.root, hybrid)
+            by_file: Dict[str, Dict[str, str]] = {}
+            for name in subset:
+                by_file.setdefault(files[name], {})[name] = annexes[name]
+            for relpath, edits in by_file.items():
+                apply_annex_edits(os.path.join(hybrid, relpath), edits)
+            metrics = verify_model(hybrid, cancel=cancel)["metrics"]
+            return metrics["failed"] == 0 and metrics["timeouts"] == 0
+
+    return verify
+
+
+def salvage(
+    sourcepath: str,
+    candidates: List[dict],
+    workers: int = POOL_SIZE,
+    metrics_path: Optional[str] = METRICS_PATH,
+    plan: Optional[str] = None,
+    cancel: Optional[threading.Event] = None,
+) -> dict:
+    """`candidates`: [{"part": ..., "annex": ..., "distance_reduction": ...}]; largest reduction first."""
+    ordered = sorted(candidates, key=lambda c: -c.get("distance_reduction", 0.0))
+    engine = SalvageEngine(hybrid_verifier(sourcepath, {c["part"]: c["annex"] for c in ordered}, cancel), workers)
+    result = engine.run([c["part"] for c in ordered])
+    if metrics_path:
+        store = MetricsStore(metrics_path)
+        try:
+            store.append("salvage", dict(result, sourcepath=sourcepath, workers=engine.workers), plan=plan)
+        finally:
+            store.close()
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Salvage the largest verifying set of improved contracts.")
+    parser.add_argument("sourcepath")
+    parser.add_argument("candidates", help='JSON list of {"part", "annex", "distance_reduction"}')
+    parser.add_argument("--workers", type=int, default=POOL_SIZE)
+    parser.add_argument("--metrics", default=METRICS_PATH)
+    parser.add_argument("--plan")
+    args = parser.parse_args(argv)
+    with open(args.candidates, "r", encoding="utf-8") as infile:
+        candidates = json.load(infile)
+    print(json.dumps(salvage(args.sourcepath, candidates, args.workers, args.metrics, args.plan), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
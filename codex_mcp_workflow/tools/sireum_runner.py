@@ -0,0 +1,319 @@
+"""Sireum/Logika execution: cold CLI runs or a pool of warm server processes.
+
+A warm server is any long-lived process that prints {"ready": true} on stdout once it can
+take work (earlier lines, e.g. a banner, are ignored), then reads one JSON request per
+line on stdin,
+{"id": 1, "args": ["hamr", "sysml", "logika", "--sourcepath", "isolette/sysml"], "cwd": null},
+runs the Sireum command in-process and answers with one JSON line,
+{"id": 1, "exit_code": 0, "output": "..."}.
+Set SIREUM_SERVER_CMD to the server command line to enable the pool (tools/fake_sireum.py
+`server` speaks the protocol for offline use); otherwise every job is a cold `sireum` run.
+A batch of jobs (`run_jobs`) runs concurrently on the pool, and every job can be
+cancelled through a threading.Event: a cold run is killed, a warm server is replaced.
+"""
+import atexit
+import json
+import os
+import queue
+import re
+import shlex
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+SIREUM = os.getenv("SIREUM", "sireum")
+SIREUM_SERVER_CMD = os.getenv("SIREUM_SERVER_CMD", "")
+POOL_SIZE = int(os.getenv("SIREUM_POOL_SIZE", "2"))
+DEFAULT_TIMEOUT = float(os.getenv("SIREUM_TIMEOUT", "1800"))
+READY_TIMEOUT = float(os.getenv("SIREUM_SERVER_READY_TIMEOUT", "600"))
+POLL_SEC = 0.1  # how often a running job checks its cancel event
+
+_ERROR_RE = re.compile(
+    r"^\s*(?:\[error\]|error:)\s*(?:(?P<file>[^\s:]+\.sysml):(?P<line>\d+):(?P<col>\d+):?)?\s*(?P<message>.*)$",
+    re.IGNORECASE,
+)
+_PROOF_RE = re.compile(r"^\s*\[(?:proof|logika)\]\s*(?P<name>[^:]+):\s*(?P<status>\w+)", re.IGNORECASE)
+
+
+@dataclass
+class VerificationJob:
+    name: str
+    args: List[str]
+    cwd: Optional[str] = None
+    timeout: float = DEFAULT_TIMEOUT
+
+
+def model_level_job(sourcepath: str, name: Optional[str] = None, timeout: float = DEFAULT_TIMEOUT) -> VerificationJob:
+    """`sireum hamr sysml logika --sourcepath <dir>` (integration constraints)."""
+    return VerificationJob(name or sourcepath, ["hamr", "sysml", "logika", "--sourcepath", sourcepath], timeout=timeout)
+
+
+def parse_output(job: VerificationJob, exit_code: Optional[int], output: str, elapsed: float,
+                 status: Optional[str] = None) -> dict:
+    parse_errors = []
+    proofs = []
+    for line in output.splitlines():
+        error = _ERROR_RE.match(line)
+        if error:
+            parse_errors.append({
+                "file": error.group("file"),
+                "line": int(error.group("line")) if error.group("line") else None,
+                "col": int(error.group("col")) if error.group("col") else None,
+                "message": error.group("message").strip(),
+            })
+            continue
+        proof = _PROOF_RE.match(line)
+        if proof:
+            proofs.append({"name": proof.group("name").strip(), "status": proof.group("status").lower()})
+    if status is None:
+        status = "verified" if exit_code == 0 and not parse_errors else "failed"
+    return {
+        "job": job.name,
+        "status": status,
+        "exit_code": exit_code,
+        "parse_errors": parse_errors,
+        "proofs": proofs,
+        "time_sec": round(elapsed, 3),
+    }
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    """Kill the process and everything it started (it leads its own session)."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (AttributeError, OSError):  # no process groups (Windows), or already gone
+        proc.kill()
+
+
+def run_cold(job: VerificationJob, cancel: Optional[threading.Event] = None) -> dict:
+    """One `sireum` process; killed on timeout or when `cancel` is set."""
+    started = time.perf_counter()
+    try:
+        proc = subprocess.Popen([SIREUM] + job.args, cwd=job.cwd, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, start_new_session=True)
+    except OSError as exc:
+        return parse_output(job, None, f"[error] {exc}", time.perf_counter() - started, status="error")
+    chunks: List[str] = []
+    reader = threading.Thread(target=lambda: chunks.append(proc.stdout.read()), daemon=True)
+    reader.start()
+    status = None
+    while proc.poll() is None:
+        if cancel is not None and cancel.is_set():
+            status = "cancelled"
+        elif time.perf_counter() - started > job.timeout:
+            status = "timeout"
+        if status:
+            _kill(proc)
+            break
+        try:
+            proc.wait(POLL_SEC)
+        except subprocess.TimeoutExpired:
+            pass
+    proc.wait()
+    reader.join()
+    return parse_output(job, None if status else proc.returncode, "".join(chunks), time.perf_counter() - started,
+                        status=status)
+
+
+class SireumServer:
+    """One warm server process; used by a single job at a time.
+    `startup_sec` is the time from launch to the server's ready line.
+    """
+
+    def __init__(self, command: List[str], ready_timeout: float = READY_TIMEOUT) -> None:
+        started = time.perf_counter()
+        self.proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+                                     start_new_session=True)
+        self.replies: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._next_id = 0
+        threading.Thread(target=self._read, daemon=True).start()
+        try:
+            while True:
+                line = self.replies.get(timeout=max(0.0, ready_timeout - (time.perf_counter() - started)))
+                if line is None:
+                    raise RuntimeError(f"sireum server exited before it was ready: {shlex.join(command)}")
+                if _is_ready(line):
+                    break
+        except queue.Empty:
+            self.close()
+            raise RuntimeError(f"sireum server not ready after {ready_timeout:g}s: {shlex.join(command)}") from None
+        self.startup_sec = time.perf_counter() - started
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            self.replies.put(line)
+        self.replies.put(None)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def run(self, job: VerificationJob, cancel: Optional[threading.Event] = None) -> dict:
+        """One job; on timeout or cancellation the server is killed (the pool replaces it)."""
+        self._next_id += 1
+        request = {"id": self._next_id, "args": job.args, "cwd": job.cwd}
+        started = time.perf_counter()
+        try:
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+            while True:
+                if cancel is not None and cancel.is_set():
+                    self.close()
+                    return parse_output(job, None, "", time.perf_counter() - started, status="cancelled")
+                remaining = job.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    raise queue.Empty
+                try:
+                    line = self.replies.get(timeout=min(POLL_SEC, remaining))
+                except queue.Empty:
+                    continue
+                if line is None:
+                    raise BrokenPipeError("server exited")
+                reply = json.loads(line)
+                if reply.get("id") == self._next_id:
+                    break
+        except queue.Empty:
+            self.close()
+            return parse_output(job, None, "", time.perf_counter() - started, status="timeout")
+        except (OSError, ValueError) as exc:
+            self.close()
+            return parse_output(job, None, f"[error] sireum server: {exc}", time.perf_counter() - started, status="error")
+        return parse_output(job, reply.get("exit_code"), reply.get("output", ""), time.perf_counter() - started)
+
+    def close(self) -> None:
+        if self.alive:
+            _kill(self.proc)
+        self.proc.wait()
+
+
+def _is_ready(line: str) -> bool:
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return False
+    return isinstance(message, dict) and message.get("ready") is True
+
+
+class SireumPool:
+    """Fixed-size pool of warm servers, started in parallel; a server that times out,
+    is cancelled or dies is replaced. A slot whose replacement fails to start stays in the
+    pool empty and is started again by the next job that takes it."""
+
+    def __init__(self, command: List[str], size: int = POOL_SIZE) -> None:
+        self.command = command
+        self.size = size
+        self.idle: "queue.Queue[Optional[SireumServer]]" = queue.Queue()
+        self.restarts = 0
+        self.startup_sec: List[float] = []
+        self._lock = threading.Lock()
+        self._all: List[SireumServer] = []
+        with ThreadPoolExecutor(max_workers=max(1, size)) as executor:
+            for server in executor.map(lambda _: self._spawn(), range(size)):
+                self.idle.put(server)
+
+    def _spawn(self) -> SireumServer:
+        server = SireumServer(self.command)
+        with self._lock:
+            self._all.append(server)
+            self.startup_sec.append(server.startup_sec)
+        return server
+
+    def run(self, job: VerificationJob, cancel: Optional[threading.Event] = None) -> dict:
+        server = self.idle.get()
+        try:
+            if server is None:
+                try:
+                    server = self._spawn()
+                except (OSError, RuntimeError) as exc:
+                    return parse_output(job, None, f"[error] sireum server: {exc}", 0.0, status="error")
+            result = server.run(job, cancel)
+            if not server.alive:
+                with self._lock:
+                    self.restarts += 1
+                    self._all.remove(server)
+                server = None
+                try:
+                    server = self._spawn()
+                except (OSError, RuntimeError) as exc:
+                    result["pool_error"] = f"replacement server failed to start: {exc}"
+        finally:
+            self.idle.put(server)
+        return result
+
+    def run_batch(self, jobs: List[VerificationJob], cancel: Optional[threading.Event] = None) -> List[dict]:
+        """Run jobs on all servers at once, results in job order."""
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.size, len(jobs)))) as executor:
+            return list(executor.map(lambda job: self.run(job, cancel), jobs))
+
+    def close(self) -> None:
+        with self._lock:
+            servers, self._all = self._all, []
+        for server in servers:
+            server.close()
+
+
+_POOL: Optional[SireumPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> Optional[SireumPool]:
+    """Process-wide warm pool, or None when SIREUM_SERVER_CMD is not configured."""
+    global _POOL
+    if not SIREUM_SERVER_CMD:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = SireumPool(shlex.split(SIREUM_SERVER_CMD), POOL_SIZE)
+            atexit.register(_POOL.close)
+    return _POOL
+
+
+def run_jobs(jobs: List[VerificationJob], pool: Optional[SireumPool] = None,
+             cancel: Optional[threading.Event] = None) -> List[dict]:
+    """Run jobs concurrently (one batch on the warm pool, else POOL_SIZE cold runs at a time), results in job order."""
+    pool = pool or get_pool()
+    if not jobs:
+        return []
+    if pool:
+        return pool.run_batch(jobs, cancel)
+    with ThreadPoolExecutor(max_workers=max(1, min(POOL_SIZE, len(jobs)))) as executor:
+        return list(executor.map(lambda job: run_cold(job, cancel), jobs))
+
+
+def summarize(results: List[dict], elapsed: float, pool: Optional[SireumPool] = None) -> Dict[str, object]:
+    """The run_sireum payload: parse_errors, proofs and metrics over all jobs."""
+    metrics: Dict[str, object] = {
+        "time_sec": round(elapsed, 3),
+        "jobs": len(results),
+        "verified": sum(1 for r in results if r["status"] == "verified"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "timeouts": sum(1 for r in results if r["status"] == "timeout"),
+        "cancelled": sum(1 for r in results if r["status"] == "cancelled"),
+        "job_time_sec": {r["job"]: r["time_sec"] for r in results},
+        "mode": "warm" if pool else "cold",
+    }
+    if pool:
+        metrics["pool_size"] = pool.size
+        metrics["pool_restarts"] = pool.restarts
+    proofs = []
+    for result in results:
+        if result["proofs"]:
+            proofs.extend(dict(proof, job=result["job"]) for proof in result["proofs"])
+        else:
+            proofs.append({"name": result["job"], "status": result["status"], "job": result["job"]})
+    # an error outside every component is reported by each component's job; list it once
+    errors: Dict[tuple, dict] = {}
+    for result in results:
+        for error in result["parse_errors"]:
+            errors.setdefault((error["file"], error["line"], error["col"], error["message"]), dict(error, job=result["job"]))
+    return {
+        "parse_errors": list(errors.values()),
+        "proofs": proofs,
+        "metrics": metrics,
+    }
@@ -1,11 +1,60 @@
-
 from agents import function_tool
-import json
+import json, os, threading, time
+from typing import Optional
+from .salvage import salvage
+from .sireum_runner import get_pool, model_level_job, run_jobs, summarize
+from .verification_scheduler import schedule
+
+
+def source_dir(model_path: str) -> str:
+    """The --sourcepath for a model file (its directory) or a source directory."""
+    return model_path if os.path.isdir(model_path) else os.path.dirname(os.path.abspath(model_path))
+
+
+def verify_model(model_path: str, use_cache: bool = True, cancel: Optional[threading.Event] = None) -> dict:
+    """Logika check of the source directory containing `model_path`, one job per component
+    (tools/verification_scheduler.py). Component results are cached on their contract keys,
+    so only components whose contract or dependencies changed are run again; timeouts and
+    tool errors are never cached. A tree without annexes gets one model-level run.
+    Setting `cancel` kills the running jobs and raises CancelledError.
+    """
+    sourcepath = source_dir(model_path)
+    started = time.perf_counter()
+    pool = get_pool()
+    report = schedule(sourcepath, pool=pool, use_cache=use_cache, cancel=cancel)
+    results = list(report["results"].values())
+    if not results:
+        results = run_jobs([model_level_job(sourcepath, name=os.path.basename(model_path) or sourcepath)], pool, cancel)
+    payload = summarize(results, time.perf_counter() - started, pool)
+    payload["metrics"].update(
+        cache_hit=bool(report["results"]) and not report["rechecked"],
+        components_rechecked=len(report["rechecked"]),
+        components_reused=len(report["reused"]),
+        time_sec_saved=report["time_sec_saved"],
+    )
+    return payload
+
 
 @function_tool
 def run_sireum(model_path: str) -> str:
-    """Run Sireum/Logika GUMBO verification (stub).
+    """Run Sireum/Logika GUMBO verification (`sireum hamr sysml logika`) on the model's source directory.
+    Returns JSON with 'parse_errors', 'proofs' and 'metrics'.
+    """
+    return json.dumps(verify_model(model_path))
+
+
+@function_tool
+def run_sireum_incremental(model_path: str) -> str:
+    """Re-verify only the components whose contract or dependencies changed, in dependency order.
+    Returns JSON with 'rechecked', 'reused', 'levels' and per-component 'results'.
+    """
+    return json.dumps(schedule(source_dir(model_path)))
+
+
+@function_tool
+def salvage_contracts(model_path: str, candidates_json: str) -> str:
+    """Greedy salvage after a failing hybrid model: find the largest set of improved contracts that
+    still verifies, with far fewer Logika runs than adding them one by one. `candidates_json` is a
+    list of {"part", "annex", "distance_reduction"}. The model itself is not modified.
     """
-    # Replace with real CLI invocation in your environment.
-    result = {"parse_errors": [], "proofs": [], "metrics": {"time_sec": 0.0}}
-    return json.dumps(result)
+    return json.dumps(salvage(source_dir(model_path), json.loads(candidates_json)))
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Offline stand-in for `codex mcp`, for exercising tools/mcp_manager.py.
+
+    stub_mcp_server.py                       # stdio, like `codex mcp`
+    stub_mcp_server.py --http --port 8765    # streamable HTTP at http://127.0.0.1:8765/mcp
+
+Exposes the same tool names as Codex (`codex`, `codex-reply`); both echo the prompt.
+STUB_MCP_STARTUP delays startup by that many seconds (like npx resolution and boot);
+a prompt containing STUB_MCP_CRASH makes the process exit, to exercise restarts.
+"""
+import argparse
+import os
+import sys
+import time
+
+try:
+    from mcp.server.mcpserver import MCPServer as _Server  # mcp >= 2
+    _FASTMCP = False
+except ImportError:
+    from mcp.server.fastmcp import FastMCP as _Server
+    _FASTMCP = True
+
+server = _Server("codex-stub")
+
+
+def _answer(prompt: str) -> str:
+    if "STUB_MCP_CRASH" in prompt:
+        os._exit(3)
+    return f"[codex-stub] {prompt}"
+
+
+@server.tool()
+def codex(prompt: str, cwd: str = "") -> str:
+    """Start a Codex session (stub: echoes the prompt)."""
+    return _answer(prompt)
+
+
+@server.tool(name="codex-reply")
+def codex_reply(prompt: str, conversationId: str = "") -> str:
+    """Continue a Codex session (stub: echoes the prompt)."""
+    return _answer(prompt)
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(description="Stub Codex MCP server.")
+    parser.add_argument("--http", action="store_true", help="serve streamable HTTP instead of stdio")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+    time.sleep(float(os.getenv("STUB_MCP_STARTUP", "0")))
+    if args.http and _FASTMCP:  # mcp 1.x: the port is a server setting
+        server.settings.port = args.port
+        server.run(transport="streamable-http")
+    elif args.http:
+        server.run(transport="streamable-http", port=args.port)
+    else:
+        server.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
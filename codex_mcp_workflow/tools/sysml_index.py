@@ -0,0 +1,496 @@
+"""Index of the definitions in a SysML source tree and the GUMBO annexes inside them.
+
+One regex pass per file finds packages, `<kind> def` definitions with their qualified
+names, imports and annexes; comments and strings are consumed whole so braces and
+keywords inside them are never seen. The same module holds the GUMBO lexer used for
+cache keys and embeddings, and the `DependencyGraph` the verification scheduler builds
+from an index.
+"""
+import bisect
+import hashlib
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from lark import Tree
+from lark.exceptions import LarkError
+
+from .gumbo_parser import get_parser, parse_with
+
+SYSML_SUFFIX = ".sysml"
+DEF_KINDS = ("part", "attribute", "enum", "item", "port", "data", "connection", "interface")
+
+_NAME = rb"[A-Za-z_]\w*|'[^']*'"
+# GUMBO annexes are matched before comments and plain strings
+_TOKEN_RE = re.compile(
+    rb'(?P<annex>language\s+"GUMBO"\s*/\*\{(?P<body>.*?)\}\*/)'
+    rb"|/\*.*?\*/|//[^\n]*"
+    rb'|"(?:\\.|[^"\\])*"'
+    rb"|(?P<def>\b(?P<kind>" + "|".join(DEF_KINDS).encode() + rb")\s+def\s+(?P<name>" + _NAME + rb"))"
+    rb"|(?P<package>\bpackage\s+(?P<package_name>" + _NAME + rb"))"
+    rb"|(?P<import>\bimport\s+(?P<target>[^;{}]*);)"
+    rb"|(?P<brace>[{};])",
+    re.S,
+)
+
+
+@dataclass
+class GumboAnnex:
+    start: int  # byte offset of `language "GUMBO"`
+    end: int  # byte offset just past `}*/`
+    body_start: int
+    body_end: int
+    digest: str
+    ast: Optional[Tree] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class Definition:
+    name: str
+    path: str
+    start: int  # byte offset of `<kind> def`
+    end: int  # byte offset just past the closing `}` (or `;`)
+    body_start: Optional[int] = None  # offset of `{`
+    body_end: Optional[int] = None  # offset of the matching `}`
+    annex: Optional[GumboAnnex] = None
+    kind: str = "part"
+    qualified: str = ""  # enclosing packages and definitions joined by "::"
+    scope: str = ""  # qualified name the definition is declared in ("" at top level)
+    first_line: int = 0
+    last_line: int = 0
+
+
+Import = Tuple[str, str, bool]  # (scope, target, wildcard)
+
+
+@dataclass
+class _FileEntry:
+    stamp: Tuple[int, int]
+    definitions: List[Definition] = field(default_factory=list)
+    imports: List[Import] = field(default_factory=list)
+
+
+def _decode_name(raw: bytes) -> str:
+    return raw.decode("utf-8").strip("'")
+
+
+def scan_source(data: bytes, path: str = "") -> Tuple[List[Definition], List[Import]]:
+    """Every definition in a SysML source, with the GUMBO annex directly inside it, and its imports."""
+    definitions: List[Definition] = []
+    imports: List[Import] = []
+    newlines = [match.start() for match in re.finditer(rb"\n", data)]
+    pending: Optional[Tuple[str, Optional[Definition]]] = None  # until `{` or `;`
+    # one frame per open brace: (qualified name, definition or None for packages and other blocks)
+    stack: List[Tuple[str, Optional[Definition]]] = []
+
+    def finish(definition: Definition, end: int) -> None:
+        definition.end = end
+        definition.first_line = bisect.bisect_left(newlines, definition.start) + 1
+        definition.last_line = bisect.bisect_left(newlines, end - 1) + 1
+        definitions.append(definition)
+
+    for match in _TOKEN_RE.finditer(data):
+        scope = stack[-1][0] if stack else ""
+        if match.group("annex"):
+            owner = stack[-1][1] if stack else None
+            if owner is not None and owner.annex is None:
+                body = match.group("body")
+                owner.annex = GumboAnnex(
+                    start=match.start(), end=match.end(),
+                    body_start=match.start("body"), body_end=match.end("body"),
+                    digest=hashlib.sha256(body).hexdigest(),
+                )
+        elif match.group("def"):
+            name = _decode_name(match.group("name"))
+            qualified = f"{scope}::{name}" if scope else name
+            pending = (qualified, Definition(name, path, match.start(), match.end(), kind=match.group("kind").decode(),
+                                             qualified=qualified, scope=scope))
+        elif match.group("package"):
+            name = _decode_name(match.group("package_name"))
+            pending = (f"{scope}::{name}" if scope else name, None)
+        elif match.group("import"):
+            target = re.sub(r"\s+", "", match.group("target").decode("utf-8"))
+            wildcard = target.endswith("*")  # `::*` and the recursive `::**`
+            target = target.rstrip("*").rstrip(":")
+            if target:
+                imports.append((scope, target, wildcard))
+        elif match.group("brace"):
+            brace = match.group("brace")
+            if brace == b"{":
+                if pending is not None and pending[1] is not None:
+                    pending[1].body_start = match.start()
+                stack.append(pending or (scope, None))
+                pending = None
+            elif brace == b"}":
+                _, definition = stack.pop() if stack else ("", None)
+                if definition is not None:
+                    definition.body_end = match.start()
+                    finish(definition, match.end())
+            elif pending is not None:  # `part def X;` without a body
+                if pending[1] is not None:
+                    finish(pending[1], match.end())
+                pending = None
+    definitions.sort(key=lambda definition: definition.start)
+    return definitions, imports
+
+
+def scan_parts(data: bytes, path: str = "") -> List[Definition]:
+    """Every `part def` in a SysML source and the GUMBO annex directly inside it."""
+    return [definition for definition in scan_source(data, path)[0] if definition.kind == "part"]
+
+
+# --- lexer ------------------------------------------------------------------------
+# Comments and whitespace are lexemes of their own, so callers can drop them without
+# parsing; strings are kept whole.
+
+LEXEME_RE = re.compile(
+    r'"[^"]*"|/\*.*?\*/|//[^\n]*|\s+|[A-Za-z_]\w*|\d+(?:\.\d+)?|->:|::|:=|<=|>=|==|!=|\S',
+    re.S,
+)
+_IDENT_RE = re.compile(r"[A-Za-z_]\w*\Z")
+
+
+def is_trivia(lexeme: str) -> bool:
+    """Whitespace or a comment."""
+    return lexeme.isspace() or lexeme.startswith("//") or (lexeme.startswith("/*") and lexeme.endswith("*/"))
+
+
+def lexemes(text: str) -> List[str]:
+    """Lexemes of `text` without whitespace and comments."""
+    return [lexeme for lexeme in LEXEME_RE.findall(text) if not is_trivia(lexeme)]
+
+
+def normalize_gumbo(text: str) -> str:
+    """Canonical token stream: comments dropped, one space between tokens."""
+    return " ".join(lexemes(text))
+
+
+def _chain_at(tokens: List[str], i: int) -> Tuple[str, int]:
+    """The qualified name (`A::B::C`) starting at tokens[i] and the index after it."""
+    parts = [tokens[i]]
+    i += 1
+    while i + 1 < len(tokens) and tokens[i] == "::" and _IDENT_RE.match(tokens[i + 1]):
+        parts.append(tokens[i + 1])
+        i += 2
+    return "::".join(parts), i
+
+
+def _chains(tokens: List[str]) -> List[str]:
+    """Qualified names and plain identifiers in a token list."""
+    chains = []
+    i = 0
+    while i < len(tokens):
+        if _IDENT_RE.match(tokens[i]):
+            chain, i = _chain_at(tokens, i)
+            chains.append(chain)
+        else:
+            i += 1
+    return chains
+
+
+class SysmlIndex:
+    """Index of the definitions and GUMBO annexes under a SysML source tree.
+    `refresh()` rescans only files whose size or mtime changed and re-parses only
+    annexes whose content hash is new; parsed ASTs are shared by hash. Refreshes and
+    lookups are serialized, so one index can be shared by worker threads.
+    """
+
+    def __init__(self, root: str, parse: bool = True) -> None:
+        self.root = os.path.abspath(root)
+        self.parse = parse
+        self._files: Dict[str, _FileEntry] = {}
+        self._asts: Dict[str, Tuple[Optional[Tree], Optional[str]]] = {}
+        self._lock = threading.RLock()
+
+    def __getstate__(self) -> dict:
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def sources(self) -> List[str]:
+        if os.path.isfile(self.root):
+            return [self.root]
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            found.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(SYSML_SUFFIX))
+        return sorted(found)
+
+    def _parse_annex(self, data: bytes, annex: GumboAnnex) -> bool:
+        cached = self._asts.get(annex.digest)
+        if cached is None:
+            body = data[annex.body_start:annex.body_end].decode("utf-8")
+            try:
+                cached = (parse_with(get_parser(), body), None)
+            except LarkError as exc:
+                cached = (None, str(exc))
+            self._asts[annex.digest] = cached
+            fresh = True
+        else:
+            fresh = False
+        annex.ast, annex.error = cached
+        return fresh
+
+    def refresh(self) -> Dict[str, int]:
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> Dict[str, int]:
+        stats = {"files_scanned": 0, "annexes_parsed": 0, "annexes_reused": 0}
+        sources = self.sources()
+        for path in set(self._files) - set(sources):
+            del self._files[path]
+        for path in sources:
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            entry = self._files.get(path)
+            if entry is not None and entry.stamp == stamp:
+                continue
+            with open(path, "rb") as infile:
+                data = infile.read()
+            entry = _FileEntry(stamp, *scan_source(data, path))
+            stats["files_scanned"] += 1
+            for part in entry.definitions:
+                if part.annex is not None and self.parse:
+                    key = "annexes_parsed" if self._parse_annex(data, part.annex) else "annexes_reused"
+                    stats[key] += 1
+            self._files[path] = entry  # published with its annexes parsed
+        live = {d.annex.digest for d in self.definitions() if d.annex is not None}
+        self._asts = {digest: value for digest, value in self._asts.items() if digest in live}
+        return stats
+
+    def definitions(self, path: Optional[str] = None) -> List[Definition]:
+        with self._lock:
+            if path is not None:
+                entry = self._files.get(os.path.abspath(path))
+                return list(entry.definitions) if entry else []
+            return [d for entry in self._files.values() for d in entry.definitions]
+
+    def part_defs(self, path: Optional[str] = None) -> List[Definition]:
+        return [d for d in self.definitions(path) if d.kind == "part"]
+
+    def files(self) -> Iterator[Tuple[str, bytes, List[Definition], List[Import]]]:
+        """(path, content, definitions, imports) of each indexed file. Offsets always match the
+        content: a file changed since the last refresh is rescanned from what was read."""
+        with self._lock:
+            entries = sorted(self._files.items())
+        for path, entry in entries:
+            try:
+                with open(path, "rb") as infile:
+                    stat = os.fstat(infile.fileno())
+                    data = infile.read()
+            except FileNotFoundError:
+                continue
+            if (stat.st_mtime_ns, stat.st_size) == entry.stamp:
+                yield path, data, entry.definitions, entry.imports
+            else:
+                yield (path, data) + scan_source(data, path)
+
+    def find(self, name: str) -> List[Definition]:
+        return [part for part in self.part_defs() if part.name == name]
+
+    def annex(self, name: str) -> Optional[GumboAnnex]:
+        for part in self.find(name):
+            if part.annex is not None:
+                return part.annex
+        return None
+
+    def annex_text(self, part: Definition) -> Optional[str]:
+        if part.annex is None:
+            return None
+        with open(part.path, "rb") as infile:
+            infile.seek(part.annex.body_start)
+            return infile.read(part.annex.body_end - part.annex.body_start).decode("utf-8")
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp"
+        with self._lock, open(tmp_path, "wb") as outfile:
+            pickle.dump(self, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SysmlIndex":
+        with open(path, "rb") as infile:
+            index = pickle.load(infile)
+        if not isinstance(index, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}")
+        return index
+
+
+SHARED_INDEXES = int(os.getenv("SYSML_SHARED_INDEXES", "8"))
+_INDEXES: "OrderedDict[str, SysmlIndex]" = OrderedDict()  # least recently used first
+_INDEXES_LOCK = threading.Lock()
+
+
+def shared_index(root: str) -> SysmlIndex:
+    """Process-wide index for `root`, refreshed on every call; safe to call from threads.
+    At most SHARED_INDEXES roots are kept; roots that no longer exist go first.
+    """
+    root = os.path.abspath(root)
+    with _INDEXES_LOCK:
+        index = _INDEXES.pop(root, None)
+        if index is None:
+            index = SysmlIndex(root)
+        _INDEXES[root] = index
+        for stale in [path for path in _INDEXES if not os.path.exists(path)]:
+            del _INDEXES[stale]
+        while len(_INDEXES) > SHARED_INDEXES:
+            _INDEXES.popitem(last=False)
+    index.refresh()  # under the index's own lock, so other roots are not held up
+    return index
+
+
+def drop_index(root: str) -> None:
+    """Forget the shared index of `root`, e.g. before its temporary directory is removed."""
+    with _INDEXES_LOCK:
+        _INDEXES.pop(os.path.abspath(root), None)
+
+
+# --- dependencies -------------------------------------------------------------------
+
+class DependencyGraph:
+    """Definitions of an index as nodes, keyed by qualified name.
+
+    A node depends on every definition it names (port types, specializations, part
+    usages, types referenced by its GUMBO annex), and for `connect a.x to b.y` the part
+    def of `b` depends on that of `a`. Names are resolved in the enclosing scopes
+    (innermost first), then through the imports visible from them; `A::B::member`
+    resolves to the definition `A::B`. Components are part defs with a GUMBO annex.
+    """
+
+    def __init__(self, index: SysmlIndex) -> None:
+        self.root = index.root
+        self.by_name: Dict[str, Definition] = {}
+        self.imports: Dict[str, List[Tuple[str, bool]]] = {}
+        self._texts: Dict[str, Tuple[str, Optional[str]]] = {}
+        for path, data, definitions, imports in index.files():
+            for definition in definitions:
+                if definition.qualified in self.by_name:
+                    continue
+                self.by_name[definition.qualified] = definition
+                annex = definition.annex
+                if annex is None:
+                    declaration, body = data[definition.start:definition.end], None
+                else:
+                    declaration = data[definition.start:annex.start] + data[annex.end:definition.end]
+                    body = data[annex.body_start:annex.body_end].decode("utf-8")
+                self._texts[definition.qualified] = (declaration.decode("utf-8"), body)
+            for scope, target, wildcard in imports:
+                self.imports.setdefault(scope, []).append((target, wildcard))
+        self.digests = {name: self._digest(name) for name in self.by_name}
+        self.deps: Dict[str, Set[str]] = {name: self.references(name) for name in self.by_name}
+        for name in self.by_name:
+            for producer, consumer in self.connections(name):
+                self.deps[consumer].add(producer)
+        self.components: Dict[str, Definition] = {
+            name: d for name, d in self.by_name.items() if d.kind == "part" and d.annex is not None
+        }
+        self._closures: Dict[str, Set[str]] = {}
+
+    def declaration(self, name: str) -> str:
+        """Source of a definition with its annex cut out."""
+        return self._texts[name][0]
+
+    def annex_text(self, name: str) -> Optional[str]:
+        """GUMBO body of a definition's annex, without the `language "GUMBO" /*{ }*/` wrapper."""
+        return self._texts[name][1]
+
+    def _digest(self, name: str) -> str:
+        """Hash of the normalized declaration and annex; comments and layout do not count."""
+        annex = self.annex_text(name)
+        encoded = normalize_gumbo(self.declaration(name)) + "\0" + (normalize_gumbo(annex) if annex is not None else "")
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _longest(self, parts: List[str]) -> Optional[str]:
+        for n in range(len(parts), 0, -1):
+            name = "::".join(parts[:n])
+            if name in self.by_name:
+                return name
+        return None
+
+    def resolve(self, chain: str, scope: str) -> Optional[str]:
+        """Qualified name of the definition `chain` refers to from `scope`, or None."""
+        parts = chain.split("::")
+        scopes = [] if not scope else ["::".join(scope.split("::")[:n]) for n in range(scope.count("::") + 1, 0, -1)]
+        scopes.append("")
+        for outer in scopes:
+            found = self._longest((outer.split("::") if outer else []) + parts)
+            if found and (not outer or found.startswith(outer + "::")):
+                return found
+        for outer in scopes:
+            for target, wildcard in self.imports.get(outer, ()):
+                if wildcard:
+                    found = self._longest(target.split("::") + parts)
+                elif target.split("::")[-1] == parts[0]:
+                    found = self._longest(target.split("::") + parts[1:])
+                else:
+                    found = None
+                if found:
+                    return found
+        return None
+
+    def references(self, name: str) -> Set[str]:
+        """Definitions named in a definition's declaration and annex, except itself."""
+        chains = _chains(lexemes(self.declaration(name))) + _chains(lexemes(self.annex_text(name) or ""))
+        found = {self.resolve(chain, name) for chain in set(chains)}
+        found.discard(None)
+        found.discard(name)
+        return found
+
+    def connections(self, name: str) -> List[Tuple[str, str]]:
+        """(producer, consumer) definitions for every `connect a.x to b.y` in a definition."""
+        tokens = lexemes(self.declaration(name))
+        usages: Dict[str, str] = {}
+        for i in range(len(tokens) - 3):
+            if (tokens[i] == "part" and _IDENT_RE.match(tokens[i + 1]) and tokens[i + 2] == ":"
+                    and _IDENT_RE.match(tokens[i + 3])):
+                usages[tokens[i + 1]] = _chain_at(tokens, i + 3)[0]
+        pairs = []
+        for i in range(len(tokens) - 6):
+            if tokens[i] == "connect" and tokens[i + 2] == "." and tokens[i + 4] == "to" and tokens[i + 6] == ".":
+                producer, consumer = usages.get(tokens[i + 1]), usages.get(tokens[i + 5])
+                if producer and consumer:
+                    pairs.append((self.resolve(producer, name), self.resolve(consumer, name)))
+        return [(a, b) for a, b in pairs if a and b and a != b]
+
+    def closure(self, name: str) -> Set[str]:
+        """Every definition `name` depends on, directly or transitively."""
+        if name not in self._closures:
+            seen: Set[str] = set()
+            stack = [name]
+            while stack:
+                for dep in self.deps.get(stack.pop(), ()):
+                    if dep not in seen:
+                        seen.add(dep)
+                        stack.append(dep)
+            self._closures[name] = seen
+        return self._closures[name]
+
+    def levels(self, names: Set[str]) -> List[List[str]]:
+        """Topological levels of `names`, dependencies first. The members of a dependency
+        cycle are one strongly connected component and share that component's level."""
+        reach = {name: self.closure(name) & names for name in names}
+        cycle = {name: {m for m in reach[name] if name in reach[m]} | {name} for name in names}
+        level: Dict[str, int] = {}
+
+        def depth(name: str) -> int:
+            if name not in level:
+                below = [depth(dep) for dep in reach[name] - cycle[name]]
+                for member in cycle[name]:
+                    level[member] = 1 + max(below, default=-1)
+            return level[name]
+
+        for name in sorted(names):
+            depth(name)
+        levels: List[List[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for name in sorted(names):
+            levels[level[name]].append(name)
+        return levels
@@ -0,0 +1,129 @@
+import mmap
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from .content_cache import CACHE_ROOT, make_key
+from .gumbo_parser import ANNEX_RE
+from .sysml_index import scan_parts
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are not serialized, replacement is still atomic
+    fcntl = None
+
+Edit = Tuple[int, int, bytes]  # replace data[start:end] with the bytes
+# lock files live here, keyed by the locked file's absolute path, never next to the model
+LOCK_DIR = os.path.join(CACHE_ROOT, "locks")
+
+
+def annex_block(text: str) -> str:
+    """Normalize annex text (full `language "GUMBO"` block or bare body) to a full block."""
+    text = text.strip("\n")
+    if ANNEX_RE.search(text):
+        return text
+    return 'language "GUMBO" /*{\n' + text + "\n}*/"
+
+
+def _indent(block: str, indent: str, first: bool) -> str:
+    lines = block.split("\n")
+    return "\n".join((indent if idx or first else "") + line if line else line for idx, line in enumerate(lines))
+
+
+def _line_indent(data, offset: int) -> Tuple[int, str]:
+    line_start = data.rfind(b"\n", 0, offset) + 1
+    prefix = bytes(data[line_start:offset])
+    indent = prefix[:len(prefix) - len(prefix.lstrip(b" \t"))].decode("utf-8")
+    return line_start, indent
+
+
+def plan_annex_edits(data, annexes: Dict[str, str], step: str = "  ") -> List[Edit]:
+    """Compute every replacement/insertion up front, sorted by offset.
+    Existing annexes are replaced in place; parts without one get the annex appended
+    before their closing brace (a body is added to `part def X;`).
+    """
+    parts = {}
+    for part in scan_parts(data):
+        parts.setdefault(part.name, []).append(part)
+    missing = [name for name in annexes if name not in parts]
+    ambiguous = [name for name in annexes if len(parts.get(name, [])) > 1]
+    if missing or ambiguous:
+        raise KeyError(f"part defs not found: {missing}; defined more than once: {ambiguous}")
+    edits: List[Edit] = []
+    for name, text in annexes.items():
+        part = parts[name][0]
+        block = annex_block(text)
+        if part.annex is not None:
+            _, indent = _line_indent(data, part.annex.start)
+            edits.append((part.annex.start, part.annex.end, _indent(block, indent, first=False).encode("utf-8")))
+        elif part.body_end is not None:
+            line_start, indent = _line_indent(data, part.body_end)
+            inner = _indent(block, indent + step, first=True)
+            if line_start + len(indent.encode("utf-8")) == part.body_end:  # `}` on its own line
+                edits.append((line_start, line_start, (inner + "\n").encode("utf-8")))
+            else:
+                edits.append((part.body_end, part.body_end, ("\n" + inner + "\n" + indent).encode("utf-8")))
+        else:
+            _, indent = _line_indent(data, part.start)
+            body = " {\n" + _indent(block, indent + step, first=True) + "\n" + indent + "}"
+            edits.append((part.end - 1, part.end, body.encode("utf-8")))
+    return sorted(edits)
+
+
+@contextmanager
+def writer_lock(path: str) -> Iterator[None]:
+    """Exclusive lock on `path` across threads and processes, held by a file under LOCK_DIR."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    with open(os.path.join(LOCK_DIR, f"{make_key(os.path.abspath(path))}.lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _stream_edits(path: str, annexes: Dict[str, str], tmp_path: str) -> Dict[str, int]:
+    with open(path, "rb") as infile:
+        size = os.fstat(infile.fileno()).st_size
+        data = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            edits = plan_annex_edits(data, annexes)
+            written = 0
+            with open(tmp_path, "wb") as outfile, memoryview(data) as view:
+                cursor = 0
+                for start, end, replacement in edits:
+                    outfile.write(view[cursor:start])
+                    outfile.write(replacement)
+                    written += len(replacement)
+                    cursor = end
+                outfile.write(view[cursor:])
+                outfile.flush()
+                os.fsync(outfile.fileno())
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+    replaced = sum(end - start for start, end, _ in edits)
+    return {"edits": len(edits), "bytes_changed": written, "bytes_total": size - replaced + written}
+
+
+def apply_annex_edits(path: str, annexes: Dict[str, str]) -> Dict[str, int]:
+    """Insert or replace the GUMBO annexes of many part defs in one pass over `path`.
+    Untouched regions are streamed from a memory map into a temporary file that
+    atomically replaces the model, so readers see either the old or the new file.
+    """
+    with writer_lock(path):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        os.close(fd)
+        try:
+            stats = _stream_edits(path, annexes, tmp_path)
+            shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return stats
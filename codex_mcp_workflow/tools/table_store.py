@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""Consolidated, column-oriented store for extracted tables.
+
+    python -m tools.table_store Isollete_tables -o Isollete_tables.store
+
+Layout: an 8-byte magic, the little-endian length of a JSON catalog, the catalog, one
+JSON metadata record per table, then the cell data. Each column of each table is one
+contiguous run of UTF-8 cells; a table's metadata keeps the cell boundaries so a reader
+can slice single cells out of a memory map, and it is only decoded when that table is
+first used. Table ids repeat across documents ("Table A-7"), so tables are stored under
+"<document>/<table_id>", the document being the table file's directory. The catalog maps
+table ids, column names and variable names (first column, case-folded) to those keys.
+
+Readers normally go through `with open_tables(tables_dir) as store:`, which keeps one
+store per table directory under the cache root and rebuilds it when a table file
+changes. A replaced store is closed once the last reader holding it is done.
+"""
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .content_cache import CACHE_ROOT, file_digest, make_key
+
+MAGIC = b"TBLSTOR2"
+_HEADER = struct.Struct("<8sQ")
+STORE_DIR = os.path.join(CACHE_ROOT, "table_store")
+
+
+def variable_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def document_name(path: str) -> str:
+    return os.path.basename(os.path.dirname(os.path.abspath(path)))
+
+
+def stamp(table_paths: Iterable[str]) -> List[List]:
+    """(path, size, mtime) of each table file: cheap to compare against a store's."""
+    stamps = []
+    for path in sorted(table_paths):
+        stat = os.stat(path)
+        stamps.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+    return stamps
+
+
+def build_store(table_paths: Iterable[str], store_path: str) -> dict:
+    table_paths = sorted(table_paths)
+    catalog: Dict[str, dict] = {
+        "tables": {}, "by_table_id": {}, "by_column": {}, "by_variable": {},
+        "stamp": stamp(table_paths), "digest": make_key([file_digest(path) for path in table_paths]),
+    }
+    metas = bytearray()
+    data = bytearray()
+    for path in table_paths:
+        with open(path, "r", encoding="utf-8") as infile:
+            table = json.load(infile)
+        table_id = table["table_id"]
+        document = table.get("document") or document_name(path)
+        key = f"{document}/{table_id}"
+        if key in catalog["tables"]:
+            raise ValueError(f"{path}: {table_id} appears twice in document {document}")
+        columns = table["columns"]
+        rows = table["rows"]
+        cells: Dict[str, List] = {}
+        for column in columns:
+            base = len(data)
+            bounds = [0]
+            for row in rows:
+                data += row.get(column, "").encode("utf-8")
+                bounds.append(len(data) - base)
+            cells[column] = [base, bounds]
+            catalog["by_column"].setdefault(column, []).append(key)
+        for row_idx, row in enumerate(rows):
+            name = row.get(columns[0], "")
+            if name:
+                catalog["by_variable"].setdefault(variable_key(name), []).append([key, row_idx])
+        meta = json.dumps({
+            "table_id": table_id,
+            "document": document,
+            "title": table.get("title", ""),
+            "columns": columns,
+            "row_count": len(rows),
+            "notes": table.get("notes", []),
+            "source": os.path.basename(path),
+            "cells": cells,
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        catalog["tables"][key] = [len(metas), len(meta)]
+        catalog["by_table_id"].setdefault(table_id, []).append(key)
+        metas += meta
+    catalog["meta_bytes"] = len(metas)
+    encoded = json.dumps(catalog, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    directory = os.path.dirname(os.path.abspath(store_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as outfile:
+            outfile.write(_HEADER.pack(MAGIC, len(encoded)))
+            outfile.write(encoded)
+            outfile.write(metas)
+            outfile.write(data)
+        os.replace(tmp_path, store_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return {"tables": len(catalog["tables"]), "bytes": _HEADER.size + len(encoded) + len(metas) + len(data)}
+
+
+class TableStore:
+    """Read-only view of a store file; table metadata and cells are decoded only when requested."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, catalog_len = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a table store")
+        start = _HEADER.size
+        self.index = json.loads(self._map[start:start + catalog_len].decode("utf-8"))
+        self._meta_start = start + catalog_len
+        self._data_start = self._meta_start + self.index["meta_bytes"]
+        self._metas: Dict[str, dict] = {}
+
+    @property
+    def digest(self) -> str:
+        """Content digest of the table files the store was built from."""
+        return self.index["digest"]
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "TableStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def table_ids(self) -> List[str]:
+        """Store keys ("<document>/<table_id>") in build order."""
+        return list(self.index["tables"])
+
+    def resolve(self, table_id: str, document: Optional[str] = None) -> str:
+        """Store key of a table given its key, or its id (and document when the id repeats)."""
+        if document is None and table_id in self.index["tables"]:
+            return table_id
+        keys = [key for key in self.index["by_table_id"].get(table_id, [])
+                if document is None or key == f"{document}/{table_id}"]
+        if len(keys) != 1:
+            where = f" in document {document}" if document else ""
+            found = f"; found in {', '.join(keys)}" if keys else ""
+            raise KeyError(f"{table_id}{where} matches {len(keys)} tables{found}")
+        return keys[0]
+
+    def meta(self, table_id: str) -> dict:
+        key = self.resolve(table_id)
+        meta = self._metas.get(key)
+        if meta is None:
+            offset, length = self.index["tables"][key]
+            start = self._meta_start + offset
+            meta = self._metas[key] = json.loads(self._map[start:start + length].decode("utf-8"))
+        return meta
+
+    def _cell(self, meta: dict, column: str, row: int) -> str:
+        base, bounds = meta["cells"][column]
+        start = self._data_start + base
+        return self._map[start + bounds[row]:start + bounds[row + 1]].decode("utf-8")
+
+    def column(self, table_id: str, column: str) -> List[str]:
+        meta = self.meta(table_id)
+        return [self._cell(meta, column, row) for row in range(meta["row_count"])]
+
+    def rows(
+        self,
+        table_id: str,
+        rows: Optional[Iterable[int]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict[str, str]]:
+        meta = self.meta(table_id)
+        wanted = columns or meta["columns"]
+        selected = range(meta["row_count"]) if rows is None else rows
+        return [{column: self._cell(meta, column, row) for column in wanted} for row in selected]
+
+    def table(self, table_id: str) -> dict:
+        """The table in the same shape as the per-table JSON files, plus its document."""
+        meta = self.meta(table_id)
+        output = {
+            "table_id": meta["table_id"], "document": meta["document"], "title": meta["title"],
+            "columns": meta["columns"], "rows": self.rows(table_id),
+        }
+        if meta["notes"]:
+            output["notes"] = meta["notes"]
+        return output
+
+    def tables_with_column(self, column: str) -> List[str]:
+        return list(self.index["by_column"].get(column, []))
+
+    def find_variable(self, name: str) -> List[Tuple[str, Dict[str, str]]]:
+        hits = self.index["by_variable"].get(variable_key(name), [])
+        return [(key, self.rows(key, [row])[0]) for key, row in hits]
+
+
+_STORES: Dict[str, TableStore] = {}
+_READERS: Dict[TableStore, int] = {}  # open `open_tables` blocks per store
+_RETIRED: Set[TableStore] = set()  # replaced stores that still have readers
+_STORES_LOCK = threading.Lock()
+
+
+def _retire(store: TableStore) -> None:
+    if _READERS.get(store):
+        _RETIRED.add(store)
+    else:
+        store.close()
+
+
+def _acquire(tables_dir: str, store_dir: str) -> TableStore:
+    paths = glob.glob(os.path.join(tables_dir, "*.json"))
+    current = stamp(paths)
+    store_path = os.path.join(store_dir, f"{make_key(os.path.abspath(tables_dir))}.store")
+    with _STORES_LOCK:
+        store = _STORES.get(store_path)
+        if store is None or store.index["stamp"] != current:
+            try:
+                fresh = TableStore(store_path)
+            except (OSError, ValueError):
+                fresh = None
+            if fresh is None or fresh.index["stamp"] != current:
+                if fresh is not None:
+                    fresh.close()
+                build_store(paths, store_path)
+                fresh = TableStore(store_path)
+            if store is not None:
+                _retire(store)
+            store = _STORES[store_path] = fresh
+        _READERS[store] = _READERS.get(store, 0) + 1
+        return store
+
+
+def _release(store: TableStore) -> None:
+    with _STORES_LOCK:
+        _READERS[store] -= 1
+        if _READERS[store] == 0:
+            del _READERS[store]
+            if store in _RETIRED:
+                _RETIRED.discard(store)
+                store.close()
+
+
+@contextmanager
+def open_tables(tables_dir: str, store_dir: str = STORE_DIR) -> Iterator[TableStore]:
+    """Shared store of the *.json tables in `tables_dir`, rebuilt when any of them changes.
+    The store stays open for the `with` block even if another thread replaces it meanwhile."""
+    store = _acquire(tables_dir, store_dir)
+    try:
+        yield store
+    finally:
+        _release(store)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build a consolidated table store from per-table JSON files.")
+    parser.add_argument("table_dir", nargs="+", help="directories of extracted table JSON files, one per document")
+    parser.add_argument("-o", "--output", help="store path (default: <first table_dir>.store)")
+    args = parser.parse_args(argv)
+    output = args.output or os.path.normpath(args.table_dir[0]) + ".store"
+    paths = [path for table_dir in args.table_dir for path in glob.glob(os.path.join(table_dir, "*.json"))]
+    summary = build_store(paths, output)
+    print(f"wrote {summary['tables']} tables ({summary['bytes']} bytes) to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Span tracing for agent runs: wall time, tokens, payload sizes and retries, as JSONL.
+
+`SpanHooks` is a RunHooks implementation; pass it to Runner.run (or use `traced_run`) and
+every agent turn, model call, tool call and handoff of the run is written to the trace
+file as one JSON line tagged with the run id and the component (MRI, MA, ...):
+
+    {"span": "llm", "run": "...", "component": "MA", "agent": "Repair", "wall_sec": 4.1,
+     "input_tokens": 5120, "output_tokens": 310, "reasoning_tokens": 192, "requests": 1,
+     "retries": 0, "payload_in": 20480, "payload_out": 1210, "ts": 1760000000.0}
+
+A tool call counts as a retry when the same agent calls the same tool with the same
+arguments again in the run; a model call's retries are its extra API requests.
+
+    python -m tools.tracing Gumbo_FSE_plans_progress_json_logs/trace.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents import RunHooks, Runner
+from agents.exceptions import AgentsException
+
+TRACE_PATH = os.path.join("Gumbo_FSE_plans_progress_json_logs", "trace.jsonl")
+
+
+class TraceWriter:
+    """Appends spans to a JSONL file; one line per write, shared by concurrent runs."""
+
+    def __init__(self, path: str = TRACE_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, span: Dict[str, Any]) -> None:
+        line = json.dumps(span, default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as outfile:
+            outfile.write(line)
+
+
+def _size(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(json.dumps(value, default=lambda o: o.model_dump() if hasattr(o, "model_dump") else str(o)))
+
+
+def _usage(usage: Any) -> Dict[str, int]:
+    if usage is None:
+        return {"input_tokens": 0, "output_tokens": 0, "reasoning_tokens": 0, "requests": 0}
+    details = getattr(usage, "output_tokens_details", None)
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "reasoning_tokens": (getattr(details, "reasoning_tokens", 0) or 0) if details else 0,
+        "requests": getattr(usage, "requests", 0) or 0,
+    }
+
+
+class SpanHooks(RunHooks):
+    def __init__(self, writer: TraceWriter, component: Optional[str] = None, run_id: Optional[str] = None) -> None:
+        self.writer = writer
+        self.component = component
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self._started: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._tool_calls: Dict[Tuple[str, str, str], int] = {}
+
+    def emit(self, span: str, agent: Optional[str], **fields: Any) -> None:
+        self.writer.write({"span": span, "run": self.run_id, "component": self.component, "agent": agent,
+                           "ts": time.time(), **fields})
+
+    def _start(self, key: Tuple[str, str], payload: int = 0) -> None:
+        self._started[key] = (time.perf_counter(), payload)
+
+    def _stop(self, key: Tuple[str, str]) -> Tuple[float, int]:
+        started, payload = self._started.pop(key, (time.perf_counter(), 0))
+        return round(time.perf_counter() - started, 6), payload
+
+    async def on_agent_start(self, context, agent) -> None:
+        self._start(("agent", agent.name))
+
+    async def on_agent_end(self, context, agent, output) -> None:
+        wall, _ = self._stop(("agent", agent.name))
+        self.emit("agent", agent.name, wall_sec=wall, payload_out=_size(output))
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        self._start(("llm", agent.name), _size(system_prompt) + _size(input_items))
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        wall, payload_in = self._stop(("llm", agent.name))
+        usage = _usage(response.usage)
+        self.emit("llm", agent.name, wall_sec=wall, **usage, retries=max(0, usage["requests"] - 1),
+                  payload_in=payload_in, payload_out=_size(response.output))
+
+    async def on_tool_start(self, context, agent, tool) -> None:
+        call_id = getattr(context, "tool_call_id", None) or tool.name
+        arguments = getattr(context, "tool_arguments", None) or ""
+        self._start(("tool", call_id), _size(arguments))
+        key = (agent.name, tool.name, arguments)
+        self._tool_calls[key] = self._tool_calls.get(key, 0) + 1
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        call_id = getattr(context, "tool_call_id", None) or tool.name
+        arguments = getattr(context, "tool_arguments", None) or ""
+        wall, payload_in = self._stop(("tool", call_id))
+        self.emit("tool", agent.name, tool=tool.name, wall_sec=wall, payload_in=payload_in,
+                  payload_out=_size(result), retries=self._tool_calls.get((agent.name, tool.name, arguments), 1) - 1)
+
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        self.emit("handoff", from_agent.name, to_agent=to_agent.name)
+
+
+async def traced_run(agent, input, writer: TraceWriter, component: Optional[str] = None, **kwargs):
+    """Runner.run with SpanHooks, plus one "run" span carrying the run's total usage."""
+    hooks = SpanHooks(writer, component)
+    started = time.perf_counter()
+    status = "error"
+    result = None
+    try:
+        result = await Runner.run(agent, input, hooks=hooks, **kwargs)
+        status = "ok"
+        return result
+    except AgentsException as exc:
+        result = exc.run_data  # a failed run still reports what it spent
+        raise
+    finally:
+        usage = _usage(result.context_wrapper.usage if result is not None else None)
+        hooks.emit("run", agent.name, wall_sec=round(time.perf_counter() - started, 6), status=status,
+                   turns=len(result.raw_responses) if result is not None else None, **usage)
+
+
+def summarize(path: str) -> Dict[str, Any]:
+    """Per component: totals per agent and per tool, and which one dominates wall time and tokens."""
+    components: Dict[str, Dict[str, Dict[str, float]]] = {}
+    with open(path, "r", encoding="utf-8") as infile:
+        for line in infile:
+            span = json.loads(line)
+            if span["span"] not in ("llm", "tool"):
+                continue  # agent and run spans overlap the llm/tool spans they contain
+            name = f"tool:{span['tool']}" if span["span"] == "tool" else f"agent:{span['agent']}"
+            entry = components.setdefault(span.get("component") or "-", {}).setdefault(name, {
+                "calls": 0, "wall_sec": 0.0, "input_tokens": 0, "output_tokens": 0, "reasoning_tokens": 0,
+                "payload_in": 0, "payload_out": 0, "retries": 0,
+            })
+            entry["calls"] += 1
+            for field in ("wall_sec", "input_tokens", "output_tokens", "reasoning_tokens",
+                          "payload_in", "payload_out", "retries"):
+                entry[field] += span.get(field, 0) or 0
+    report = {}
+    for component, entries in sorted(components.items()):
+        report[component] = {
+            "hot_by_time": max(entries, key=lambda name: entries[name]["wall_sec"]),
+            "hot_by_tokens": max(entries, key=lambda name: entries[name]["input_tokens"] + entries[name]["output_tokens"]),
+            "wall_sec": round(sum(e["wall_sec"] for e in entries.values()), 3),
+            "tokens": sum(e["input_tokens"] + e["output_tokens"] for e in entries.values()),
+            "reasoning_tokens": sum(e["reasoning_tokens"] for e in entries.values()),
+            "by": dict(sorted(entries.items(), key=lambda item: -item[1]["wall_sec"])),
+        }
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Hot-path report from a span trace.")
+    parser.add_argument("trace", nargs="?", default=TRACE_PATH)
+    args = parser.parse_args(argv)
+    print(json.dumps(summarize(args.trace), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
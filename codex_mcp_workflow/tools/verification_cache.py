@@ -0,0 +1,80 @@
+"""Cache keys for Logika results.
+
+A contract key hashes one component's GUMBO block and declaration after comment and
+whitespace normalization, the definitions it depends on (looked up by qualified name)
+and the Sireum tool version. Everything comes from the definitions and lexer of
+tools/sysml_index.py, so no annex is parsed to compute a key. Results are stored per
+component in a ContentCache: editing one part def only invalidates the components whose
+contract or dependencies include it, and a hit returns the recorded result without
+running Logika.
+"""
+import os
+import shutil
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from .content_cache import CACHE_ROOT, ContentCache, make_key
+from .sireum_runner import SIREUM
+from .sysml_index import DependencyGraph, lexemes, normalize_gumbo, shared_index
+
+CACHE_DIR = os.path.join(CACHE_ROOT, "verification")
+# bump when the shape of cached results changes
+RESULT_VERSION = "2"
+
+
+def referenced_types(text: str) -> List[str]:
+    """Qualified names written in a block, e.g. Isolette_Data_Model::Status."""
+    tokens = lexemes(text)
+    found = set()
+    i = 0
+    while i < len(tokens):
+        j = i
+        while j + 2 < len(tokens) and tokens[j + 1] == "::":
+            j += 2
+        if j > i:
+            found.add("".join(tokens[i:j + 1]))
+        i = j + 1
+    return sorted(found)
+
+
+def type_digests(roots: Iterable[str]) -> Dict[str, str]:
+    """Map qualified definition name -> hash of its normalized definition, over every .sysml file under `roots`."""
+    digests: Dict[str, str] = {}
+    for root in roots:
+        for name, digest in DependencyGraph(shared_index(root)).digests.items():
+            digests.setdefault(name, digest)
+    return digests
+
+
+@lru_cache(maxsize=None)
+def tool_version(executable: str = SIREUM) -> str:
+    """SIREUM_VERSION if set, else a fingerprint (path, size, mtime) of the resolved executable."""
+    if os.getenv("SIREUM_VERSION"):
+        return os.environ["SIREUM_VERSION"]
+    resolved = shutil.which(executable) or executable
+    try:
+        stat = os.stat(resolved)
+    except OSError:
+        return f"missing:{executable}"
+    return f"{os.path.realpath(resolved)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def contract_key(annex_text: str, types: Dict[str, str], tool: Optional[str] = None,
+                 refs: Optional[Iterable[str]] = None, declaration: str = "", command: str = "") -> str:
+    """Key for one component's result. `refs` are the qualified names it depends on
+    (by default the qualified names written in the annex), each looked up in `types`;
+    names defined outside the source tree count as "external"."""
+    refs = referenced_types(annex_text) if refs is None else refs
+    deps = {ref: types.get(ref, "external") for ref in sorted(refs)}
+    return make_key("contract", normalize_gumbo(annex_text), normalize_gumbo(declaration), deps,
+                    command, tool or tool_version(), RESULT_VERSION)
+
+
+def component_key(graph: DependencyGraph, name: str, command: str = "", tool: Optional[str] = None) -> str:
+    """`contract_key` of a component of `graph`, over its transitive dependencies."""
+    return contract_key(graph.annex_text(name), graph.digests, tool, graph.closure(name), graph.declaration(name),
+                        command)
+
+
+def verification_cache() -> ContentCache:
+    return ContentCache(CACHE_DIR)
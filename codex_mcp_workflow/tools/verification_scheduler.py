@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Incremental, dependency-ordered verification of the components in a SysML source tree.
+
+    python -m tools.verification_scheduler isolette/sysml
+    python -m tools.verification_scheduler isolette/sysml --args-template "... {sourcepath} ... {component}"
+
+The dependency graph is tools.sysml_index.DependencyGraph over the shared index of the
+tree: every definition is a node, keyed by its qualified name, and components are part
+defs with a GUMBO annex. After a
+change only components whose contract key (tools/verification_cache.py: annex,
+declaration and transitive dependencies) has no cached result are re-verified, level by
+level in topological order; each level is one batch with one job per component, so a
+warm pool runs them in parallel. All other results come from the cache.
+
+With {component} in the args template the command checks that component itself.
+Otherwise each job runs the command on a sliced copy of the tree in which only the
+component and the components it depends on keep their annexes; the others are blanked
+out line for line, so error locations still match the original files. Errors located
+inside another component belong to that component's own job and are dropped.
+"""
+import argparse
+import json
+import os
+import re
+import shlex
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .content_cache import ContentCache, make_key
+from .sireum_runner import SireumPool, VerificationJob, get_pool, run_jobs
+from .sysml_index import Definition, DependencyGraph, shared_index
+from .verification_cache import component_key, verification_cache
+
+DEFAULT_ARGS_TEMPLATE = "hamr sysml logika --sourcepath {sourcepath}"
+
+
+def _stored(result: dict, root: str) -> dict:
+    """Result as cached: error paths relative to the source root, so copies of the tree share it."""
+    errors = [
+        dict(e, file=os.path.relpath(e["file"], root)) if e.get("file") and os.path.isabs(e["file"]) else e
+        for e in result["parse_errors"]
+    ]
+    return dict(result, parse_errors=errors)
+
+
+def _restored(result: dict, root: str) -> dict:
+    errors = [dict(e, file=os.path.join(root, e["file"])) if e.get("file") else e for e in result["parse_errors"]]
+    return dict(result, parse_errors=errors, reused=True)
+
+
+def slice_tree(graph: DependencyGraph, keep: Set[str], dest: str) -> str:
+    """Copy the source tree to `dest`, blanking the annexes of every component not in `keep`."""
+    shutil.copytree(graph.root, dest)
+    spans: Dict[str, List[Tuple[int, int]]] = {}
+    for name, component in graph.components.items():
+        if name not in keep:
+            spans.setdefault(component.path, []).append((component.annex.start, component.annex.end))
+    for path, blanks in spans.items():
+        target = os.path.join(dest, os.path.relpath(path, graph.root))
+        with open(target, "rb") as infile:
+            data = infile.read()
+        for start, end in sorted(blanks, reverse=True):  # byte offsets; one space per character keeps the columns
+            data = data[:start] + re.sub(r"[^\n]", " ", data[start:end].decode("utf-8")).encode("utf-8") + data[end:]
+        with open(target, "wb") as outfile:
+            outfile.write(data)
+    return dest
+
+
+def component_jobs(graph: DependencyGraph, names: List[str], args_template: str,
+                   workdir: str) -> List[Tuple[VerificationJob, Optional[str]]]:
+    """One job per component, with the root of its sliced tree (None when not sliced)."""
+    jobs = []
+    for name in names:
+        component = graph.components[name]
+        sliced = None
+        if "{component}" not in args_template:
+            keep = {name} | (graph.closure(name) & set(graph.components))
+            sliced = slice_tree(graph, keep, os.path.join(workdir, make_key(name)[:16]))
+        args = args_template.format(sourcepath=sliced or graph.root, component=component.name)
+        jobs.append((VerificationJob(name, shlex.split(args)), sliced))
+    return jobs
+
+
+def _owner(graph: DependencyGraph, path: str, line: int) -> Optional[Definition]:
+    """The innermost component whose definition spans `line` of `path`."""
+    owners = [
+        c for c in graph.components.values()
+        if c.path == path and c.first_line <= line <= c.last_line
+    ]
+    return min(owners, key=lambda c: c.last_line - c.first_line, default=None)
+
+
+def attribute(result: dict, name: str, graph: DependencyGraph, sliced: Optional[str] = None) -> dict:
+    """The component's part of a job result: error paths are mapped back from the sliced
+    tree and errors located inside other components are dropped."""
+    component = graph.components[name]
+    errors = []
+    for error in result["parse_errors"]:
+        error = dict(error)
+        if error.get("file"):
+            path = os.path.abspath(error["file"])
+            if sliced and path.startswith(os.path.abspath(sliced) + os.sep):
+                path = os.path.join(graph.root, os.path.relpath(path, sliced))
+            error["file"] = path
+            owner = _owner(graph, path, error.get("line") or 0)
+            if owner is not None and owner.qualified != name:
+                continue
+        errors.append(error)
+    status = result["status"]
+    if status in ("verified", "failed"):
+        # a failed run without any located error is kept as failed; errors of others are not ours
+        status = "failed" if errors or (status == "failed" and not result["parse_errors"]) else "verified"
+    return dict(result, job=name, status=status, parse_errors=errors,
+                proofs=[p for p in result["proofs"] if p["name"] in (component.name, name)])
+
+
+def schedule(
+    sourcepath: str,
+    args_template: str = DEFAULT_ARGS_TEMPLATE,
+    pool: Optional[SireumPool] = None,
+    cache: Optional[ContentCache] = None,
+    use_cache: bool = True,
+    runner: Callable[..., List[dict]] = run_jobs,
+    cancel: Optional[threading.Event] = None,
+) -> dict:
+    """Verify the components without a cached result, level by level. Setting `cancel` stops
+    the running jobs (their results are not cached) and raises CancelledError after the level."""
+    started = time.perf_counter()
+    graph = DependencyGraph(shared_index(sourcepath))
+    cache = (cache or verification_cache()) if use_cache else None
+    keys = {name: component_key(graph, name, args_template) for name in graph.components}
+    results: Dict[str, dict] = {}
+    for name, key in keys.items():
+        cached = cache.get(key) if cache else None
+        if cached is not None:
+            results[name] = _restored(cached, graph.root)
+    reused = sorted(results)
+    affected = set(graph.components) - set(reused)
+    levels = graph.levels(affected)
+    pool = pool or get_pool()
+    with tempfile.TemporaryDirectory(prefix="schedule-") as workdir:
+        for level in levels:
+            jobs = component_jobs(graph, level, args_template, workdir)
+            outcomes = runner([job for job, _ in jobs], pool, cancel)
+            for (job, sliced), result in zip(jobs, outcomes):
+                results[job.name] = attribute(result, job.name, graph, sliced)
+                # a component whose run did not finish is re-checked next time
+                if cache and results[job.name]["status"] in ("verified", "failed"):
+                    cache.put(keys[job.name], _stored(results[job.name], graph.root))
+            if cancel is not None and cancel.is_set():
+                raise CancelledError(f"verification of {graph.root} cancelled")
+    return {
+        "rechecked": sorted(affected),
+        "reused": reused,
+        "levels": levels,
+        "mode": "component" if "{component}" in args_template else "sliced",
+        "results": {name: results[name] for name in sorted(results)},
+        "time_sec": round(time.perf_counter() - started, 3),
+        "time_sec_saved": round(sum(results[name]["time_sec"] for name in reused), 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-verify only the components affected by a change.")
+    parser.add_argument("sourcepath")
+    parser.add_argument("--args-template", default=DEFAULT_ARGS_TEMPLATE,
+                        help="sireum arguments; {sourcepath} and {component} are substituted")
+    parser.add_argument("--no-cache", action="store_true", help="re-verify every component")
+    args = parser.parse_args(argv)
+    report = schedule(args.sourcepath, args.args_template, use_cache=not args.no_cache)
+    print(json.dumps({k: report[k] for k in ("rechecked", "reused", "levels", "mode", "time_sec")}, indent=2))
+    failed = [name for name, result in report["results"].items() if result["status"] != "verified"]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())